@@ -1,5 +1,13 @@
 from .async_client import AsyncClient
-from .sync_client import Client
 
 __version__ = "0.1.0"
 __all__ = ["AsyncClient", "Client", "__version__"]
+
+
+def __getattr__(name: str):
+    # The sync client (and anyio) is only imported when it is used.
+    if name == "Client":
+        from .sync_client import Client
+
+        return Client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,7 +5,7 @@
 # @LastEditors: 胖胖很瘦
 # @LastEditTime: 2025-11-11 16:18:58
 
-from . import chat, dataset, files, documents, blocks, tags, models, sessions, feedback, textgen, workflows, app_config
+import importlib
 
 __all__ = [
     "chat",
@@ -21,6 +21,15 @@ __all__ = [
     "workflows",
     "app_config",
 ]
+
+
+def __getattr__(name: str):
+    # Submodules are imported on first use so that importing one API module
+    # (or the client) does not pull in all of them.
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 """
 https://docs.dify.ai/api-reference/对话消息/发送对话消息
 https://docs.dify.ai/api-reference/对话消息/停止响应
@@ -7,7 +7,7 @@
 
 from typing import Any, Dict
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
 
 
 class AppConfigApi:
@@ -22,28 +22,28 @@ class AppConfigApi:
 
     async def basic_info(self) -> Dict[str, Any]:
         """获取应用基本信息。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["APP_BASIC_INFO"]) 
+        return await self.client._arequest("GET", ROUTES["APP_BASIC_INFO"].path) 
 
     async def parameters(self) -> Dict[str, Any]:
         """获取应用参数。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["APP_PARAMETERS"]) 
+        return await self.client._arequest("GET", ROUTES["APP_PARAMETERS"].path) 
 
     async def meta(self) -> Dict[str, Any]:
         """获取应用 meta 信息。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["APP_META"]) 
+        return await self.client._arequest("GET", ROUTES["APP_META"].path) 
 
     async def webapp_settings(self) -> Dict[str, Any]:
         """获取应用 WebApp 设置。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["APP_WEBAPP_SETTINGS"]) 
+        return await self.client._arequest("GET", ROUTES["APP_WEBAPP_SETTINGS"].path) 
 
     async def workflow_basic_info(self) -> Dict[str, Any]:
         """获取应用基本信息（Workflow 版本）。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["WORKFLOW_APP_BASIC_INFO"]) 
+        return await self.client._arequest("GET", ROUTES["WORKFLOW_APP_BASIC_INFO"].path) 
 
     async def workflow_parameters(self) -> Dict[str, Any]:
         """获取应用参数（Workflow 版本）。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["WORKFLOW_APP_PARAMETERS"]) 
+        return await self.client._arequest("GET", ROUTES["WORKFLOW_APP_PARAMETERS"].path) 
 
     async def workflow_webapp_settings(self) -> Dict[str, Any]:
         """获取应用 WebApp 设置（Workflow 版本）。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["WORKFLOW_APP_WEBAPP_SETTINGS"])
\ No newline at end of file
+        return await self.client._arequest("GET", ROUTES["WORKFLOW_APP_WEBAPP_SETTINGS"].path)
\ No newline at end of file
@@ -1,21 +1,119 @@
-from typing import TYPE_CHECKING, Optional, Dict, Any, List, AsyncIterator
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, AsyncIterator, Awaitable, Callable
+
+from ..codec import default_codec
+from ..scheduler import current_priority
 
 
 if TYPE_CHECKING:
     from ..base import BaseClient
 
 
+# Deadline (seconds) for the background stop request fired when a stream
+# consumer goes away before the upstream task has finished.
+STOP_ON_CANCEL_TIMEOUT = 5.0
+
+# Events after which the upstream task is already finished.
+_TERMINAL_EVENTS = ("message_end", "workflow_finished", "error")
+
+# Strong references to in-flight stop requests so they are not garbage
+# collected before they complete.
+_background_tasks: set = set()
+
+logger = logging.getLogger(__name__)
+
+
+def _event_payload(event: Any, loads: Optional[Callable[[str], Any]] = None) -> dict:
+    """Decode the JSON ``data`` of an SSE event, returning {} if it is not an object."""
+    try:
+        payload = (loads or default_codec().loads)(event.data)
+    except (TypeError, ValueError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _spawn_stop(stop: Callable[[str], Awaitable[Any]], task_id: str, timeout: float) -> None:
+    """Run ``stop(task_id)`` in the background, bounded by ``timeout`` seconds."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # The generator is being finalized outside of a running loop; nothing we can do.
+        logger.warning(f"Unable to stop task {task_id}: no running event loop")
+        return
+
+    task = loop.create_task(asyncio.wait_for(stop(task_id), timeout))
+    _background_tasks.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning(f"Failed to stop task {task_id}: {t.exception()!r}")
+
+    task.add_done_callback(_done)
+
+
+async def stop_on_cancel(
+    events: AsyncIterator[Any],
+    stop: Callable[[str], Awaitable[Any]],
+    *,
+    timeout: float = STOP_ON_CANCEL_TIMEOUT,
+    loads: Optional[Callable[[str], Any]] = None,
+) -> AsyncIterator[Any]:
+    """Relay SSE ``events`` and stop the upstream task if the consumer goes away.
+
+    The ``task_id`` is captured from the first event carrying one. If the
+    consumer closes the generator (``GeneratorExit``) or is cancelled
+    (``CancelledError``) before a terminal event was seen, ``stop(task_id)``
+    is scheduled in the background with a ``timeout`` second deadline so the
+    generation does not keep running on Dify.
+
+    Args:
+        events: The SSE event iterator to relay.
+        stop: Coroutine function taking the task ID and stopping the task.
+        timeout: Deadline in seconds for the stop request.
+        loads: JSON decoder for the event data; defaults to the "auto" codec.
+
+    Yields:
+        The events from ``events``, unchanged.
+    """
+    task_id: Optional[str] = None
+    finished = False
+    loads = loads or default_codec().loads
+    try:
+        async with aclosing(events):
+            async for event in events:
+                if task_id is None:
+                    task_id = _event_payload(event, loads).get("task_id")
+                data = event.data or ""
+                if any(name in data for name in _TERMINAL_EVENTS) and _event_payload(event, loads).get("event") in _TERMINAL_EVENTS:
+                    finished = True
+                yield event
+        finished = True
+    except (GeneratorExit, asyncio.CancelledError):
+        if task_id and not finished:
+            logger.debug(f"Stream consumer went away, stopping task {task_id}")
+            _spawn_stop(stop, task_id, timeout)
+        raise
+
+
 class BaseApi:
     API_KEY_NAME = "DIFY_API_KEY"
+    # Scheduler priority of this module's calls when no `priority` context is set.
+    PRIORITY: Optional[str] = None
     def __init__(self, client: "BaseClient"):
         self._client = client
     async def request(self, *args, **kwargs) -> dict:
         if "api_key_name" not in kwargs:
             kwargs["api_key_name"] = self.API_KEY_NAME
+        if self.PRIORITY is not None and "priority" not in kwargs and current_priority() is None:
+            kwargs["priority"] = self.PRIORITY
         return await self._client._arequest(*args, **kwargs)
 
     async def stream_request(self, *args, **kwargs) -> AsyncIterator[dict]:
         if "api_key_name" not in kwargs:
             kwargs["api_key_name"] = self.API_KEY_NAME
-        async for event in self._client._stream_request(*args, **kwargs):
-            yield event
+        async with aclosing(self._client._stream_request(*args, **kwargs)) as events:
+            async for event in events:
+                yield event
@@ -7,7 +7,9 @@
 
 from typing import Any, Dict, Optional
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
+from ..lazy import LazyPage
+from ..scheduler import current_priority
 
 
 class BlocksApi:
@@ -17,22 +19,35 @@ class BlocksApi:
     面向文档的块增删改查以及子块管理。
     """
 
+    # 块的批量增改属于后台任务，未设置 `priority` 上下文时按 background 调度。
+    PRIORITY = "background"
+
     def __init__(self, client):
         self.client = client
 
-    async def list(self, dataset_id: str, document_id: str, *, page: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    async def _request(self, *args, **kwargs) -> Any:
+        if current_priority() is None:
+            kwargs.setdefault("priority", self.PRIORITY)
+        return await self.client._arequest(*args, **kwargs)
+
+    async def list(self, dataset_id: str, document_id: str, *, page: Optional[int] = None, limit: Optional[int] = None, lazy: bool = False) -> Dict[str, Any]:
         """
         从文档获取块列表。
+
+        Args:
+            lazy: True 时返回 `LazyPage`：保留响应原文，按需逐条解码 ``data`` 中的条目，
+                适合只读取少量字段的大分页。
         """
         params = {}
         if page is not None:
             params["page"] = page
         if limit is not None:
             params["limit"] = limit
-        return await self.client._arequest(
+        return await self._request(
             "GET",
-            API_ENDPOINTS["SEGMENTS_LIST"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["SEGMENTS_LIST"].format(dataset_id=dataset_id, document_id=document_id),
             params=params or None,
+            typed=LazyPage if lazy else None,
         )
 
     async def add(self, dataset_id: str, document_id: str, *, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -42,9 +57,9 @@ class BlocksApi:
         payload = {"content": content}
         if metadata:
             payload["metadata"] = metadata
-        return await self.client._arequest(
+        return await self._request(
             "POST",
-            API_ENDPOINTS["SEGMENTS_ADD"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["SEGMENTS_ADD"].format(dataset_id=dataset_id, document_id=document_id),
             json=payload,
         )
 
@@ -52,9 +67,9 @@ class BlocksApi:
         """
         获取文档中的块详情。
         """
-        return await self.client._arequest(
+        return await self._request(
             "GET",
-            API_ENDPOINTS["SEGMENT_DETAIL"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
+            ROUTES["SEGMENT_DETAIL"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
         )
 
     async def update(self, dataset_id: str, document_id: str, segment_id: str, *, content: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -66,9 +81,9 @@ class BlocksApi:
             payload["content"] = content
         if metadata is not None:
             payload["metadata"] = metadata
-        return await self.client._arequest(
+        return await self._request(
             "POST",
-            API_ENDPOINTS["SEGMENT_UPDATE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
+            ROUTES["SEGMENT_UPDATE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
             json=payload or None,
         )
 
@@ -76,18 +91,18 @@ class BlocksApi:
         """
         删除文档中的块。
         """
-        return await self.client._arequest(
+        return await self._request(
             "DELETE",
-            API_ENDPOINTS["SEGMENT_DELETE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
+            ROUTES["SEGMENT_DELETE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
         )
 
     async def list_children(self, dataset_id: str, document_id: str, segment_id: str) -> Dict[str, Any]:
         """
         获取子块列表。
         """
-        return await self.client._arequest(
+        return await self._request(
             "GET",
-            API_ENDPOINTS["SEGMENT_CHILDREN_LIST"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
+            ROUTES["SEGMENT_CHILDREN_LIST"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
         )
 
     async def create_child(self, dataset_id: str, document_id: str, segment_id: str, *, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -97,9 +112,9 @@ class BlocksApi:
         payload = {"content": content}
         if metadata:
             payload["metadata"] = metadata
-        return await self.client._arequest(
+        return await self._request(
             "POST",
-            API_ENDPOINTS["SEGMENT_CHILD_CREATE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
+            ROUTES["SEGMENT_CHILD_CREATE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id),
             json=payload,
         )
 
@@ -107,9 +122,9 @@ class BlocksApi:
         """
         删除子块。
         """
-        return await self.client._arequest(
+        return await self._request(
             "DELETE",
-            API_ENDPOINTS["SEGMENT_CHILD_DELETE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id, child_id=child_id),
+            ROUTES["SEGMENT_CHILD_DELETE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id, child_id=child_id),
         )
 
     async def update_child(self, dataset_id: str, document_id: str, segment_id: str, child_id: str, *, content: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -121,8 +136,8 @@ class BlocksApi:
             payload["content"] = content
         if metadata is not None:
             payload["metadata"] = metadata
-        return await self.client._arequest(
+        return await self._request(
             "POST",
-            API_ENDPOINTS["SEGMENT_CHILD_UPDATE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id, child_id=child_id),
+            ROUTES["SEGMENT_CHILD_UPDATE"].format(dataset_id=dataset_id, document_id=document_id, segment_id=segment_id, child_id=child_id),
             json=payload or None,
         )
\ No newline at end of file
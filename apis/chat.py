@@ -5,11 +5,12 @@
 # @LastEditors: 胖胖很瘦
 # @LastEditTime: 2025-11-26 10:01:57
 
+from contextlib import aclosing
 from typing import TYPE_CHECKING, List, AsyncIterator, Iterator
 from httpx_sse import aconnect_sse, connect_sse, ServerSentEvent
 
-from ..config import API_ENDPOINTS
-from .base import BaseApi
+from ..routes import ROUTES
+from .base import BaseApi, stop_on_cancel as _stop_on_cancel
 
 if TYPE_CHECKING:
     from ..base import BaseClient
@@ -28,7 +29,7 @@ class ChatApi(BaseApi):
             The API response as a dictionary.
         """
         payload = {"model": model, "messages": messages, **kwargs}
-        return await self.request("POST", API_ENDPOINTS["CHAT_MESSAGES_CREATE"], json=payload)
+        return await self.request("POST", ROUTES["CHAT_MESSAGES_CREATE"].path, json=payload)
 
     async def get_chat_message(self, message_id: str) -> dict:
         """Get a chat message by its ID.
@@ -39,7 +40,7 @@ class ChatApi(BaseApi):
         Returns:
             The API response as a dictionary.
         """
-        return await self.request("GET", API_ENDPOINTS["CHAT_MESSAGES_GET"].format(conversation_id=message_id))
+        return await self.request("GET", ROUTES["CHAT_MESSAGES_GET"].format(conversation_id=message_id))
 
     async def upload_file_bytes(self, *, file_name: str, content: bytes, content_type: str = "application/octet-stream", user: str = "abc-123") -> dict:
         """Upload a file to be used in chat (file-based conversations).
@@ -55,7 +56,7 @@ class ChatApi(BaseApi):
         """
         files = {"file": (file_name, content, content_type)}
         payload = { "user": user }
-        return await self.request("POST", API_ENDPOINTS["FILES_UPLOAD"], files=files, json=payload)
+        return await self.request("POST", ROUTES["FILES_UPLOAD"].path, files=files, json=payload)
 
     async def preview_file(self, file_id: str, as_attachment: bool = False) -> dict[str, any]:
         """
@@ -71,7 +72,7 @@ class ChatApi(BaseApi):
 
         return await self.request(
             "GET",
-            API_ENDPOINTS["FILES_PREVIEW"].format(file_id=file_id),
+            ROUTES["FILES_PREVIEW"].format(file_id=file_id),
             params=querystring
         )
 
@@ -88,7 +89,7 @@ class ChatApi(BaseApi):
         file_name = file_path.split("/")[-1]
         files = {"file": (file_name, open(file_path, "rb"))}
         payload = { "user": user }
-        return await self.request("POST", API_ENDPOINTS["FILES_UPLOAD"], files=files, json=payload)
+        return await self.request("POST", ROUTES["FILES_UPLOAD"].path, files=files, json=payload)
 
     async def stop_chat_message(self, task_id: str, user: str = "abc-123") -> dict:
         """Stop a streaming chat message.
@@ -100,14 +101,19 @@ class ChatApi(BaseApi):
             The API response as a dictionary.
         """
         payload = {"user": user}
-        return await self.request("POST", API_ENDPOINTS["CHAT_MESSAGES_STOP"].format(task_id=task_id), json=payload)
+        return await self.request("POST", ROUTES["CHAT_MESSAGES_STOP"].format(task_id=task_id), json=payload)
 
-    async def stream_chat_message(self, *, messages: list, response_mode: str = "streaming", user: str = "abc-123", inputs: dict = None, **kwargs) -> AsyncIterator[ServerSentEvent]:
+    async def stream_chat_message(self, *, messages: list, response_mode: str = "streaming", user: str = "abc-123", inputs: dict = None, stop_on_cancel: bool = True, **kwargs) -> AsyncIterator[ServerSentEvent]:
         """Create a streaming chat message using Server-Sent Events.
 
+        If the consumer disconnects or is cancelled before the answer has
+        finished, the generation is stopped on Dify in the background via
+        `stop_chat_message`.
+
         Args:
             model: The model to use for the chat message.
             messages: A list of messages in the conversation.
+            stop_on_cancel: Stop the upstream task when the consumer goes away. Defaults to True.
             **kwargs: Additional keyword arguments to pass to the API.
 
         Yields:
@@ -131,8 +137,12 @@ class ChatApi(BaseApi):
             "auto_generate_name": True
         }
         payload.update(kwargs)
-        async for event in self.stream_request("POST", API_ENDPOINTS["CHAT_MESSAGES_STREAM"], json=payload, api_key_name=self.API_KEY_NAME):
-            yield event
+        events = self.stream_request("POST", ROUTES["CHAT_MESSAGES_STREAM"].path, json=payload, api_key_name=self.API_KEY_NAME)
+        if stop_on_cancel:
+            events = _stop_on_cancel(events, lambda task_id: self.stop_chat_message(task_id, user), loads=self._client.codec.loads)
+        async with aclosing(events):
+            async for event in events:
+                yield event
 
     def chat_message(self, *, messages: list, response_mode: str = "streaming", user: str = "abc-123", **kwargs) -> Iterator[ServerSentEvent]:
         """Create a streaming chat message using Server-Sent Events (synchronous version).
@@ -161,5 +171,5 @@ class ChatApi(BaseApi):
             # ],
             "auto_generate_name": True
         }
-        for event in self.stream_request("POST", API_ENDPOINTS["CHAT_MESSAGES_STREAM"], json=payload, api_key_name=self.API_KEY_NAME):
+        for event in self.stream_request("POST", ROUTES["CHAT_MESSAGES_STREAM"].path, json=payload, api_key_name=self.API_KEY_NAME):
             yield event
\ No newline at end of file
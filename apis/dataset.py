@@ -1,5 +1,5 @@
-from typing import TYPE_CHECKING, Optional, Dict, Any, List
-from ..config import API_ENDPOINTS
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union
+from ..routes import ROUTES
 from .base import BaseApi
 
 
@@ -8,21 +8,23 @@ if TYPE_CHECKING:
 
 class DatasetApi(BaseApi):
     API_KEY_NAME = "DIFY_DATASET_KEY"
-    async def create_dataset(self, *, name: str, description: Optional[str] = None, **kwargs) -> dict:
+    async def create_dataset(self, *, name: str, description: Optional[str] = None, typed: Union[bool, type, None] = None, **kwargs) -> dict:
         """Create a new dataset.
 
         Args:
             name: The name of the dataset.
             description: The description of the dataset.
             permission: The permission of the dataset.
+            typed: Return a `DatasetResponse` instead of a dict (True), a dict (False),
+                or decode into the given model class. Defaults to the client's ``typed``.
 
         Returns:
             The API response as a dictionary.
         """
         payload = {"name": name, "description": description, **kwargs}
-        return await self.request("POST", API_ENDPOINTS["DATASETS_CREATE"], json=payload)
+        return await self.request("POST", ROUTES["DATASETS_CREATE"].path, json=payload, response_model="DatasetResponse", typed=typed)
 
-    async def list_datasets(self, *, keyword: Optional[str] = None, tag_ids: Optional[List[str]] = None, page: int = 1, limit: int = 20, include_all: bool = False) -> dict:
+    async def list_datasets(self, *, keyword: Optional[str] = None, tag_ids: Optional[List[str]] = None, page: int = 1, limit: int = 20, include_all: bool = False, typed: Union[bool, type, None] = None) -> dict:
         """List datasets with optional filters.
 
         Args:
@@ -31,6 +33,8 @@ class DatasetApi(BaseApi):
             page: Page number.
             limit: Items per page (1-100).
             include_all: Whether to include all datasets (workspace owner only).
+            typed: Return a `DatasetPage` instead of a dict (True), a dict (False),
+                or decode into the given model class. Defaults to the client's ``typed``.
 
         Returns:
             A paginated list response as a dictionary.
@@ -40,18 +44,20 @@ class DatasetApi(BaseApi):
             params["keyword"] = keyword
         if tag_ids:
             params["tag_ids"] = tag_ids
-        return await self.request("GET", API_ENDPOINTS["DATASETS_LIST"], params=params)
+        return await self.request("GET", ROUTES["DATASETS_LIST"].path, params=params, response_model="DatasetPage", typed=typed)
 
-    async def get_dataset(self, *, dataset_id: str) -> dict:
+    async def get_dataset(self, *, dataset_id: str, typed: Union[bool, type, None] = None) -> dict:
         """Get dataset detail by ID.
 
         Args:
             dataset_id: Dataset ID.
+            typed: Return a `DatasetResponse` instead of a dict (True), a dict (False),
+                or decode into the given model class. Defaults to the client's ``typed``.
 
         Returns:
             Dataset detail as a dictionary.
         """
-        return await self.request("GET", API_ENDPOINTS["DATASET_DETAIL"].format(dataset_id=dataset_id))
+        return await self.request("GET", ROUTES["DATASET_DETAIL"].format(dataset_id=dataset_id), response_model="DatasetResponse", typed=typed)
 
     async def update_dataset(self, *, dataset_id: str, name: Optional[str] = None, description: Optional[str] = None) -> dict:
         """Update dataset fields.
@@ -69,7 +75,7 @@ class DatasetApi(BaseApi):
             payload["name"] = name
         if description is not None:
             payload["description"] = description
-        return await self.request("PATCH", API_ENDPOINTS["DATASET_UPDATE"].format(dataset_id=dataset_id), json=payload)
+        return await self.request("PATCH", ROUTES["DATASET_UPDATE"].format(dataset_id=dataset_id), json=payload)
 
     async def delete_dataset(self, *, dataset_id: str) -> dict:
         """Delete a dataset by ID.
@@ -80,7 +86,7 @@ class DatasetApi(BaseApi):
         Returns:
             API response as a dictionary.
         """
-        return await self.request("DELETE", API_ENDPOINTS["DATASET_DELETE"].format(dataset_id=dataset_id))
+        return await self.request("DELETE", ROUTES["DATASET_DELETE"].format(dataset_id=dataset_id))
 
     async def search(
         self,
@@ -109,6 +115,6 @@ class DatasetApi(BaseApi):
             payload["score_threshold"] = score_threshold
         return await self.request(
             "POST",
-            API_ENDPOINTS["DATASETS_SEARCH"].format(dataset_id=dataset_id),
+            ROUTES["DATASETS_SEARCH"].format(dataset_id=dataset_id),
             json=payload,
         )
\ No newline at end of file
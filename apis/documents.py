@@ -4,11 +4,11 @@
 # @Date: 2025-11-11
 # @LastEditors: 胖胖很瘦
 # @LastEditTime: 2025-12-18 11:42:24
-import json as JSON
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 from .base import BaseApi
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
+from ..lazy import LazyPage
 
 
 class DocumentsApi(BaseApi):
@@ -19,6 +19,7 @@ class DocumentsApi(BaseApi):
     支持从文本或文件创建/更新文档。
     """
     API_KEY_NAME = "DIFY_DATASET_KEY"
+    PRIORITY = "background"
 
     async def create_from_text(self, dataset_id: str, *, text: str, title: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -40,7 +41,7 @@ class DocumentsApi(BaseApi):
             payload["metadata"] = metadata
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_CREATE_TEXT"].format(dataset_id=dataset_id),
+            ROUTES["DOCUMENTS_CREATE_TEXT"].format(dataset_id=dataset_id),
             json=payload,
         )
 
@@ -65,7 +66,7 @@ class DocumentsApi(BaseApi):
             data["metadata"] = metadata
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_CREATE_FILE"].format(dataset_id=dataset_id),
+            ROUTES["DOCUMENTS_CREATE_FILE"].format(dataset_id=dataset_id),
             files=files,
             json=data if data else None,
         )
@@ -141,10 +142,10 @@ class DocumentsApi(BaseApi):
         }
         if metadata and isinstance(metadata, dict):
             document_data.update(metadata)
-        data = {"data": JSON.dumps(document_data)}
+        data = {"data": self._client.codec.dumps(document_data)}
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_CREATE_FILE"].format(dataset_id=dataset_id),
+            ROUTES["DOCUMENTS_CREATE_FILE"].format(dataset_id=dataset_id),
             files=files,
             data=data
         )
@@ -170,7 +171,7 @@ class DocumentsApi(BaseApi):
             payload["metadata"] = metadata
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_UPDATE_TEXT"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["DOCUMENTS_UPDATE_TEXT"].format(dataset_id=dataset_id, document_id=document_id),
             json=payload,
         )
 
@@ -196,7 +197,7 @@ class DocumentsApi(BaseApi):
             data["metadata"] = metadata
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_UPDATE_FILE"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["DOCUMENTS_UPDATE_FILE"].format(dataset_id=dataset_id, document_id=document_id),
             files=files,
             json=data if data else None,
         )
@@ -225,7 +226,7 @@ class DocumentsApi(BaseApi):
             data["metadata"] = metadata
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_UPDATE_FILE"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["DOCUMENTS_UPDATE_FILE"].format(dataset_id=dataset_id, document_id=document_id),
             files=files,
             json=data if data else None,
         )
@@ -236,16 +237,21 @@ class DocumentsApi(BaseApi):
         """
         return await self.request(
             "GET",
-            API_ENDPOINTS["DOCUMENTS_EMBED_STATUS"].format(dataset_id=dataset_id, batch_id=document_id),
+            ROUTES["DOCUMENTS_EMBED_STATUS"].format(dataset_id=dataset_id, batch_id=document_id),
         )
 
-    async def detail(self, dataset_id: str, document_id: str) -> Dict[str, Any]:
+    async def detail(self, dataset_id: str, document_id: str, *, typed: Union[bool, type, None] = None) -> Dict[str, Any]:
         """
         获取文档详情。
+
+        Args:
+            typed: True 时返回 `DocumentResponse`，也可传入模型类按其解码；默认跟随客户端的 ``typed``。
         """
         return await self.request(
             "GET",
-            API_ENDPOINTS["DOCUMENTS_DETAIL"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["DOCUMENTS_DETAIL"].format(dataset_id=dataset_id, document_id=document_id),
+            response_model="DocumentResponse",
+            typed=typed,
         )
 
     async def delete(self, dataset_id: str, document_id: str) -> Dict[str, Any]:
@@ -254,12 +260,18 @@ class DocumentsApi(BaseApi):
         """
         return await self.request(
             "DELETE",
-            API_ENDPOINTS["DOCUMENTS_DELETE"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["DOCUMENTS_DELETE"].format(dataset_id=dataset_id, document_id=document_id),
         )
 
-    async def list(self, dataset_id: str, *, page: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    async def list(self, dataset_id: str, *, page: Optional[int] = None, limit: Optional[int] = None, typed: Union[bool, type, None] = None, lazy: bool = False) -> Dict[str, Any]:
         """
         获取知识库的文档列表。
+
+        Args:
+            typed: True 时直接从响应字节解码为 `DocumentPage`（不构建中间 dict）；
+                也可传入只声明所需字段的模型类以减少解码开销。默认跟随客户端的 ``typed``。
+            lazy: True 时返回 `LazyPage`：保留响应原文，按需逐条解码 ``data`` 中的条目，
+                适合只读取少量字段的大分页。
         """
         params = {}
         if page is not None:
@@ -268,8 +280,10 @@ class DocumentsApi(BaseApi):
             params["limit"] = limit
         return await self.request(
             "GET",
-            API_ENDPOINTS["DOCUMENTS_LIST"].format(dataset_id=dataset_id),
+            ROUTES["DOCUMENTS_LIST"].format(dataset_id=dataset_id),
             params=params or None,
+            response_model="DocumentPage",
+            typed=LazyPage if lazy else typed,
         )
 
     async def update_status(self, dataset_id: str, document_id: str, *, status: str) -> Dict[str, Any]:
@@ -282,6 +296,6 @@ class DocumentsApi(BaseApi):
         payload = {"status": status}
         return await self.request(
             "POST",
-            API_ENDPOINTS["DOCUMENTS_UPDATE_STATUS"].format(dataset_id=dataset_id, document_id=document_id),
+            ROUTES["DOCUMENTS_UPDATE_STATUS"].format(dataset_id=dataset_id, document_id=document_id),
             json=payload,
         )
\ No newline at end of file
@@ -5,9 +5,13 @@
 # @LastEditors: 胖胖很瘦
 # @LastEditTime: 2025-11-11
 
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
+from ..lazy import LazyPage
+
+if TYPE_CHECKING:
+    from ..feedback_buffer import FeedbackBuffer
 
 
 class FeedbackApi:
@@ -28,13 +32,28 @@ class FeedbackApi:
             message_id: 目标消息 ID。
             score: 反馈分值，默认 1（点赞）。
         """
-        return await self.client._arequest("POST", API_ENDPOINTS["FEEDBACK_LIKE"].format(message_id=message_id), json={"score": score})
+        return await self.client._arequest("POST", ROUTES["FEEDBACK_LIKE"].format(message_id=message_id), json={"score": score})
+
+    def buffer(self, **kwargs: Any) -> "FeedbackBuffer":
+        """创建 `FeedbackBuffer`：在内存中合并反馈并在后台批量提交，客户端关闭时自动提交剩余反馈。
+
+        Args:
+            **kwargs: 传给 `FeedbackBuffer` 的参数（max_events、flush_interval、concurrency）。
+        """
+        from ..feedback_buffer import FeedbackBuffer
 
-    async def list(self, *, page: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
-        """获取应用的消息点赞和反馈列表。"""
+        return FeedbackBuffer(self.client, **kwargs)
+
+    async def list(self, *, page: Optional[int] = None, limit: Optional[int] = None, lazy: bool = False) -> Dict[str, Any]:
+        """获取应用的消息点赞和反馈列表。
+
+        Args:
+            lazy: True 时返回 `LazyPage`：保留响应原文，按需逐条解码 ``data`` 中的条目，
+                适合只读取少量字段的大分页。
+        """
         params = {}
         if page is not None:
             params["page"] = page
         if limit is not None:
             params["limit"] = limit
-        return await self.client._arequest("GET", API_ENDPOINTS["FEEDBACK_LIST"], params=params or None)
\ No newline at end of file
+        return await self.client._arequest("GET", ROUTES["FEEDBACK_LIST"].path, params=params or None, typed=LazyPage if lazy else None)
\ No newline at end of file
@@ -7,7 +7,7 @@
 
 from typing import Any, Dict, Optional
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
 
 
 class FilesApi:
@@ -36,7 +36,7 @@ class FilesApi:
         params = {"purpose": purpose} if purpose else None
         return await self.client._arequest(
             "POST",
-            API_ENDPOINTS["FILES_UPLOAD"],
+            ROUTES["FILES_UPLOAD"].path,
             files=files,
             params=params,
         )
@@ -58,7 +58,7 @@ class FilesApi:
         params = {"purpose": purpose} if purpose else None
         return await self.client._arequest(
             "POST",
-            API_ENDPOINTS["FILES_UPLOAD"],
+            ROUTES["FILES_UPLOAD"].path,
             files=files,
             params=params,
         )
@@ -75,5 +75,5 @@ class FilesApi:
         """
         return await self.client._arequest(
             "GET",
-            API_ENDPOINTS["FILES_PREVIEW"].format(file_id=file_id),
+            ROUTES["FILES_PREVIEW"].format(file_id=file_id),
         )
\ No newline at end of file
@@ -7,7 +7,7 @@
 
 from typing import Any, Dict
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
 
 
 class ModelsApi:
@@ -22,4 +22,4 @@ class ModelsApi:
 
     async def list_embedding_models(self) -> Dict[str, Any]:
         """获取可用的嵌入模型列表。"""
-        return await self.client._arequest("GET", API_ENDPOINTS["EMBEDDING_MODELS_LIST"])
\ No newline at end of file
+        return await self.client._arequest("GET", ROUTES["EMBEDDING_MODELS_LIST"].path)
\ No newline at end of file
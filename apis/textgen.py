@@ -5,9 +5,11 @@
 # @LastEditors: 胖胖很瘦
 # @LastEditTime: 2025-11-11
 
+from contextlib import aclosing
 from typing import Any, Dict, Optional
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
+from .base import stop_on_cancel as _stop_on_cancel
 
 
 class TextGenApi:
@@ -31,20 +33,37 @@ class TextGenApi:
         payload = {"inputs": inputs}
         if user:
             payload["user"] = user
-        return await self.client._arequest("POST", API_ENDPOINTS["COMPLETION_MESSAGES_CREATE"], json=payload)
+        return await self.client._arequest("POST", ROUTES["COMPLETION_MESSAGES_CREATE"].path, json=payload)
 
-    async def send_stream(self, *, inputs: Dict[str, Any], user: Optional[str] = None):
+    async def send_stream(self, *, inputs: Dict[str, Any], user: Optional[str] = None, stop_on_cancel: bool = True):
         """
         发送流式文本生成请求，返回 SSE 事件迭代器。
+
+        消费方断开或被取消时（如 FastAPI StreamingResponse 客户端关闭），
+        会在后台调用 `stop` 停止 Dify 上仍在运行的生成任务。
+
+        Args:
+            inputs: 生成输入参数（prompt 等）。
+            user: 用户标识（可选）。
+            stop_on_cancel: 消费方离开时是否自动停止任务，默认 True。
         """
         payload = {"inputs": inputs}
         if user:
             payload["user"] = user
-        async for event in self.client.stream_request("POST", API_ENDPOINTS["COMPLETION_MESSAGES_STREAM"], json=payload):
-            yield event
+        events = self.client._stream_request("POST", ROUTES["COMPLETION_MESSAGES_STREAM"].path, json=payload)
+        if stop_on_cancel:
+            events = _stop_on_cancel(events, lambda task_id: self.stop(task_id, user=user), loads=self.client.codec.loads)
+        async with aclosing(events):
+            async for event in events:
+                yield event
 
-    async def stop(self, message_id: str) -> Dict[str, Any]:
+    async def stop(self, message_id: str, *, user: Optional[str] = None) -> Dict[str, Any]:
         """
         停止响应文本生成任务。
+
+        Args:
+            message_id: 任务 ID（流式响应中的 task_id）。
+            user: 用户标识（可选），需与发送请求时一致。
         """
-        return await self.client._arequest("POST", API_ENDPOINTS["COMPLETION_MESSAGES_STOP"].format(message_id=message_id))
\ No newline at end of file
+        payload = {"user": user} if user else None
+        return await self.client._arequest("POST", ROUTES["COMPLETION_MESSAGES_STOP"].format(message_id=message_id), json=payload)
\ No newline at end of file
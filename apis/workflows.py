@@ -7,7 +7,7 @@
 
 from typing import Any, Dict, Optional
 
-from ..config import API_ENDPOINTS
+from ..routes import ROUTES
 from .base import BaseApi
 
 
@@ -20,6 +20,7 @@ class WorkflowsApi(BaseApi):
     API_KEY_NAME = "DIFY_WORKFLOW_KEY"
 
     def __init__(self, client):
+        super().__init__(client)
         self.client = client
 
     async def execute(self, workflow_id: str, *, inputs: Dict[str, Any], user: Optional[str] = None) -> Dict[str, Any]:
@@ -29,29 +30,29 @@ class WorkflowsApi(BaseApi):
         payload = {"inputs": inputs}
         if user:
             payload["user"] = user
-        return await self.request("POST", API_ENDPOINTS["WORKFLOW_EXECUTE"].format(workflow_id=workflow_id), json=payload)
+        return await self.request("POST", ROUTES["WORKFLOW_EXECUTE"].format(workflow_id=workflow_id), json=payload)
 
     async def execution_status(self, workflow_id: str, execution_id: str) -> Dict[str, Any]:
         """
         获取 workflow 执行情况。
         """
-        return await self.request("GET", API_ENDPOINTS["WORKFLOW_EXECUTION_STATUS"].format(workflow_id=workflow_id, execution_id=execution_id))
+        return await self.request("GET", ROUTES["WORKFLOW_EXECUTION_STATUS"].format(workflow_id=workflow_id, execution_id=execution_id))
 
     async def stop_task(self, workflow_id: str, execution_id: str) -> Dict[str, Any]:
         """
         停止响应 workflow task。
         """
-        return await self.request("POST", API_ENDPOINTS["WORKFLOW_STOP_TASK"].format(workflow_id=workflow_id, execution_id=execution_id))
+        return await self.request("POST", ROUTES["WORKFLOW_STOP_TASK"].format(workflow_id=workflow_id, execution_id=execution_id))
 
     async def logs(self, workflow_id: str, execution_id: str) -> Dict[str, Any]:
         """
         获取 workflow 日志。
         """
-        return await self.request("GET", API_ENDPOINTS["WORKFLOW_LOGS"].format(workflow_id=workflow_id, execution_id=execution_id))
+        return await self.request("GET", ROUTES["WORKFLOW_LOGS"].format(workflow_id=workflow_id, execution_id=execution_id))
 
     async def upload_file(self, workflow_id: str, file_path: str) -> Dict[str, Any]:
         """
         上传文件（workflow）。
         """
         files = {"file": (file_path.split("/")[-1], open(file_path, "rb"))}
-        return await self.request("POST", API_ENDPOINTS["WORKFLOW_FILES_UPLOAD"].format(workflow_id=workflow_id), files=files)
\ No newline at end of file
+        return await self.request("POST", ROUTES["WORKFLOW_FILES_UPLOAD"].format(workflow_id=workflow_id), files=files)
\ No newline at end of file
@@ -9,15 +9,38 @@ import asyncio
 import json as JSON
 import httpx
 import logging
-from typing import Optional, Any, AsyncIterator
-from httpx_sse import aconnect_sse, ServerSentEvent
+import time
+from typing import TYPE_CHECKING, Optional, Any, AsyncIterator, Awaitable, Callable, Dict, List, Sequence, Tuple, Union
 
+from .balancer import IDEMPOTENT_METHODS, UNHEALTHY_STATUS, LoadBalancer, Upstream
 from .base import BaseClient
+from .codec import decode_model
+from .config import API_ENDPOINTS
+from .deadline import attempt_budget, cap_timeout, resolve_deadline
+from .idempotency import IDEMPOTENCY_HEADER, MUTATING_METHODS, IdempotencyJournal, current_scope, derive_key, new_key
+from .limiter import DROP_STATUS, AdaptiveLimiter, Permit
+from .profiles import ProfileTable, RequestProfile
+from .scheduler import PriorityScheduler, Ticket
+from .hooks import HOOK_NAMES, Hooks, RequestContext, overridden_hooks
+from .log import LogSampler, SlowRequestLogger, log_extra, redact_headers, summarize, summarize_files
+from .metrics import MetricsRegistry, StreamTimings, resolve_endpoint
+from .timing import RESPONSE_EXTENSION, PhaseTimings, capturing, collect
 from .errors import (
     DifyAPIError, DifyAuthError, DifyNotFoundError, DifyRateLimitError,
-    DifyValidationError, DifyServerError, DifyConnectionError, DifyTimeoutError
+    DifyValidationError, DifyServerError, DifyConnectionError, DifyTimeoutError, DifyDeadlineExceeded
 )
 
+if TYPE_CHECKING:
+    from httpx_sse import ServerSentEvent
+
+
+def aconnect_sse(*args: Any, **kwargs: Any) -> Any:
+    """`httpx_sse.aconnect_sse`, imported on first use to keep the package import light."""
+    from httpx_sse import aconnect_sse as connect
+
+    return connect(*args, **kwargs)
+
+
 class AsyncClient(BaseClient):
     """Asynchronous client for interacting with the Dify API.
 
@@ -44,42 +67,277 @@ class AsyncClient(BaseClient):
 
     def __init__(
         self,
-        base_url: str,
+        base_url: Union[str, Sequence[str]],
         api_key: str,
         timeout: float = 30.0,
         retries: int = 3,
         retry_backoff_factor: float = 1.0,
         logger: Optional[logging.Logger] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        hooks: Optional[Sequence[Hooks]] = None,
+        trace_phases: bool = False,
+        log_sample_rate: float = 1.0,
+        log_sample_rates: Optional[Dict[str, float]] = None,
+        slow_request_threshold: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        balance: Union[str, LoadBalancer] = "least_outstanding",
+        limiter: Union[str, AdaptiveLimiter, None] = None,
+        scheduler: Union[int, PriorityScheduler, None] = None,
+        endpoint_timeouts: Optional[Dict[str, Union[float, httpx.Timeout]]] = None,
+        profiles: Optional[Dict[str, RequestProfile]] = None,
+        idempotency_keys: bool = False,
+        journal: Optional[IdempotencyJournal] = None,
         **kwargs
     ):
         """Initialize the async client.
 
         Args:
-            base_url: The base URL of the Dify API (e.g., "https://api.dify.ai").
+            base_url: The base URL of the Dify API (e.g., "https://api.dify.ai"), or a
+                list of replica base URLs to balance requests over.
             api_key: Your Dify API key.
             timeout: Request timeout in seconds. Defaults to 30.0.
             retries: Number of retry attempts for failed requests. Defaults to 3.
             retry_backoff_factor: Backoff factor for retry delays. Defaults to 1.0.
             logger: Custom logger instance. If None, a default logger will be used.
+            metrics: Metrics registry to record into. If None, a new one is created;
+                pass a shared registry to aggregate across clients.
+            hooks: Request lifecycle hooks (see `pydify_plus.hooks`), called after
+                the metrics registry.
+            trace_phases: Record a phase-level timing breakdown (pool wait, connect,
+                TLS, upload, server, download) for every request. See
+                `pydify_plus.timing`. Defaults to False.
+            log_sample_rate: Fraction of requests whose debug logs are emitted when
+                the logger is enabled for DEBUG. Defaults to 1.0.
+            log_sample_rates: Per-endpoint-template overrides of `log_sample_rate`.
+            slow_request_threshold: If set, log a warning for request attempts
+                slower than this many seconds.
+            transport: Custom httpx transport, e.g. `testing.MockDifyServer.transport()`
+                for offline tests. Defaults to httpx's connection pool.
+            http_client: An `httpx.AsyncClient` shared with other clients (see
+                `pydify_plus.tenants.ClientManager`). It is used instead of a
+                client of our own and is not closed by `aclose`.
+            balance: How requests are spread over several base URLs:
+                "least_outstanding" or "ewma" (see `pydify_plus.balancer`), or a
+                `LoadBalancer` shared with other clients. Defaults to "least_outstanding".
+            limiter: Adapt the number of concurrent requests per endpoint family and
+                key name to observed latency and load shedding: "gradient", "aimd"
+                or an `AdaptiveLimiter` (see `pydify_plus.limiter`). Defaults to None
+                (no limit).
+            scheduler: Admit this many requests at a time and queue the rest by
+                priority (see `pydify_plus.scheduler`), or a `PriorityScheduler`.
+                Defaults to None (no scheduling).
+            endpoint_timeouts: Timeouts per endpoint, keyed by `API_ENDPOINTS` name or
+                template, e.g. ``{"CHAT_MESSAGES": httpx.Timeout(300, connect=3)}``;
+                an `httpx.Timeout` sets connect, read, write and pool timeouts separately.
+            profiles: Timeout and retry profiles keyed by `API_ENDPOINTS` name, merged
+                over `pydify_plus.profiles.DEFAULT_PROFILES`. By default, POST and PATCH
+                requests that fail after being sent are not retried.
+            idempotency_keys: Send a random ``Idempotency-Key`` header, stable across
+                retries, with mutating requests that have no scoped or explicit key, and
+                retry all keyed requests after a read timeout. Only enable it if the
+                server or a gateway deduplicates by key (see `pydify_plus.idempotency`).
+                Defaults to False; scoped and explicit keys are sent either way.
+            journal: An `IdempotencyJournal`; calls with a scoped or explicit key that
+                it records as completed are answered from it instead of being sent.
             **kwargs: Additional keyword arguments passed to the base client.
         """
         super().__init__(base_url, api_key, timeout=timeout, retries=retries, **kwargs)
         self.retry_backoff_factor = retry_backoff_factor
         self.logger = logger or logging.getLogger(__name__)
-        self._cli: Optional[httpx.AsyncClient] = None
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.hooks: List[Hooks] = [self.metrics, *(hooks or [])]
+        if slow_request_threshold is not None:
+            self.hooks.append(SlowRequestLogger(self.logger, slow_request_threshold))
+        self._refresh_hooks()
+        self._log_sampler = LogSampler(log_sample_rate, log_sample_rates)
+        self.trace_phases = trace_phases
+        self.transport = transport
+        self._shared_cli = http_client
+        self._cli: Optional[httpx.AsyncClient] = http_client
+        if isinstance(balance, LoadBalancer):
+            self.balancer: Optional[LoadBalancer] = balance
+        else:
+            self.balancer = LoadBalancer(self.base_urls, balance) if len(self.base_urls) > 1 else None
+        if isinstance(limiter, str):
+            limiter = AdaptiveLimiter(limiter, metrics=self.metrics)
+        self.limiter: Optional[AdaptiveLimiter] = limiter
+        if isinstance(scheduler, int):
+            scheduler = PriorityScheduler(scheduler, metrics=self.metrics)
+        self.scheduler: Optional[PriorityScheduler] = scheduler
+        self.endpoint_timeouts: Dict[str, Union[float, httpx.Timeout]] = {
+            API_ENDPOINTS.get(key, key): value for key, value in (endpoint_timeouts or {}).items()
+        }
+        self.profiles = ProfileTable(profiles)
+        self.idempotency_keys = idempotency_keys
+        self.journal = journal
+        # Awaited by `aclose` before the connections go, e.g. to flush buffers.
+        self._closers: List[Callable[[], Awaitable[Any]]] = []
 
     async def __aenter__(self):
-        self._cli = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        if self._shared_cli is None:
+            self._cli = self._new_http_client()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
         await self.aclose()
 
     async def aclose(self):
+        while self._closers:
+            closer = self._closers.pop()
+            try:
+                await closer()
+            except Exception:
+                # One failing closer must not keep the others or the connections open.
+                self.logger.exception(f"Error in close hook {closer!r}")
+        if self._shared_cli is not None:
+            return
         if self._cli:
             await self._cli.aclose()
             self._cli = None
 
+    def _new_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, transport=self.transport)
+
+    def add_hook(self, hook: Hooks) -> None:
+        """Register an additional request lifecycle hook."""
+        self.hooks.append(hook)
+        self._refresh_hooks()
+
+    def _refresh_hooks(self) -> None:
+        # Only keep the callbacks a hook actually overrides so the hot path
+        # does not pay for no-op calls.
+        self._hook_callbacks = {name: overridden_hooks(self.hooks, name) for name in HOOK_NAMES}
+
+    def _emit(self, name: str, *args: Any) -> None:
+        for callback in self._hook_callbacks[name]:
+            try:
+                callback(*args)
+            except Exception as e:
+                self.logger.warning(f"Hook {name} failed: {e!r}")
+
+    def _new_context(self, method: str, url: str, endpoint: str, attempt: int, max_attempts: int, streaming: bool = False) -> RequestContext:
+        ctx = RequestContext(method=method, url=url, endpoint=endpoint, attempt=attempt, max_attempts=max_attempts, streaming=streaming)
+        if self.trace_phases or capturing():
+            ctx.phases = PhaseTimings(endpoint=endpoint, attempt=attempt, started_at=ctx.started_at)
+            collect(ctx.phases)
+        return ctx
+
+    def _fail(self, ctx: RequestContext, error: Exception) -> Exception:
+        """Attach timings to ``error`` and notify hooks before it is raised."""
+        if ctx.phases is not None:
+            ctx.phases.finish()
+            if getattr(error, "timings", None) is None:
+                try:
+                    error.timings = ctx.phases
+                except AttributeError:
+                    pass
+        self._emit("on_error", ctx, error)
+        return error
+
+    def _response_model(self, response_model: Union[type, str, None], typed: Union[bool, type, None]) -> Optional[type]:
+        """The model to decode into: an explicit ``typed`` model, else ``response_model`` if typed mode is on.
+
+        ``response_model`` may name a class in `pydify_plus.models`, which is
+        then imported only when typed decoding is actually used.
+        """
+        if isinstance(typed, type):
+            return typed
+        if typed is None:
+            typed = self.typed
+        if not typed:
+            return None
+        if isinstance(response_model, str):
+            from . import models
+
+            response_model = getattr(models, response_model)
+        return response_model
+
+    def _decode(self, resp: httpx.Response, model: Optional[type] = None) -> Any:
+        """Decode a response body with the client codec, falling back to its text.
+
+        With a ``model`` the body is decoded straight into it and invalid
+        bodies raise `ValueError` instead of falling back.
+        """
+        if model is not None:
+            from .lazy import LazyPage
+
+            if isinstance(model, type) and issubclass(model, LazyPage):
+                # Lazy pages decode their fields and items with this client's codec.
+                return model(resp.content, self.codec)
+            return decode_model(resp.content, model)
+        try:
+            return self.codec.loads(resp.content)
+        except ValueError:
+            return resp.text
+
+    async def _admit(self, endpoint: str, api_key_name: Optional[str], priority: Optional[str], at: Optional[float] = None) -> Tuple[Optional[Ticket], Optional[Permit]]:
+        """Wait for the priority scheduler, then the concurrency limiter, if configured.
+
+        Raises:
+            DifyDeadlineExceeded: If the deadline ``at`` passes while waiting.
+        """
+        if self.scheduler is None and self.limiter is None:
+            return None, None
+        ticket = None
+        try:
+            async with asyncio.timeout(None if at is None else at - time.monotonic()):
+                if self.scheduler is not None:
+                    ticket = await self.scheduler.acquire(priority)
+                if self.limiter is None:
+                    return ticket, None
+                return ticket, await self.limiter.acquire(endpoint, api_key_name)
+        except BaseException as e:
+            if ticket is not None:
+                ticket.release()
+            if isinstance(e, TimeoutError):
+                raise DifyDeadlineExceeded(f"Deadline exceeded while queued for {endpoint}") from e
+            raise
+
+    def _policy(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        timeout: Union[float, httpx.Timeout, None],
+        retries: Optional[int],
+        keyed: bool = False,
+    ) -> Tuple[Union[float, httpx.Timeout], int, bool]:
+        """Timeout, retries and whether to retry after sending, for one call."""
+        profile = self.profiles.lookup(path, endpoint)
+        if timeout is None and self.endpoint_timeouts:
+            timeout = self.endpoint_timeouts.get(endpoint)
+        if timeout is None:
+            timeout = self.timeout if profile.timeout is None else profile.timeout
+        if retries is None:
+            retries = self.retries if profile.retries is None else profile.retries
+        retry_after_send = profile.retry_after_send
+        if retry_after_send is None:
+            # A call with an idempotency key is applied once however often it is sent.
+            retry_after_send = keyed or method.upper() in IDEMPOTENT_METHODS
+        return timeout, retries, retry_after_send
+
+    def _status_error(self, e: httpx.HTTPStatusError) -> DifyAPIError:
+        """Map an HTTP error response to the matching Dify exception."""
+        request_id = e.response.headers.get("x-request-id") if e.response else None
+
+        data = self._decode(e.response)
+
+        status_code = e.response.status_code
+
+        if status_code == 401:
+            return DifyAuthError(status_code=status_code, body=data, request_id=request_id)
+        elif status_code == 404:
+            return DifyNotFoundError(status_code=status_code, body=data, request_id=request_id)
+        elif status_code == 429:
+            return DifyRateLimitError(status_code=status_code, body=data, request_id=request_id)
+        elif status_code == 422:
+            return DifyValidationError(status_code=status_code, body=data, request_id=request_id)
+        elif 500 <= status_code < 600:
+            return DifyServerError(status_code=status_code, body=data, request_id=request_id)
+        else:
+            return DifyAPIError(status_code=status_code, body=data, request_id=request_id)
+
     async def _arequest(
         self,
         method: str,
@@ -89,10 +347,15 @@ class AsyncClient(BaseClient):
         data: Optional[dict] = None,
         params: Optional[dict] = None,
         files: Optional[Any] = None,
-        timeout: Optional[float] = None,
+        timeout: Union[float, httpx.Timeout, None] = None,
         retries: Optional[int] = None,
-        api_key_name: Optional[str] = None
-    ) -> dict:
+        api_key_name: Optional[str] = None,
+        response_model: Union[type, str, None] = None,
+        typed: Union[bool, type, None] = None,
+        priority: Optional[str] = None,
+        deadline: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Any:
         """Make an asynchronous HTTP request to the Dify API.
 
         This is the internal method used by all API modules. It handles
@@ -104,11 +367,25 @@ class AsyncClient(BaseClient):
             json: JSON payload for the request.
             params: Query parameters.
             files: Files to upload (for multipart/form-data requests).
-            timeout: Request timeout in seconds. Overrides client default.
-            retries: Number of retry attempts. Overrides client default.
+            timeout: Per-attempt timeout in seconds or as `httpx.Timeout`. Overrides
+                ``endpoint_timeouts``, the endpoint profile and the client default.
+            retries: Number of retry attempts. Overrides the endpoint profile and
+                the client default.
+            response_model: Model the endpoint's response decodes into in typed mode.
+            typed: True/False to override the client's ``typed`` setting for this
+                call, or a model class (pydantic or msgspec ``Struct``) to decode into.
+            priority: Scheduler priority class of this call; defaults to the
+                `pydify_plus.scheduler.priority` context.
+            deadline: Seconds the whole call (all attempts, backoff and queueing)
+                may take; the `pydify_plus.deadline.deadline` context applies too.
+            idempotency_key: ``Idempotency-Key`` of this call, sent on every attempt
+                and looked up in the journal. Defaults to a key derived in an
+                `pydify_plus.idempotency.idempotency_scope`, or a random one when
+                ``idempotency_keys`` is on. The call is retried after being sent
+                only when ``idempotency_keys`` is on.
 
         Returns:
-            The API response as a dictionary or string.
+            The API response as a dictionary or string, or a model instance in typed mode.
 
         Raises:
             DifyAuthError: If authentication fails (401).
@@ -118,120 +395,219 @@ class AsyncClient(BaseClient):
             DifyServerError: For server errors (5xx).
             DifyConnectionError: For connection errors.
             DifyTimeoutError: For timeout errors.
+            DifyDeadlineExceeded: If the deadline passed during the last attempt or while queued.
         """
         if not self._cli:
-            self._cli = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+            self._cli = self._new_http_client()
 
         url = self._build_url(path)
-        headers = self._build_headers(api_key_name=api_key_name)
-        if files:
-            headers.pop("Content-Type", None)
-
-        _timeout = timeout if timeout is not None else self.timeout
-        _retries = retries if retries is not None else self.retries
+        headers = self._build_headers(api_key_name=api_key_name, content_type=not files)
+
+        # Encoded once and reused across retries.
+        content = self.codec.dumps(json) if json is not None and not files and not data else None
+        model = self._response_model(response_model, typed)
+        endpoint = resolve_endpoint(path)
+        key, journaled = idempotency_key, idempotency_key is not None
+        if key is None and method.upper() in MUTATING_METHODS:
+            scope = current_scope()
+            if scope is not None:
+                key = derive_key(scope, method, path, content=content, json=json if content is None else None, params=params, data=data, files=files)
+                journaled = True
+            elif self.idempotency_keys:
+                key = new_key()
+        if key is not None:
+            if journaled and self.journal is not None:
+                recorded = self.journal.get(key)
+                if recorded is not None:
+                    self.metrics.inc("dify_client_deduplicated_total", (("endpoint", endpoint),))
+                    self.logger.info(f"Skipping {method} {endpoint}: {key} already completed")
+                    return self._decode(httpx.Response(200, content=recorded), model)
+            headers = {**headers, IDEMPOTENCY_HEADER: key}
+        _timeout, _retries, retry_after_send = self._policy(method, path, endpoint, timeout, retries, key is not None and self.idempotency_keys)
+        at = resolve_deadline(deadline)
+        debug = self.logger.isEnabledFor(logging.DEBUG) and self._log_sampler.sample(endpoint)
+        balancer = self.balancer
+        tried: List[Upstream] = []
         
         last_exc = None
 
         for attempt in range(_retries + 1):
+            ticket, permit = await self._admit(endpoint, api_key_name, priority, at)
+            upstream = None
+            if balancer is not None:
+                # Each attempt goes to an upstream this call has not tried, if any is left.
+                upstream = balancer.pick(tried)
+                tried.append(upstream)
+                url = self._build_url(path, upstream.prefix)
+                balancer.start(upstream)
+            ctx = self._new_context(method, url, endpoint, attempt + 1, _retries + 1)
+            self._emit("on_request_start", ctx)
+            latency = None
+            upstream_failed = dropped = sent = False
+            budget = None
+            attempt_timeout = _timeout
             try:
+                if at is not None:
+                    share = attempt_budget(at, attempt == _retries)
+                    if share <= 0:
+                        raise TimeoutError
+                    # Once sent, a call that is not retried has no later attempt to save time for.
+                    budget = share if retry_after_send else attempt_budget(at, True)
+                    attempt_timeout = cap_timeout(_timeout, budget, share)
                 request_id = self._build_request_id()
-                self.logger.debug(f"{request_id}: Making {method} request to {url} (attempt {attempt + 1}/{_retries + 1})")
-                self.logger.debug(f"{request_id}: Request headers: {headers}")
-                self.logger.debug(f"{request_id}: Request JSON: {json}" if json else f"{request_id}: Request DATA: {data}")
-                resp = await self._cli.request(
-                    method,
-                    url,
-                    headers=headers,
-                    json=json,
-                    data=data,
-                    params=params,
-                    files=files,
-                    timeout=_timeout,
-                )
+                ctx.request_id = request_id
+                if debug:
+                    self.logger.debug(
+                        "%s: Making %s request to %s (attempt %d/%d) headers=%s json=%s data=%s files=%s",
+                        request_id, method, url, attempt + 1, _retries + 1, redact_headers(headers),
+                        summarize(json), summarize(data), summarize_files(files),
+                        extra=log_extra(ctx),
+                    )
+                # Cancelled cleanly (connection released) if the budget runs out.
+                async with asyncio.timeout(budget):
+                    resp = await self._cli.request(
+                        method,
+                        url,
+                        headers=headers,
+                        content=content,
+                        json=json if content is None else None,
+                        data=data,
+                        params=params,
+                        files=files,
+                        timeout=attempt_timeout,
+                        extensions={"trace": ctx.trace},
+                    )
+                latency = ctx.elapsed
 
                 # Extract request ID from headers for better error reporting
                 request_id = resp.headers.get("x-request-id", None) or request_id
+                ctx.request_id = request_id
+                ctx.status_code = resp.status_code
+                ctx.bytes_out = _content_length(resp.request)
+                ctx.bytes_in = len(resp.content)
+                if ctx.phases is not None:
+                    ctx.phases.finish()
+                    resp.extensions[RESPONSE_EXTENSION] = ctx.phases
+                self._emit("on_response", ctx, resp)
 
                 resp.raise_for_status()
 
-                self.logger.debug(f"Request successful (status: {resp.status_code})")
+                if debug:
+                    self.logger.debug(
+                        "%s: Request successful (status: %d, %d bytes, %.3fs)",
+                        request_id, resp.status_code, ctx.bytes_in, ctx.elapsed,
+                        extra=log_extra(ctx, dify_status=resp.status_code, dify_elapsed=ctx.elapsed),
+                    )
 
-                try:
-                    return resp.json()
-                except Exception:
-                    return resp.text
+                if journaled and self.journal is not None:
+                    self.journal.record(key, resp.content)
+                return self._decode(resp, model)
 
             except httpx.TimeoutException as e:
+                upstream_failed = dropped = True
+                sent = not isinstance(e, (httpx.ConnectTimeout, httpx.PoolTimeout))
                 last_exc = DifyTimeoutError(f"Request timed out after {_timeout} seconds")
                 self.logger.warning(f"Request timeout (attempt {attempt + 1}/{_retries + 1})")
 
+            except TimeoutError:
+                upstream_failed = dropped = sent = budget is not None and budget > 0
+                last_exc = DifyDeadlineExceeded(f"Deadline exceeded after {ctx.elapsed:.3f}s (attempt {attempt + 1}/{_retries + 1})")
+                self.logger.warning(f"Attempt {attempt + 1}/{_retries + 1} ran out of its deadline budget")
+
             except httpx.ConnectError as e:
+                upstream_failed = True
                 last_exc = DifyConnectionError(f"Connection error: {e}")
                 self.logger.warning(f"Connection error (attempt {attempt + 1}/{_retries + 1}): {e}")
 
             except httpx.HTTPStatusError as e:
-                request_id = e.response.headers.get("x-request-id") if e.response else None
-            
-                try:
-                    data = e.response.json()
-                except Exception:
-                    data = e.response.text
-        
-                status_code = e.response.status_code
-
-                if status_code == 401:
-                    raise DifyAuthError(status_code=status_code, body=data, request_id=request_id) from e
-                elif status_code == 404:
-                    raise DifyNotFoundError(status_code=status_code, body=data, request_id=request_id) from e
-                elif status_code == 429:
-                    raise DifyRateLimitError(status_code=status_code, body=data, request_id=request_id) from e
-                elif status_code == 422:
-                    raise DifyValidationError(status_code=status_code, body=data, request_id=request_id) from e
-                elif 500 <= status_code < 600:
-                    raise DifyServerError(status_code=status_code, body=data, request_id=request_id) from e
-                else:
-                    raise DifyAPIError(status_code=status_code, body=data, request_id=request_id) from e
+                error = self._status_error(e)
+                upstream_failed = e.response.status_code in UNHEALTHY_STATUS
+                dropped = e.response.status_code in DROP_STATUS
+                # With several upstreams, idempotent calls fail over on gateway errors.
+                if not (upstream_failed and upstream is not None and method.upper() in IDEMPOTENT_METHODS and attempt < _retries):
+                    raise self._fail(ctx, error) from e
+                last_exc = error
+                self.logger.warning(f"{upstream.url} returned {e.response.status_code} (attempt {attempt + 1}/{_retries + 1})")
+
+            except Exception as e:
+                self._fail(ctx, e)
+                raise
+
+            finally:
+                if upstream is not None:
+                    balancer.finish(upstream, latency, upstream_failed)
+                if permit is not None:
+                    permit.release(latency, dropped)
+                if ticket is not None:
+                    ticket.release()
+
+            if last_exc and sent and not retry_after_send and attempt < _retries:
+                # The server may have acted on the request; sending it again could repeat that.
+                self.logger.warning(f"Not retrying {method} {endpoint}: it failed after the request was sent")
+                break
 
             # If we have an exception and there are retries left, wait before retrying
             if last_exc and attempt < _retries:
-                delay = self.retry_backoff_factor * (2 ** attempt)
+                # Failing over to an untried upstream does not need to back off.
+                untried = balancer is not None and len(tried) < len(balancer)
+                delay = 0.0 if untried else self.retry_backoff_factor * (2 ** attempt)
+                if at is not None and time.monotonic() + delay >= at:
+                    self.logger.warning(f"Not retrying {method} {endpoint}: the deadline leaves no time for another attempt")
+                    break
+                if ctx.phases is not None:
+                    ctx.phases.finish()
+                self._emit("on_retry", ctx, last_exc, delay)
                 self.logger.info(f"Retrying in {delay:.2f} seconds...")
                 await asyncio.sleep(delay)
 
         # If we've exhausted all retries, raise the last exception
         if last_exc:
-            raise last_exc
+            raise self._fail(ctx, last_exc)
 
         # This should never happen, but just in case
         raise DifyAPIError("Request failed after retries")
 
-    async def _stream_request(
+    def _stream_request(
         self,
         method: str,
         path: str,
         *,
         json: Optional[dict] = None,
         params: Optional[dict] = None,
-        timeout: Optional[float] = None,
+        timeout: Union[float, httpx.Timeout, None] = None,
         retries: Optional[int] = None,
-        api_key_name: Optional[str] = None
-    ) -> AsyncIterator[ServerSentEvent]:
+        api_key_name: Optional[str] = None,
+        priority: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> "EventStream":
         """Make a streaming request using Server-Sent Events.
         
         This method is used for endpoints that support streaming responses,
         such as chat completions and text generation. It handles authentication,
         retries, and error handling similar to regular requests.
 
+        The returned stream records connect, header, first-event and
+        first-token times, inter-event gaps and event/byte counts in its
+        `timings` attribute; when the stream ends they are aggregated per
+        endpoint template into `self.metrics`.
+
         Args:
             method: HTTP method (GET, POST, etc.).
             path: API endpoint path.
             json: JSON payload for the request.
             params: Query parameters.
-            timeout: Request timeout in seconds. Overrides client default.
-            retries: Number of retry attempts. Overrides client default.
+            timeout: Request timeout in seconds or as `httpx.Timeout`. Overrides
+                ``endpoint_timeouts``, the endpoint profile and the client default.
+            retries: Number of retry attempts. Overrides the endpoint profile and
+                the client default.
+            priority: Scheduler priority class of this stream; defaults to the
+                `pydify_plus.scheduler.priority` context when the stream starts.
+            deadline: Seconds until the stream must be established, including
+                retries and queueing; the `pydify_plus.deadline.deadline` context
+                applies too. Events are not cut off once the stream is open.
             
-        Yields:
-            ServerSentEvent objects from the streaming response.
+        Returns:
+            An `EventStream` yielding ServerSentEvent objects from the streaming response.
 
         Raises:
             DifyAuthError: If authentication fails (401).
@@ -244,99 +620,245 @@ class AsyncClient(BaseClient):
             DifyAPIError: For other API errors (4xx, 5xx).
 
         Example:
-            >>> async for event in client.stream_request( 
+            >>> stream = client._stream_request(
             ...     "POST",
-            ...     "/v1/chat-messages/stream",
-            ...     json={"model": "gpt-3.5-turbo", "messages": [...]}
-            ... ):
+            ...     "/v1/chat-messages",
+            ...     json={"query": "Hello", "response_mode": "streaming", "user": "abc-123"}
+            ... )
+            >>> async for event in stream:
             ...     print(f"Event: {event.event}, Data: {event.data}")
+            >>> print(stream.timings.first_token)
         """
+        timings = StreamTimings(endpoint=resolve_endpoint(path))
+        # Captured now: the generator body runs in whatever context iterates it.
+        if priority is None and self.scheduler is not None:
+            priority = self.scheduler.resolve()
+        at = resolve_deadline(deadline)
+        events = self._iter_sse(
+            method,
+            path,
+            timings,
+            json=json,
+            params=params,
+            timeout=timeout,
+            retries=retries,
+            api_key_name=api_key_name,
+            priority=priority,
+            deadline_at=at,
+        )
+        return EventStream(events, timings)
+
+    async def _iter_sse(
+        self,
+        method: str,
+        path: str,
+        timings: StreamTimings,
+        *,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+        timeout: Union[float, httpx.Timeout, None] = None,
+        retries: Optional[int] = None,
+        api_key_name: Optional[str] = None,
+        priority: Optional[str] = None,
+        deadline_at: Optional[float] = None,
+    ) -> AsyncIterator["ServerSentEvent"]:
+        """Generator behind `_stream_request`, recording into ``timings``."""
         if not self._cli:
-            self._cli = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+            self._cli = self._new_http_client()
 
         url = self._build_url(path)
         headers = self._build_headers(api_key_name=api_key_name)
-        _timeout = timeout if timeout is not None else self.timeout
-        _retries = retries if retries is not None else self.retries
+        content = self.codec.dumps(json) if json is not None else None
+        _timeout, _retries, retry_after_send = self._policy(method, path, timings.endpoint, timeout, retries)
+        debug = self.logger.isEnabledFor(logging.DEBUG) and self._log_sampler.sample(timings.endpoint)
         
         last_exc = None
-
-        for attempt in range(_retries + 1):
-            try:
-                self.logger.debug(f"Making streaming {method} request to {url} (attempt {attempt + 1}/{_retries + 1})")
-                self.logger.debug(f"Request headers: {headers}")
-                self.logger.debug(f"Request JSON: {json}")
-                async with aconnect_sse(
-                    self._cli,
-                    method,
-                    url,
-                    headers=headers,
-                    json=json,
-                    params=params,
-                    timeout=_timeout,
-                ) as event_source:
-                    self.logger.debug(f"Streaming connection established successfully (attempt {attempt + 1})")
-                    
-                    # Extract request ID from response headers for better error reporting
-                    # Note: For SSE, we get the response after establishing the connection
-                    try:
-                        response = event_source.response
-                        request_id = response.headers.get("x-request-id") if response else None
-                        self.logger.debug(f"Request ID: {request_id}")
-                    except Exception:
-                        request_id = None
-                    
-                    async for event in event_source.aiter_sse():
-                        yield event
-
-                    # If we reach here, the stream completed successfully
-                    self.logger.debug(f"Streaming request completed successfully (attempt {attempt + 1})")
-                    return
-
-            except httpx.TimeoutException as e:
-                last_exc = DifyTimeoutError(f"Streaming request timed out after {_timeout} seconds")
-                self.logger.warning(f"Streaming request timeout (attempt {attempt + 1}/{_retries + 1})")
-
-            except httpx.ConnectError as e:
-                last_exc = DifyConnectionError(f"Connection error: {e}")
-                self.logger.warning(f"Connection error (attempt {attempt + 1}/{_retries + 1}): {e}")
-
-            except httpx.HTTPStatusError as e:
-                request_id = e.response.headers.get("x-request-id") if e.response else None
-            
+        num_bytes = 0
+        completed = False
+        balancer = self.balancer
+        tried: List[Upstream] = []
+        pinned = False
+
+        try:
+            for attempt in range(_retries + 1):
+                timings.attempts = attempt + 1
+                # Admission is held for the whole stream.
+                ticket, permit = await self._admit(timings.endpoint, api_key_name, priority, deadline_at)
+                upstream = None
+                if balancer is not None:
+                    # A stream sticks to the upstream that accepted it; until
+                    # then, retries may move to another one.
+                    upstream = tried[-1] if pinned else balancer.pick(tried)
+                    tried.append(upstream)
+                    url = self._build_url(path, upstream.prefix)
+                    balancer.start(upstream)
+                ctx = self._new_context(method, url, timings.endpoint, attempt + 1, _retries + 1, streaming=True)
+                self._emit("on_request_start", ctx)
+                latency = None
+                upstream_failed = dropped = sent = False
+                attempt_timeout = _timeout
                 try:
-                    data = e.response.json()
-                except Exception:
-                    data = e.response.text
-        
-                status_code = e.response.status_code
-
-                if status_code == 401:
-                    raise DifyAuthError(status_code=status_code, body=data, request_id=request_id) from e
-                elif status_code == 404:
-                    raise DifyNotFoundError(status_code=status_code, body=data, request_id=request_id) from e
-                elif status_code == 429:
-                    raise DifyRateLimitError(status_code=status_code, body=data, request_id=request_id) from e
-                elif status_code == 422:
-                    raise DifyValidationError(status_code=status_code, body=data, request_id=request_id) from e
-                elif 500 <= status_code < 600:
-                    raise DifyServerError(status_code=status_code, body=data, request_id=request_id) from e
-                else:
-                    raise DifyAPIError(status_code=status_code, body=data, request_id=request_id) from e
+                    if deadline_at is not None:
+                        budget = attempt_budget(deadline_at, attempt == _retries)
+                        if budget <= 0:
+                            raise TimeoutError
+                        attempt_timeout = cap_timeout(_timeout, budget)
+                    if debug:
+                        self.logger.debug(
+                            "Making streaming %s request to %s (attempt %d/%d) headers=%s json=%s",
+                            method, url, attempt + 1, _retries + 1, redact_headers(headers), summarize(json),
+                            extra=log_extra(ctx),
+                        )
+                    async with aconnect_sse(
+                        self._cli,
+                        method,
+                        url,
+                        headers=dict(headers),  # aconnect_sse adds its Accept headers in place
+                        content=content,
+                        params=params,
+                        timeout=attempt_timeout,
+                        extensions={"trace": ctx.trace},
+                    ) as event_source:
+                        timings.on_headers(ctx)
+                        latency = ctx.elapsed
+                        
+                        # Extract request ID from response headers for better error reporting
+                        # Note: For SSE, we get the response after establishing the connection
+                        try:
+                            response = event_source.response
+                            request_id = response.headers.get("x-request-id") if response else None
+                        except Exception:
+                            response = None
+                            request_id = None
+
+                        if response is not None:
+                            ctx.request_id = request_id
+                            ctx.status_code = response.status_code
+                            pinned = not response.is_error
+                            if debug:
+                                self.logger.debug(
+                                    "%s: Streaming connection established (status: %d, attempt %d, %.3fs)",
+                                    request_id, response.status_code, attempt + 1, ctx.elapsed,
+                                    extra=log_extra(ctx, dify_status=response.status_code, dify_elapsed=ctx.elapsed),
+                                )
+                            ctx.bytes_out = _content_length(response.request)
+                            if ctx.phases is not None:
+                                response.extensions[RESPONSE_EXTENSION] = ctx.phases
+                            self._emit("on_response", ctx, response)
+                            if response.is_error:
+                                # Error bodies are JSON, not an event stream.
+                                await response.aread()
+                                response.raise_for_status()
+
+                        stream_callbacks = self._hook_callbacks["on_stream_event"]
+                        try:
+                            async for event in event_source.aiter_sse():
+                                timings.on_event(event)
+                                if stream_callbacks:
+                                    self._emit("on_stream_event", ctx, event)
+                                yield event
+                        finally:
+                            num_bytes = getattr(response, "num_bytes_downloaded", 0) or 0
+
+                        # If we reach here, the stream completed successfully
+                        if debug:
+                            self.logger.debug(
+                                "%s: Streaming request completed (%d events, %.3fs)",
+                                request_id, timings.events, timings.elapsed,
+                                extra=log_extra(ctx, dify_elapsed=timings.elapsed),
+                            )
+                        completed = True
+                        return
+
+                except httpx.TimeoutException as e:
+                    upstream_failed = dropped = True
+                    sent = not isinstance(e, (httpx.ConnectTimeout, httpx.PoolTimeout))
+                    last_exc = DifyTimeoutError(f"Streaming request timed out after {_timeout} seconds")
+                    self.logger.warning(f"Streaming request timeout (attempt {attempt + 1}/{_retries + 1})")
+
+                except TimeoutError:
+                    last_exc = DifyDeadlineExceeded(f"Deadline exceeded before the stream was established (attempt {attempt + 1}/{_retries + 1})")
+
+                except httpx.ConnectError as e:
+                    upstream_failed = True
+                    last_exc = DifyConnectionError(f"Connection error: {e}")
+                    self.logger.warning(f"Connection error (attempt {attempt + 1}/{_retries + 1}): {e}")
+
+                except httpx.HTTPStatusError as e:
+                    upstream_failed = e.response.status_code in UNHEALTHY_STATUS
+                    dropped = e.response.status_code in DROP_STATUS
+                    raise self._fail(ctx, self._status_error(e)) from e
+
+                except Exception as e:
+                    # E.g. the connection was reset mid-stream.
+                    sent = True
+                    last_exc = DifyAPIError(f"Unexpected streaming error: {e}")
+                    self.logger.warning(f"Unexpected streaming error (attempt {attempt + 1}/{_retries + 1}): {e}")
+
+                finally:
+                    if upstream is not None:
+                        balancer.finish(upstream, latency, upstream_failed)
+                    if permit is not None:
+                        permit.release(latency, dropped)
+                    if ticket is not None:
+                        ticket.release()
+
+                if last_exc and sent and not retry_after_send and attempt < _retries:
+                    self.logger.warning(f"Not retrying stream to {timings.endpoint}: it failed after the request was sent")
+                    break
+
+                # If we have an exception and there are retries left, wait before retrying
+                if last_exc and attempt < _retries:
+                    untried = balancer is not None and not pinned and len(tried) < len(balancer)
+                    delay = 0.0 if untried else self.retry_backoff_factor * (2 ** attempt)
+                    if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                        self.logger.warning(f"Not retrying stream to {timings.endpoint}: the deadline leaves no time for another attempt")
+                        break
+                    if ctx.phases is not None:
+                        ctx.phases.finish()
+                    self._emit("on_retry", ctx, last_exc, delay)
+                    self.logger.info(f"Retrying streaming request in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+
+            # If we've exhausted all retries, raise the last exception
+            if last_exc:
+                raise self._fail(ctx, last_exc)
+
+            # This should never happen, but just in case
+            raise DifyAPIError("Streaming request failed after retries")
+        finally:
+            timings.finish(num_bytes=num_bytes, completed=completed)
+            self.metrics.record_stream(timings)
+
+
+def _content_length(request: Optional[httpx.Request]) -> Optional[int]:
+    """Return the request body size from its Content-Length header, if set."""
+    if request is None:
+        return None
+    value = request.headers.get("content-length")
+    return int(value) if value else None
+
+
+class EventStream:
+    """Async iterator over the events of one SSE stream.
+
+    Returned by `AsyncClient._stream_request`. Iterate it like any async
+    iterator; `timings` is filled in as events arrive and is final once the
+    stream has ended or been closed.
+
+    Attributes:
+        timings: The `StreamTimings` record of this stream.
+    """
 
-            except Exception as e:
-                last_exc = DifyAPIError(f"Unexpected streaming error: {e}")
-                self.logger.warning(f"Unexpected streaming error (attempt {attempt + 1}/{_retries + 1}): {e}")
+    def __init__(self, events: AsyncIterator["ServerSentEvent"], timings: StreamTimings):
+        self._events = events
+        self.timings = timings
 
-            # If we have an exception and there are retries left, wait before retrying
-            if last_exc and attempt < _retries:
-                delay = self.retry_backoff_factor * (2 ** attempt)
-                self.logger.info(f"Retrying streaming request in {delay:.2f} seconds...")
-                await asyncio.sleep(delay)
+    def __aiter__(self) -> "EventStream":
+        return self
 
-        # If we've exhausted all retries, raise the last exception
-        if last_exc:
-            raise last_exc
+    async def __anext__(self) -> "ServerSentEvent":
+        return await self._events.__anext__()
 
-        # This should never happen, but just in case
-        raise DifyAPIError("Streaming request failed after retries")
+    async def aclose(self) -> None:
+        await self._events.aclose()
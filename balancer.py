@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""Client-side load balancing over several Dify API replicas.
+
+Passing a list of base URLs to a client spreads its requests over them:
+
+    >>> client = AsyncClient(["https://dify-a.internal", "https://dify-b.internal"], api_key, balance="ewma")
+
+Each request attempt goes to the best available upstream:
+
+- ``"least_outstanding"`` picks the upstream with the fewest requests in
+  flight from this client.
+- ``"ewma"`` picks the lowest exponentially weighted moving average of
+  response latency, multiplied by the requests in flight ("peak EWMA"), so
+  a replica that slows down sheds load before it starts failing.
+
+Ties rotate between upstreams. Health checking is passive: connection
+errors, timeouts and 502/503/504 responses count as failures, and an
+upstream with ``eject_after`` consecutive failures is ejected for
+``eject_time`` seconds, doubling on every ejection in a row up to
+``max_eject_time``. When every upstream is ejected, requests go to them
+anyway rather than failing outright.
+
+A failed attempt is retried on an upstream the call has not tried yet.
+Attempts that never reached the server (connection errors, connect and
+pool timeouts) fail over for any method; 502/503/504 responses fail over
+for idempotent methods only. Read and write timeouts fail over only for
+calls that may be retried once sent: idempotent methods, keyed calls of
+a client with ``idempotency_keys=True`` and endpoints whose profile sets
+``retry_after_send`` (see `pydify_plus.profiles`). Streams stay on the
+upstream that accepted them.
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+STRATEGIES = ("least_outstanding", "ewma")
+
+# Responses that say more about the replica than about the request.
+UNHEALTHY_STATUS = frozenset({502, 503, 504})
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class Upstream:
+    """One base URL of a `LoadBalancer` and its live statistics."""
+
+    __slots__ = ("url", "prefix", "outstanding", "ewma", "failures", "ejections", "ejected_until", "requests", "errors")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.prefix = url.rstrip("/")
+        self.outstanding = 0
+        self.ewma = 0.0
+        self.failures = 0  # consecutive
+        self.ejections = 0  # consecutive
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def __repr__(self) -> str:
+        return f"<Upstream {self.url} outstanding={self.outstanding} ewma={self.ewma * 1000:.1f}ms>"
+
+
+class LoadBalancer:
+    """Chooses an upstream per request attempt and tracks upstream health.
+
+    Args:
+        urls: Base URLs of the replicas.
+        strategy: "least_outstanding" or "ewma". Defaults to "least_outstanding".
+        alpha: Weight of the newest sample in the latency average. Defaults to 0.3.
+        eject_after: Consecutive failures that eject an upstream. Defaults to 3.
+        eject_time: Seconds of the first ejection. Defaults to 10.0.
+        max_eject_time: Upper bound of the doubling ejection time. Defaults to 300.0.
+
+    Raises:
+        ValueError: If ``urls`` is empty or the strategy is unknown.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        strategy: str = "least_outstanding",
+        *,
+        alpha: float = 0.3,
+        eject_after: int = 3,
+        eject_time: float = 10.0,
+        max_eject_time: float = 300.0,
+    ):
+        if not urls:
+            raise ValueError("At least one upstream URL is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy {strategy!r}; expected one of {STRATEGIES}")
+        self.upstreams: List[Upstream] = [Upstream(url) for url in urls]
+        self.strategy = strategy
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.eject_time = eject_time
+        self.max_eject_time = max_eject_time
+        self._clock: Callable[[], float] = time.monotonic
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.upstreams)
+
+    def pick(self, exclude: Sequence[Upstream] = ()) -> Upstream:
+        """The upstream for the next attempt, avoiding ``exclude`` and ejected upstreams when possible."""
+        now = self._clock()
+        upstreams = self.upstreams
+        candidates = [u for u in upstreams if u.ejected_until <= now and u not in exclude]
+        if not candidates:
+            candidates = [u for u in upstreams if u.ejected_until <= now] or [u for u in upstreams if u not in exclude] or upstreams
+        # Start the scan at a rotating offset so ties are spread evenly.
+        start = self._next % len(candidates)
+        self._next += 1
+        best, best_score = None, math.inf
+        for i in range(len(candidates)):
+            upstream = candidates[(start + i) % len(candidates)]
+            score = self._score(upstream)
+            if score < best_score:
+                best, best_score = upstream, score
+        return best
+
+    def _score(self, upstream: Upstream) -> float:
+        if self.strategy == "ewma":
+            # An upstream without samples yet scores by its load alone.
+            return (upstream.ewma or 1e-6) * (upstream.outstanding + 1)
+        return upstream.outstanding
+
+    def start(self, upstream: Upstream) -> None:
+        """Count a request sent to ``upstream``; pair with `finish`."""
+        upstream.outstanding += 1
+        upstream.requests += 1
+
+    def finish(self, upstream: Upstream, latency: Optional[float] = None, failed: bool = False) -> None:
+        """Record the outcome of a request started with `start`.
+
+        Args:
+            upstream: The upstream the request went to.
+            latency: Seconds until the response arrived, if it did.
+            failed: Whether the attempt failed in a way that implicates the upstream.
+        """
+        upstream.outstanding -= 1
+        if latency is not None:
+            upstream.ewma = latency if not upstream.ewma else upstream.ewma + self.alpha * (latency - upstream.ewma)
+        if not failed:
+            upstream.failures = upstream.ejections = 0
+            return
+        upstream.errors += 1
+        upstream.failures += 1
+        if upstream.failures >= self.eject_after:
+            upstream.ejected_until = self._clock() + min(self.eject_time * 2 ** upstream.ejections, self.max_eject_time)
+            upstream.ejections += 1
+            upstream.failures = 0
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-upstream counters, latency average and ejection state."""
+        now = self._clock()
+        return [
+            {
+                "url": u.url,
+                "outstanding": u.outstanding,
+                "requests": u.requests,
+                "errors": u.errors,
+                "ewma": u.ewma,
+                "ejected": u.ejected_until > now,
+            }
+            for u in self.upstreams
+        ]
@@ -5,10 +5,15 @@
 # @LastEditors: 胖胖很瘦
 # @LastEditTime: 2025-11-25 18:01:58
 
-import abc, uuid
-from typing import Any, Optional
+import abc, itertools, os
+from functools import cached_property
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Sequence, Tuple, Union
 
-from .apis import chat, dataset, files, documents, blocks, tags, models, sessions, feedback, textgen, workflows, app_config
+from .codec import JSONCodec, get_codec
+
+if TYPE_CHECKING:
+    from .apis import chat, dataset, files, documents, blocks, tags, models, sessions, feedback, textgen, workflows, app_config
 
 
 API_KEY_NAME = "DIFY_API_KEY"
@@ -22,17 +27,27 @@ class BaseClient(abc.ABC):
 
     Subclasses must implement the `_arequest` abstract method.
     """
-    def __init__(self, base_url: str, api_key: dict[str, str] | str, timeout: float = 30.0, retries: int = 3, **kwargs):
+    def __init__(self, base_url: Union[str, Sequence[str]], api_key: dict[str, str] | str, timeout: float = 30.0, retries: int = 3, codec: Union[str, JSONCodec] = "auto", typed: bool = False, **kwargs):
         """Initialize the base client.
 
         Args:
-            base_url: The base URL of the Dify API.
+            base_url: The base URL of the Dify API, or a list of replica base
+                URLs to balance requests over (see `pydify_plus.balancer`).
             api_key: Your Dify API key.
             timeout: Request timeout in seconds. Defaults to 30.0.
             retries: Number of retry attempts for failed requests. Defaults to 3.
+            codec: JSON codec for request bodies, responses and SSE data: "auto"
+                (fastest installed backend), "orjson", "msgspec", "json" or a
+                `JSONCodec` instance. Defaults to "auto".
+            typed: Decode responses of methods that have a response model
+                (e.g. ``documents.list``) into that model instead of a dict.
+                Methods also take a per-call ``typed`` argument. Defaults to False.
             **kwargs: Additional keyword arguments (currently unused).
         """
         self.base_url = base_url
+        self._headers: Dict[Tuple[str, bool], Tuple[str, Mapping[str, str]]] = {}
+        self._request_id_prefix = f"{os.urandom(8).hex()}-"
+        self._request_ids = itertools.count(1)
         if isinstance(api_key, str):
             api_key = {API_KEY_NAME: api_key}
 
@@ -42,42 +57,77 @@ class BaseClient(abc.ABC):
         self.api_key = api_key
         self.timeout = timeout
         self.retries = retries
-        self._attach_api_modules()
-
-    def _build_headers(self, api_key_name: str = API_KEY_NAME) -> dict:
+        self.codec = get_codec(codec)
+        self.typed = typed
+
+    @property
+    def base_url(self) -> str:
+        """The (first) base URL; all of them are in ``base_urls``."""
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, value: Union[str, Sequence[str]]) -> None:
+        urls = (value,) if isinstance(value, str) else tuple(value)
+        if not urls:
+            raise ValueError("base_url must not be empty")
+        self.base_urls = urls
+        self._base_url = urls[0]
+        self._url_prefix = urls[0].rstrip("/")
+
+    def _build_headers(self, api_key_name: str = API_KEY_NAME, content_type: bool = True) -> Mapping[str, str]:
         """Build the HTTP headers for API requests.
 
+        Header sets are cached per key name and rebuilt only when the key
+        changes. The returned mapping is read-only; copy it to modify.
+
+        Args:
+            api_key_name: Which entry of ``api_key`` to authenticate with.
+            content_type: Include the JSON Content-Type header (omitted for
+                multipart uploads).
+
         Returns:
-            A dictionary containing the Authorization and Content-Type headers.
+            A mapping containing the Authorization and Content-Type headers.
         """
         api_key_name = api_key_name or API_KEY_NAME
         api_key = self.api_key.get(api_key_name, None)
+        cached = self._headers.get((api_key_name, content_type))
+        if cached is not None and cached[0] == api_key:
+            return cached[1]
         if not api_key:
             raise ValueError(f"{api_key_name} environment variable not set")
-        return {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        headers = {"Authorization": f"Bearer {api_key}"}
+        if content_type:
+            headers["Content-Type"] = "application/json"
+        headers = MappingProxyType(headers)
+        self._headers[(api_key_name, content_type)] = (api_key, headers)
+        return headers
 
     def _build_request_id(self) -> str:
         """Build a unique request ID for each API request.
 
+        IDs are a random per-client prefix plus a counter, which is much
+        cheaper than a UUID per request.
+
         Returns:
             A string representing a unique request ID.
         """
-        return str(uuid.uuid4())
+        return f"{self._request_id_prefix}{next(self._request_ids)}"
 
 
-    def _build_url(self, path: str) -> str:
+    def _build_url(self, path: str, prefix: Optional[str] = None) -> str:
         """Build the full URL for an API endpoint.
 
         Args:
             path: The API endpoint path.
+            prefix: Base URL without trailing slash; defaults to ``base_url``.
 
         Returns:
             The full URL combining base URL and endpoint path.
         """
-        return f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+        prefix = self._url_prefix if prefix is None else prefix
+        if path.startswith("/"):
+            return prefix + path
+        return f"{prefix}/{path}"
 
     def _arequest(
         self,
@@ -98,21 +148,70 @@ class BaseClient(abc.ABC):
         """
         raise NotImplementedError
 
-    def _attach_api_modules(self):
-        """Attach all API modules to the client instance.
-
-        This method creates instances of all API modules and attaches them
-        as attributes to the client, making them accessible via dot notation.
-        """
-        self.chat = chat.ChatApi(self)
-        self.dataset = dataset.DatasetApi(self)
-        self.files = files.FilesApi(self)
-        self.documents = documents.DocumentsApi(self)
-        self.blocks = blocks.BlocksApi(self)
-        self.tags = tags.TagsApi(self)
-        self.models = models.ModelsApi(self)
-        self.sessions = sessions.SessionsApi(self)
-        self.feedback = feedback.FeedbackApi(self)
-        self.textgen = textgen.TextGenApi(self)
-        self.workflows = workflows.WorkflowsApi(self)
-        self.app_config = app_config.AppConfigApi(self)
\ No newline at end of file
+    @property
+    def _api_client(self) -> "BaseClient":
+        """The client the API modules send their requests through."""
+        return self
+
+    # API modules are created on first access, so constructing a client
+    # does not import or instantiate the ones it never uses.
+
+    @cached_property
+    def chat(self) -> "chat.ChatApi":
+        from .apis.chat import ChatApi
+        return ChatApi(self._api_client)
+
+    @cached_property
+    def dataset(self) -> "dataset.DatasetApi":
+        from .apis.dataset import DatasetApi
+        return DatasetApi(self._api_client)
+
+    @cached_property
+    def files(self) -> "files.FilesApi":
+        from .apis.files import FilesApi
+        return FilesApi(self._api_client)
+
+    @cached_property
+    def documents(self) -> "documents.DocumentsApi":
+        from .apis.documents import DocumentsApi
+        return DocumentsApi(self._api_client)
+
+    @cached_property
+    def blocks(self) -> "blocks.BlocksApi":
+        from .apis.blocks import BlocksApi
+        return BlocksApi(self._api_client)
+
+    @cached_property
+    def tags(self) -> "tags.TagsApi":
+        from .apis.tags import TagsApi
+        return TagsApi(self._api_client)
+
+    @cached_property
+    def models(self) -> "models.ModelsApi":
+        from .apis.models import ModelsApi
+        return ModelsApi(self._api_client)
+
+    @cached_property
+    def sessions(self) -> "sessions.SessionsApi":
+        from .apis.sessions import SessionsApi
+        return SessionsApi(self._api_client)
+
+    @cached_property
+    def feedback(self) -> "feedback.FeedbackApi":
+        from .apis.feedback import FeedbackApi
+        return FeedbackApi(self._api_client)
+
+    @cached_property
+    def textgen(self) -> "textgen.TextGenApi":
+        from .apis.textgen import TextGenApi
+        return TextGenApi(self._api_client)
+
+    @cached_property
+    def workflows(self) -> "workflows.WorkflowsApi":
+        from .apis.workflows import WorkflowsApi
+        return WorkflowsApi(self._api_client)
+
+    @cached_property
+    def app_config(self) -> "app_config.AppConfigApi":
+        from .apis.app_config import AppConfigApi
+        return AppConfigApi(self._api_client)
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks for client overhead, SSE throughput, uploads and concurrency.
+
+The suite runs entirely offline, against an `httpx.MockTransport` or the
+`testing.MockDifyServer` stand-in, and writes JSON reports that can be
+compared between releases::
+
+    python -m pydify_plus.benchmarks --output baseline.json
+    python -m pydify_plus.benchmarks --output current.json --compare baseline.json
+
+From Python:
+
+    >>> from pydify_plus.benchmarks import BenchConfig, run_benchmarks
+    >>> report = run_benchmarks(BenchConfig.quick(), names=["arequest_overhead"])
+"""
+
+from .runner import BENCHMARKS, BenchConfig, BenchmarkResult, compare, load_report, run_benchmarks, write_report
+
+__all__ = ["BENCHMARKS", "BenchConfig", "BenchmarkResult", "compare", "load_report", "run_benchmarks", "write_report"]
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""Command line entry point: ``python -m pydify_plus.benchmarks``."""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .runner import (
+    BENCHMARKS,
+    TARGETS,
+    BenchConfig,
+    compare,
+    format_comparison,
+    format_results,
+    load_report,
+    run_benchmarks,
+    write_report,
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from . import cases  # noqa: F401  (registers the benchmarks for --help)
+
+    parser = argparse.ArgumentParser(description="Run the pydify_plus benchmark suite.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)}).")
+    parser.add_argument("--target", choices=TARGETS, default="mock")
+    parser.add_argument("--quick", action="store_true", help="Small iteration counts for a smoke run.")
+    parser.add_argument("--iterations", type=int)
+    parser.add_argument("--concurrency", type=lambda v: tuple(int(x) for x in v.split(",")), help="Comma-separated in-flight levels.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous JSON report.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression.")
+    args = parser.parse_args(argv)
+
+    config = BenchConfig.quick(target=args.target) if args.quick else BenchConfig(target=args.target)
+    if args.iterations:
+        config.iterations = args.iterations
+    if args.concurrency:
+        config.concurrency = args.concurrency
+
+    report = run_benchmarks(config, args.names)
+    print(format_results(report))
+    if args.output:
+        write_report(report, args.output)
+
+    if args.compare:
+        rows = compare(load_report(args.compare), report, threshold=args.threshold)
+        print()
+        print(format_comparison(rows))
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
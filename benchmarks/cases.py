@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+
+"""The benchmarks shipped with pydify_plus.
+
+Every benchmark is a plain function taking a `BenchConfig` and returning
+`BenchmarkResult` objects; async work is driven with `asyncio.run` inside
+the function so the sync client can be measured the same way.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, List
+
+from pydantic import BaseModel
+
+from ..async_client import AsyncClient
+from ..codec import decode_model, get_codec
+from ..lazy import LazyPage
+from ..metrics import resolve_endpoint
+from ..models import DocumentPage
+from ..routes import ROUTES
+from ..sync_client import Client
+from .runner import (
+    API_KEYS,
+    BASE_URL,
+    LIST_BODY,
+    BenchConfig,
+    BenchmarkResult,
+    bench_client,
+    benchmark,
+    document_page,
+    latency_summary,
+    mock_transport,
+    time_calls,
+)
+
+LIST_PATH = ROUTES["FEEDBACK_LIST"].path
+STREAM_PATH = ROUTES["CHAT_MESSAGES_STREAM"].path
+STREAM_PAYLOAD = {"query": "benchmark", "inputs": {}, "response_mode": "streaming", "user": "bench"}
+
+
+@benchmark("components")
+def components(config: BenchConfig) -> List[BenchmarkResult]:
+    """Cost of the per-call building blocks of `AsyncClient._arequest`."""
+    client = AsyncClient(BASE_URL, API_KEYS)
+    route = ROUTES["DOCUMENTS_DETAIL"]
+    path = route.format(dataset_id="d1", document_id="doc1")
+    iterations = config.iterations * 10
+    steps = {
+        "build_headers": lambda: client._build_headers(api_key_name="DIFY_DATASET_KEY"),
+        "format_route": lambda: route.format(dataset_id="d1", document_id="doc1"),
+        "build_url": lambda: client._build_url(path),
+        "request_id": client._build_request_id,
+        "resolve_endpoint": lambda: resolve_endpoint(str(path)),
+        "request_context": lambda: client._new_context("GET", path, LIST_PATH, 1, 4),
+        "json_decode": lambda: client.codec.loads(LIST_BODY),
+    }
+    results = []
+    for name, func in steps.items():
+        per_call = time_calls(func, iterations)
+        results.append(BenchmarkResult(
+            name=f"components[{name}]",
+            metrics={"ns_per_op": per_call * 1e9},
+            params={"iterations": iterations, "codec": client.codec.name},
+            primary="ns_per_op",
+            higher_is_better=False,
+        ))
+    return results
+
+
+class _DocumentStatus(BaseModel):
+    id: str
+    indexing_status: str
+
+
+class _DocumentStatusPage(BaseModel):
+    data: List[_DocumentStatus]
+    has_more: bool
+
+
+@benchmark("response_decoding")
+def response_decoding(config: BenchConfig) -> List[BenchmarkResult]:
+    """Decoding a large ``documents.list`` page into dicts, typed models and a `LazyPage`."""
+    body = document_page(config.page_items)
+    codec = get_codec()
+    decoders = {
+        f"dict[{codec.name}]": lambda: codec.loads(body),
+        "typed[DocumentPage]": lambda: decode_model(body, DocumentPage),
+        "typed[id+status]": lambda: decode_model(body, _DocumentStatusPage),
+        "lazy[first item]": lambda: LazyPage(body, codec)["data"][0],
+        "lazy[pluck id+status]": lambda: list(LazyPage(body, codec).pluck("id", "indexing_status")),
+    }
+    iterations = max(config.iterations // 100, 3)
+    results = []
+    for name, decode in decoders.items():
+        decode()
+        per_call = time_calls(decode, iterations)
+        tracemalloc.start()
+        try:
+            page = decode()
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del page
+        results.append(BenchmarkResult(
+            f"response_decoding[{name}]",
+            {"ms_per_page": per_call * 1e3, "retained_kb": retained / 1024, "peak_kb": peak / 1024},
+            {"items": config.page_items, "body_kb": len(body) // 1024},
+            primary="ms_per_page",
+            higher_is_better=False,
+        ))
+    return results
+
+
+async def _sequential(client: Any, config: BenchConfig) -> List[float]:
+    for _ in range(config.warmup):
+        await client._arequest("GET", LIST_PATH)
+    samples = []
+    for _ in range(config.iterations):
+        started = time.perf_counter()
+        await client._arequest("GET", LIST_PATH)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def _raw_httpx(client: Any, config: BenchConfig) -> List[float]:
+    url = client._build_url(LIST_PATH)
+    headers = client._build_headers()
+    for _ in range(config.warmup):
+        (await client._cli.get(url, headers=headers)).json()
+    samples = []
+    for _ in range(config.iterations):
+        started = time.perf_counter()
+        (await client._cli.get(url, headers=headers)).json()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@benchmark("arequest_overhead")
+def arequest_overhead(config: BenchConfig) -> List[BenchmarkResult]:
+    """Per-call cost of `_arequest` on top of a bare httpx call to the same transport."""
+    debug_logger = logging.getLogger("pydify_plus.benchmarks.debug")
+    debug_logger.setLevel(logging.DEBUG)
+    debug_logger.addHandler(logging.NullHandler())
+    debug_logger.propagate = False
+
+    async def run() -> List[BenchmarkResult]:
+        results = []
+        for variant, kwargs in (("default", {}), ("debug_logging", {"logger": debug_logger}), ("trace_phases", {"trace_phases": True})):
+            async with bench_client(config, **kwargs) as client:
+                raw = await _raw_httpx(client, config)
+                samples = await _sequential(client, config)
+            mean, raw_mean = sum(samples) / len(samples), sum(raw) / len(raw)
+            results.append(BenchmarkResult(
+                name=f"arequest_overhead[{variant}]",
+                metrics={
+                    "ops_per_sec": 1.0 / mean,
+                    **latency_summary(samples),
+                    "raw_httpx_us": raw_mean * 1e6,
+                    "overhead_us": (mean - raw_mean) * 1e6,
+                },
+                params={"target": config.target, "iterations": config.iterations},
+            ))
+        return results
+
+    return asyncio.run(run())
+
+
+@benchmark("sync_vs_async")
+def sync_vs_async(config: BenchConfig) -> List[BenchmarkResult]:
+    """Cost of the sync `Client` bridge (one event loop per call) versus `AsyncClient`."""
+    from ..testing import MockDifyServer
+
+    # The sync client cannot share a localhost server running on another loop.
+    target = "mock" if config.target == "localhost" else config.target
+
+    def transport() -> Any:
+        return mock_transport() if target == "mock" else MockDifyServer(seed=0).transport()
+
+    async def run_async() -> List[float]:
+        async with AsyncClient(BASE_URL, API_KEYS, retries=0, transport=transport()) as client:
+            return await _sequential(client, config)
+
+    async_samples = asyncio.run(run_async())
+
+    client = Client(BASE_URL, API_KEYS, retries=0, transport=transport())
+    for _ in range(config.warmup):
+        client._arequest("GET", LIST_PATH)
+    sync_samples = []
+    for _ in range(config.iterations):
+        started = time.perf_counter()
+        client._arequest("GET", LIST_PATH)
+        sync_samples.append(time.perf_counter() - started)
+
+    async_mean = sum(async_samples) / len(async_samples)
+    sync_mean = sum(sync_samples) / len(sync_samples)
+    params = {"target": target, "iterations": config.iterations}
+    return [
+        BenchmarkResult("sync_vs_async[async]", {"ops_per_sec": 1.0 / async_mean, **latency_summary(async_samples)}, params),
+        BenchmarkResult(
+            "sync_vs_async[sync]",
+            {"ops_per_sec": 1.0 / sync_mean, **latency_summary(sync_samples), "bridge_overhead_us": (sync_mean - async_mean) * 1e6},
+            params,
+        ),
+    ]
+
+
+@benchmark("sse_throughput")
+def sse_throughput(config: BenchConfig) -> List[BenchmarkResult]:
+    """Events per second parsed through `_stream_request`."""
+
+    async def run() -> BenchmarkResult:
+        best, timings = None, None
+        async with bench_client(config, sse_events=config.sse_events) as client:
+            for _ in range(3):
+                stream = client._stream_request("POST", STREAM_PATH, json=STREAM_PAYLOAD, api_key_name="DIFY_APP_KEY")
+                started = time.perf_counter()
+                count = 0
+                async for _ in stream:
+                    count += 1
+                elapsed = time.perf_counter() - started
+                if best is None or elapsed < best[0]:
+                    best, timings = (elapsed, count), stream.timings
+        elapsed, count = best
+        return BenchmarkResult(
+            "sse_throughput",
+            {
+                "events_per_sec": count / elapsed,
+                "first_event_ms": (timings.first_event or 0.0) * 1e3,
+                "events": float(count),
+                # MockTransport does not count downloaded bytes.
+                **({"mb_per_sec": timings.bytes / elapsed / 1e6} if timings.bytes else {}),
+            },
+            {"target": config.target, "sse_events": config.sse_events},
+            primary="events_per_sec",
+        )
+
+    return [asyncio.run(run())]
+
+
+@benchmark("upload_throughput")
+def upload_throughput(config: BenchConfig) -> List[BenchmarkResult]:
+    """Multipart upload throughput of the ``*_file_path`` methods."""
+    size = int(config.upload_mb * 1024 * 1024)
+    fd, path = tempfile.mkstemp(prefix="pydify-bench-", suffix=".bin")
+    try:
+        block = os.urandom(min(size, 1024 * 1024))
+        with os.fdopen(fd, "wb") as f:
+            for offset in range(0, size, len(block)):
+                f.write(block[: size - offset])
+
+        async def run() -> List[BenchmarkResult]:
+            methods = {
+                "files.upload_file_path": lambda c: c.files.upload_file_path(path),
+                "documents.create_from_file_path": lambda c: c.documents.create_from_file_path("dataset-1", file_path=path),
+            }
+            results = []
+            async with bench_client(config) as client:
+                for name, call in methods.items():
+                    samples = []
+                    for _ in range(3):
+                        started = time.perf_counter()
+                        await call(client)
+                        samples.append(time.perf_counter() - started)
+                    best = min(samples)
+                    results.append(BenchmarkResult(
+                        f"upload_throughput[{name}]",
+                        {"mb_per_sec": size / best / 1e6, "best_ms": best * 1e3},
+                        {"target": config.target, "bytes": size},
+                        primary="mb_per_sec",
+                    ))
+            return results
+
+        return asyncio.run(run())
+    finally:
+        os.unlink(path)
+
+
+@benchmark("concurrency")
+def concurrency(config: BenchConfig) -> List[BenchmarkResult]:
+    """Throughput and latency with 1..N requests in flight against a fixed server latency."""
+
+    async def level(client: Any, in_flight: int) -> BenchmarkResult:
+        samples: List[float] = []
+
+        async def worker() -> None:
+            for _ in range(config.requests_per_worker):
+                started = time.perf_counter()
+                await client._arequest("GET", LIST_PATH)
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(in_flight)))
+        elapsed = time.perf_counter() - started
+        throughput = len(samples) / elapsed
+        ideal = in_flight / config.latency if config.latency else None
+        metrics = {"ops_per_sec": throughput, **latency_summary(samples, unit="ms")}
+        if ideal:
+            metrics["efficiency"] = throughput / ideal
+        return BenchmarkResult(
+            f"concurrency[c={in_flight}]",
+            metrics,
+            {"target": config.target, "latency": config.latency, "requests": len(samples)},
+        )
+
+    async def run() -> List[BenchmarkResult]:
+        async with bench_client(config, latency=config.latency) as client:
+            return [await level(client, n) for n in config.concurrency]
+
+    return asyncio.run(run())
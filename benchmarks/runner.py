@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark registry, measurement helpers and JSON reports."""
+
+import asyncio
+import json as JSON
+import platform
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from ..config import API_ENDPOINTS
+
+BenchmarkFunc = Callable[["BenchConfig"], List["BenchmarkResult"]]
+
+BENCHMARKS: Dict[str, BenchmarkFunc] = {}
+
+TARGETS = ("mock", "inprocess", "localhost")
+
+BASE_URL = "http://bench.local"
+
+API_KEYS = {
+    "DIFY_API_KEY": "app-bench",
+    "DIFY_APP_KEY": "app-bench",
+    "DIFY_DATASET_KEY": "dataset-bench",
+    "DIFY_WORKFLOW_KEY": "app-bench",
+}
+
+
+def benchmark(name: str) -> Callable[[BenchmarkFunc], BenchmarkFunc]:
+    """Register a benchmark under ``name``."""
+
+    def decorator(func: BenchmarkFunc) -> BenchmarkFunc:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+@dataclass
+class BenchConfig:
+    """Benchmark parameters.
+
+    Attributes:
+        target: What the client talks to: "mock" (an `httpx.MockTransport`
+            with canned responses), "inprocess" (`testing.MockDifyServer`
+            through its in-process transport) or "localhost" (the same
+            server over real sockets).
+        iterations: Sequential calls per overhead measurement.
+        warmup: Calls made before measuring.
+        sse_events: Events per stream in the SSE benchmark.
+        upload_mb: File size for the upload benchmark.
+        concurrency: In-flight request levels for the scaling benchmark.
+        requests_per_worker: Calls each concurrent worker makes.
+        latency: Simulated server latency in the scaling benchmark, in seconds.
+        page_items: Items per page in the response decoding benchmark.
+    """
+
+    target: str = "mock"
+    iterations: int = 2000
+    warmup: int = 100
+    sse_events: int = 5000
+    upload_mb: float = 16.0
+    concurrency: Sequence[int] = (1, 10, 100, 1000)
+    requests_per_worker: int = 20
+    latency: float = 0.005
+    page_items: int = 5000
+
+    @classmethod
+    def quick(cls, **overrides: Any) -> "BenchConfig":
+        """A small configuration for smoke runs and tests."""
+        values = dict(iterations=50, warmup=5, sse_events=200, upload_mb=0.5, concurrency=(1, 10), requests_per_worker=3, latency=0.001, page_items=200)
+        values.update(overrides)
+        return cls(**values)
+
+
+@dataclass
+class BenchmarkResult:
+    """Outcome of one benchmark measurement.
+
+    Attributes:
+        name: Result name, e.g. "arequest_overhead" or "concurrency[c=100]".
+        metrics: Measured values; keys carry their unit as a suffix.
+        params: Parameters the measurement ran with.
+        primary: The metric compared between runs.
+        higher_is_better: Direction of ``primary``.
+    """
+
+    name: str
+    metrics: Dict[str, float]
+    params: Dict[str, Any] = field(default_factory=dict)
+    primary: str = "ops_per_sec"
+    higher_is_better: bool = True
+
+
+def latency_summary(samples: Sequence[float], unit: str = "us") -> Dict[str, float]:
+    """Mean and percentiles of ``samples`` (seconds), converted to ``unit``."""
+    scale = {"s": 1.0, "ms": 1e3, "us": 1e6, "ns": 1e9}[unit]
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pct(q: float) -> float:
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * scale
+
+    return {
+        f"mean_{unit}": statistics.fmean(ordered) * scale,
+        f"p50_{unit}": pct(0.50),
+        f"p90_{unit}": pct(0.90),
+        f"p99_{unit}": pct(0.99),
+        f"max_{unit}": ordered[-1] * scale,
+    }
+
+
+def time_calls(func: Callable[[], Any], iterations: int) -> float:
+    """Seconds per call of a synchronous ``func``."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def sse_body(num_events: int, answer: str = "token ") -> bytes:
+    """A Dify-like chat event stream of ``num_events`` message events plus message_end."""
+    event = JSON.dumps({"event": "message", "task_id": "task-1", "message_id": "message-1", "conversation_id": "conversation-1", "answer": answer}, separators=(",", ":"))
+    end = JSON.dumps({"event": "message_end", "task_id": "task-1", "message_id": "message-1", "metadata": {"usage": {"total_tokens": num_events}}})
+    return (f"data: {event}\n\n" * num_events + f"data: {end}\n\n").encode()
+
+
+LIST_BODY = JSON.dumps({
+    "data": [{"id": f"item-{i}", "rating": "like", "message_id": f"message-{i}", "created_at": 1700000000} for i in range(20)],
+    "has_more": False,
+    "limit": 20,
+    "page": 1,
+}).encode()
+
+
+def document_page(num_items: int) -> bytes:
+    """A ``documents.list`` response body with ``num_items`` documents."""
+    document = {
+        "position": 0, "data_source_type": "upload_file", "data_source_info": {"upload_file_id": "file-1"},
+        "dataset_process_rule_id": "rule-1", "created_from": "api", "created_by": "user-1", "created_at": 1700000000,
+        "tokens": 128, "indexing_status": "completed", "error": None, "enabled": True, "disabled_at": None,
+        "disabled_by": None, "archived": False, "display_status": "available", "word_count": 100, "hit_count": 0,
+        "doc_form": "text_model",
+    }
+    items = [{**document, "id": f"document-{i}", "name": f"document-{i}.txt", "position": i} for i in range(num_items)]
+    return JSON.dumps({"data": items, "has_more": False, "limit": num_items, "total": num_items, "page": 1}).encode()
+
+
+def mock_transport(latency: float = 0.0, sse_events: int = 32) -> httpx.MockTransport:
+    """An `httpx.MockTransport` serving canned Dify responses.
+
+    POSTs to the chat endpoint get an event stream of ``sse_events`` events;
+    everything else gets a small JSON list. Request bodies are read so
+    uploads are actually transferred.
+    """
+    stream_body = sse_body(sse_events)
+    stream_path = API_ENDPOINTS["CHAT_MESSAGES_STREAM"]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if latency:
+            await asyncio.sleep(latency)
+        if request.method == "POST" and request.url.path == stream_path:
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=stream_body)
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=LIST_BODY)
+
+    return httpx.MockTransport(handler)
+
+
+@asynccontextmanager
+async def bench_client(config: BenchConfig, *, latency: float = 0.0, sse_events: int = 32, **kwargs: Any) -> AsyncIterator[Any]:
+    """An `AsyncClient` connected to the configured target."""
+    from ..async_client import AsyncClient
+    from ..testing import Latency, MockDifyServer
+
+    kwargs.setdefault("retries", 0)
+    if config.target == "mock":
+        async with AsyncClient(BASE_URL, API_KEYS, transport=mock_transport(latency, sse_events), **kwargs) as client:
+            yield client
+        return
+
+    server = MockDifyServer(latency=Latency.constant(latency), answer=" ".join(["token"] * sse_events), seed=0)
+    if config.target == "inprocess":
+        async with AsyncClient(BASE_URL, API_KEYS, transport=server.transport(), **kwargs) as client:
+            yield client
+    elif config.target == "localhost":
+        async with server.serve() as base_url:
+            async with AsyncClient(base_url, API_KEYS, **kwargs) as client:
+                yield client
+    else:
+        raise ValueError(f"Unknown benchmark target {config.target!r}; expected one of {TARGETS}")
+
+
+def run_benchmarks(config: BenchConfig, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Run the selected benchmarks (all by default) and return a JSON-serializable report."""
+    from . import cases  # noqa: F401  (registers the benchmarks)
+
+    selected = list(names) if names else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks {unknown}; available: {sorted(BENCHMARKS)}")
+
+    results: List[BenchmarkResult] = []
+    for name in selected:
+        results.extend(BENCHMARKS[name](config))
+    return {"meta": environment(config), "results": [asdict(r) for r in results]}
+
+
+def environment(config: BenchConfig) -> Dict[str, Any]:
+    from .. import __version__
+
+    return {
+        "pydify_plus": __version__,
+        "httpx": httpx.__version__,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: list(v) if isinstance(v, tuple) else v for k, v in asdict(config).items()},
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        JSON.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return JSON.load(f)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Compare the primary metric of every result present in both reports.
+
+    Args:
+        baseline: A report from `run_benchmarks` (e.g. of the previous release).
+        current: The report to check.
+        threshold: Relative change in the bad direction that counts as a regression.
+
+    Returns:
+        One row per common result with ``name``, ``metric``, ``baseline``,
+        ``current``, ``change`` (relative, positive = better) and ``regression``.
+    """
+    previous = {r["name"]: r for r in baseline.get("results", [])}
+    rows = []
+    for result in current.get("results", []):
+        old = previous.get(result["name"])
+        metric = result["primary"]
+        if old is None or metric not in old["metrics"] or metric not in result["metrics"]:
+            continue
+        before, after = old["metrics"][metric], result["metrics"][metric]
+        if not before:
+            continue
+        change = (after - before) / before
+        if not result.get("higher_is_better", True):
+            change = -change
+        rows.append({
+            "name": result["name"],
+            "metric": metric,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            "regression": change < -threshold,
+        })
+    return rows
+
+
+def format_results(report: Dict[str, Any]) -> str:
+    lines = []
+    for result in report["results"]:
+        metrics = ", ".join(f"{k}={_fmt(v)}" for k, v in result["metrics"].items())
+        lines.append(f"{result['name']:<40} {metrics}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = []
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        lines.append(f"{row['name']:<40} {row['metric']:<16} {_fmt(row['baseline']):>12} -> {_fmt(row['current']):>12} {row['change']:+.1%} {flag}")
+    return "\n".join(lines)
+
+
+def _fmt(value: Any) -> str:
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""Deadlines for client calls.
+
+A deadline bounds the whole call: every attempt, the backoff between them
+and the time spent queued in the scheduler or limiter. It is set per call
+(``deadline=`` seconds on `AsyncClient._arequest`) or for a block of code,
+for example from the budget of an incoming request:
+
+    >>> @app.post("/ask")
+    ... async def ask(body: Question):
+    ...     with deadline(8.0):
+    ...         return await client.chat.create_chat_message(...)
+
+Deadlines nest, and an inner block can only shorten the outer one. The
+context is a `contextvars.ContextVar`, so tasks created inside the block
+inherit it.
+
+Within a deadline, each attempt but the last gets `ATTEMPT_SHARE` of the
+remaining budget, so a slow first attempt still leaves time for a retry;
+the last attempt gets all of it. Connect, read, write and pool timeouts
+are capped at the attempt's budget. A call that is not retried once sent
+(a POST without ``retry_after_send``, see `pydify_plus.profiles`) holds
+only connecting and waiting for a connection to the share; reading and
+writing may use the whole remaining budget. A retry is not started when
+the backoff delay would use up the budget; the last error is raised
+instead.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Union
+
+import httpx
+
+# Fraction of the remaining budget given to an attempt that may be retried.
+ATTEMPT_SHARE = 0.5
+
+_deadline: ContextVar[Optional[float]] = ContextVar("pydify_plus_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Bound client calls in the block to ``seconds`` from now; yields the absolute deadline."""
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None and outer < at:
+        at = outer
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """The innermost deadline as a `time.monotonic` timestamp, if any."""
+    return _deadline.get()
+
+
+def resolve_deadline(seconds: Optional[float] = None) -> Optional[float]:
+    """The earlier of ``seconds`` from now and the current deadline."""
+    at = _deadline.get()
+    if seconds is not None:
+        own = time.monotonic() + seconds
+        at = own if at is None or own < at else at
+    return at
+
+
+def attempt_budget(at: float, last_attempt: bool) -> float:
+    """Seconds the next attempt may take before ``at``; 0 or less when the deadline has passed."""
+    left = at - time.monotonic()
+    return left if last_attempt or left <= 0 else left * ATTEMPT_SHARE
+
+
+def cap_timeout(timeout: Union[float, httpx.Timeout, None], budget: float, connect: Optional[float] = None) -> httpx.Timeout:
+    """``timeout`` with every phase limited to ``budget`` seconds, connect and pool to ``connect`` if given."""
+    if not isinstance(timeout, httpx.Timeout):
+        timeout = httpx.Timeout(timeout)
+    if connect is None:
+        connect = budget
+
+    def cap(value: Optional[float], limit: float) -> float:
+        return limit if value is None else min(value, limit)
+
+    return httpx.Timeout(
+        connect=cap(timeout.connect, connect), read=cap(timeout.read, budget),
+        write=cap(timeout.write, budget), pool=cap(timeout.pool, connect),
+    )
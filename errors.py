@@ -9,8 +9,12 @@ class DifyError(Exception):
     """Base exception for pydify_plus.
 
     All custom exceptions in this library inherit from this class.
+
+    Attributes:
+        timings: Phase-level timing breakdown (`pydify_plus.timing.PhaseTimings`)
+            of the failed attempt, when phase tracing is enabled; otherwise None.
     """
-    pass
+    timings = None
 
 
 class DifyAPIError(DifyError):
@@ -97,3 +101,13 @@ class DifyTimeoutError(DifyError):
     This exception is raised when a request times out.
     """
     pass
+
+
+class DifyDeadlineExceeded(DifyTimeoutError):
+    """Raised when a call's deadline passes.
+
+    See `pydify_plus.deadline`. Raised when the deadline expires during an
+    attempt or while the call is queued; when retries are cut short by the
+    deadline, the last attempt's error is raised instead.
+    """
+    pass
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""Write-behind submission of message feedback.
+
+`FeedbackApi.like` sends one POST per vote from the request that made it.
+A `FeedbackBuffer` takes votes in memory instead and sends them in the
+background: when ``max_events`` messages have votes waiting, every
+``flush_interval`` seconds, and when the client is closed. Repeated votes
+on a message are coalesced, so only the last one is sent:
+
+    >>> buffer = client.feedback.buffer(max_events=200, flush_interval=2.0)
+    >>> buffer.add(message_id, score=1)   # returns at once
+
+Votes that fail with a connection error, timeout, 429 or 5xx are kept for
+the next flush unless a newer vote on the message arrived meanwhile;
+other failures are logged and dropped. Votes still buffered when the
+process dies are lost; use `pydify_plus.outbox.Outbox` where that matters.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from .outbox import RETRYABLE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackBuffer:
+    """Coalesce feedback votes in memory and send them in batches.
+
+    Args:
+        client: The `AsyncClient` that sends the votes; it flushes the
+            buffer when it is closed.
+        max_events: Messages with waiting votes that trigger a flush.
+            Defaults to 100.
+        flush_interval: Seconds between flushes. Defaults to 1.0.
+        concurrency: Votes in flight at once during a flush. Defaults to 8.
+    """
+
+    def __init__(self, client: Any, *, max_events: int = 100, flush_interval: float = 1.0, concurrency: int = 8):
+        self.client = client
+        self.max_events = max_events
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, int] = {}
+        self.closed = False
+        self._slots = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        client._closers.append(self.aclose)
+
+    def add(self, message_id: str, score: int = 1) -> None:
+        """Buffer a vote on ``message_id``, replacing any vote not yet sent.
+
+        Raises:
+            RuntimeError: If the buffer is closed.
+        """
+        if self.closed:
+            raise RuntimeError("FeedbackBuffer is closed")
+        self._count("coalesced" if message_id in self.pending else "buffered")
+        self.pending[message_id] = score
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if len(self.pending) >= self.max_events:
+            self._full.set()
+
+    async def flush(self) -> int:
+        """Send the buffered votes now; returns how many were sent."""
+        # One flush at a time, so a newer vote is never overtaken by an older one.
+        async with self._lock:
+            batch, self.pending = self.pending, {}
+            if not batch:
+                return 0
+            sent = await asyncio.gather(*(self._send(message_id, score) for message_id, score in batch.items()))
+            return sum(sent)
+
+    async def aclose(self) -> None:
+        """Stop the flush timer and send what is buffered."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._task is not None:
+            # Not cancelled: a flush in progress finishes sending its batch first.
+            self._full.set()
+            await self._task
+        await self.flush()
+        if self.pending:
+            logger.warning(f"FeedbackBuffer closed with {len(self.pending)} votes unsent")
+        if self.aclose in self.client._closers:
+            self.client._closers.remove(self.aclose)
+
+    async def _run(self) -> None:
+        while not self.closed:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._full.clear()
+            if not self.closed:
+                await self.flush()
+
+    async def _send(self, message_id: str, score: int) -> bool:
+        async with self._slots:
+            try:
+                await self.client.feedback.like(message_id, score=score)
+            except asyncio.CancelledError:
+                # The batch already left `pending`; keep the vote unless a newer one arrived.
+                self.pending.setdefault(message_id, score)
+                raise
+            except RETRYABLE_ERRORS as e:
+                # Kept for the next flush, unless a newer vote arrived meanwhile.
+                self.pending.setdefault(message_id, score)
+                self._count("retried")
+                logger.warning(f"Feedback on {message_id} not sent, will retry: {e!r}")
+                return False
+            except Exception as e:
+                self._count("dropped")
+                logger.warning(f"Feedback on {message_id} dropped: {e!r}")
+                return False
+        self._count("sent")
+        return True
+
+    def _count(self, outcome: str) -> None:
+        self.client.metrics.inc("dify_client_feedback_votes_total", (("outcome", outcome),))
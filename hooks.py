@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""Request lifecycle hooks for the Dify client.
+
+Hooks are plain objects subclassing `Hooks` and overriding any of its
+methods. They are called synchronously from the request path, so they
+should be cheap; exceptions raised by a hook are logged and swallowed.
+
+For every attempt `AsyncClient` calls `on_request_start`, then, in order:
+
+- `on_response` when a response (of any status) was received;
+- if the attempt failed (an error response, a timeout or a connection
+  error), `on_retry` when it will be retried, or `on_error` when the call
+  gives up and the error is raised to the caller.
+
+A successful attempt thus ends with `on_response`, and a failed one that
+got a response calls `on_response` before `on_retry` or `on_error`.
+Streaming requests additionally call `on_stream_event` for every SSE
+event.
+
+Example:
+    >>> class SlowCallLogger(Hooks):
+    ...     def on_response(self, ctx, response):
+    ...         if ctx.elapsed > 1.0:
+    ...             print(f"slow call to {ctx.endpoint}: {ctx.elapsed:.2f}s")
+    >>>
+    >>> client = AsyncClient(base_url, api_key, hooks=[SlowCallLogger()])
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from .timing import PhaseTimings
+
+# httpcore trace events that mark a connection being handed to the request.
+_CONNECTION_ACQUIRED = (
+    "connection.connect_tcp.started",
+    "connection.connect_unix_socket.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+)
+_CONNECTED = ("connection.connect_tcp.complete", "connection.start_tls.complete")
+
+
+@dataclass
+class RequestContext:
+    """State of a single request attempt, shared by all hooks.
+
+    Attributes:
+        method: HTTP method.
+        url: Full request URL.
+        endpoint: Endpoint template from `config.API_ENDPOINTS` (bounded label).
+        attempt: Attempt number, starting at 1.
+        max_attempts: Total attempts allowed for this call.
+        streaming: Whether this is an SSE streaming request.
+        request_id: Request ID, updated from the x-request-id response header.
+        status_code: Response status code, if a response was received.
+        pool_wait: Seconds spent before a connection was handed to the request.
+        connect: Seconds until a new connection was established (None if reused).
+        bytes_out: Request body size in bytes, if known.
+        bytes_in: Response body size in bytes, if known.
+        phases: Phase-level timing breakdown, when phase tracing is enabled.
+        extra: Scratch space for hooks (e.g. the tracing span).
+    """
+
+    method: str
+    url: str
+    endpoint: str
+    attempt: int = 1
+    max_attempts: int = 1
+    streaming: bool = False
+    request_id: Optional[str] = None
+    status_code: Optional[int] = None
+    pool_wait: Optional[float] = None
+    connect: Optional[float] = None
+    bytes_out: Optional[int] = None
+    bytes_in: Optional[int] = None
+    started_at: float = field(default_factory=time.perf_counter)
+    phases: Optional[PhaseTimings] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the attempt started."""
+        return time.perf_counter() - self.started_at
+
+    async def trace(self, name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace callback, passed via the "trace" request extension."""
+        if self.phases is not None:
+            self.phases.record(name)
+        if self.pool_wait is None and name in _CONNECTION_ACQUIRED:
+            self.pool_wait = self.elapsed
+        elif name in _CONNECTED:
+            self.connect = self.elapsed
+
+
+class Hooks:
+    """Base class for request lifecycle hooks; every method is a no-op."""
+
+    def on_request_start(self, ctx: RequestContext) -> None:
+        pass
+
+    def on_response(self, ctx: RequestContext, response: Any) -> None:
+        pass
+
+    def on_retry(self, ctx: RequestContext, error: BaseException, delay: float) -> None:
+        pass
+
+    def on_error(self, ctx: RequestContext, error: BaseException) -> None:
+        pass
+
+    def on_stream_event(self, ctx: RequestContext, event: Any) -> None:
+        pass
+
+
+HOOK_NAMES = ("on_request_start", "on_response", "on_retry", "on_error", "on_stream_event")
+
+
+def overridden_hooks(hooks: Any, name: str) -> list:
+    """Return the bound ``name`` methods of ``hooks`` that are not the `Hooks` no-op."""
+    default = getattr(Hooks, name)
+    callbacks = []
+    for hook in hooks:
+        method = getattr(hook, name, None)
+        if method is not None and getattr(method, "__func__", None) is not default:
+            callbacks.append(method)
+    return callbacks
+
+
+class OpenTelemetryHooks(Hooks):
+    """Emit one client span per request attempt through an OpenTelemetry tracer.
+
+    Only the tracer/span API is used (`start_span`, `set_attribute`,
+    `record_exception`, `set_status`, `end`), so any compatible
+    tracer works; `opentelemetry-api` is imported lazily for span kind and
+    status when it is installed.
+
+    Args:
+        tracer: An OpenTelemetry `Tracer`, e.g. `trace.get_tracer("pydify_plus")`.
+    """
+
+    def __init__(self, tracer: Any):
+        self.tracer = tracer
+        try:
+            from opentelemetry.trace import SpanKind, Status, StatusCode
+        except ImportError:
+            self._kind = None
+            self._error_status = None
+        else:
+            self._kind = SpanKind.CLIENT
+            self._error_status = lambda description: Status(StatusCode.ERROR, description)
+
+    def on_request_start(self, ctx: RequestContext) -> None:
+        attributes = {
+            "http.request.method": ctx.method,
+            "url.full": ctx.url,
+            "url.template": ctx.endpoint,
+            "http.request.resend_count": ctx.attempt - 1,
+        }
+        name = f"{ctx.method} {ctx.endpoint}"
+        if self._kind is not None:
+            span = self.tracer.start_span(name, kind=self._kind, attributes=attributes)
+        else:
+            span = self.tracer.start_span(name, attributes=attributes)
+        ctx.extra["otel_span"] = span
+
+    def on_response(self, ctx: RequestContext, response: Any) -> None:
+        span = ctx.extra.pop("otel_span", None)
+        if span is None:
+            return
+        span.set_attribute("http.response.status_code", ctx.status_code)
+        if ctx.request_id:
+            span.set_attribute("dify.request_id", ctx.request_id)
+        if ctx.pool_wait is not None:
+            span.set_attribute("dify.pool_wait", ctx.pool_wait)
+        if ctx.phases is not None:
+            for phase, value in ctx.phases.as_dict().items():
+                if isinstance(value, float):
+                    span.set_attribute(f"dify.phase.{phase}", value)
+        if ctx.status_code is not None and ctx.status_code >= 400:
+            self._set_error(span, str(ctx.status_code))
+        span.end()
+
+    def on_retry(self, ctx: RequestContext, error: BaseException, delay: float) -> None:
+        self._end_with_error(ctx, error, retry_delay=delay)
+
+    def on_error(self, ctx: RequestContext, error: BaseException) -> None:
+        self._end_with_error(ctx, error)
+
+    def _end_with_error(self, ctx: RequestContext, error: BaseException, **attributes: Any) -> None:
+        span = ctx.extra.pop("otel_span", None)
+        if span is None:
+            return
+        span.record_exception(error)
+        span.set_attribute("error.type", type(error).__name__)
+        for key, value in attributes.items():
+            span.set_attribute(f"dify.{key}", value)
+        self._set_error(span, str(error))
+        span.end()
+
+    def _set_error(self, span: Any, description: str) -> None:
+        if self._error_status is not None:
+            span.set_status(self._error_status(description))
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""Idempotency keys and a journal of completed mutations.
+
+A request carries an ``Idempotency-Key`` header when it has a key: one
+passed explicitly (``idempotency_key=`` on `AsyncClient._arequest`, as the
+outbox does), one derived for a mutating request (POST, PUT, PATCH,
+DELETE) made inside an `idempotency_scope`, or a random one for any other
+mutating request of a client created with ``idempotency_keys=True``. The
+key is chosen once per call and sent unchanged on every retry, so a server
+or gateway that deduplicates by key applies the call once however often
+it is retried.
+
+Only ``idempotency_keys=True`` changes how calls are retried: keyed calls
+of such a client are retried after a read timeout too (see
+`pydify_plus.profiles`). Without a deduplicating server, leave it off;
+scoped and explicit keys are then still sent and journaled, but a POST
+that timed out after being sent is not sent again.
+
+A scoped key is derived from the scope, method, path and body, so running
+the same job again sends the same keys. Together with an
+`IdempotencyJournal`, a re-run bulk job skips the calls that already
+succeeded and returns their recorded responses:
+
+    >>> journal = IdempotencyJournal("import.journal")
+    >>> client = AsyncClient(base_url, api_key, journal=journal)
+    >>> with idempotency_scope("import-2025-06"):
+    ...     for doc in docs:
+    ...         await client.documents.create_from_text(dataset_id, text=doc.text, title=doc.name)
+
+Only scoped and explicit keys are journaled. Streaming calls are not keyed.
+
+The journal is a JSON lines file, appended to and flushed as each call
+completes; it is read back whole when opened. A line cut short by a crash,
+or any other line that is not a journal entry, is ignored.
+"""
+
+import hashlib
+import json as JSON
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+logger = logging.getLogger(__name__)
+
+# Bytes read at a time when hashing an upload.
+_BLOCK_SIZE = 1 << 20
+
+_scope: ContextVar[Optional[str]] = ContextVar("pydify_plus_idempotency_scope", default=None)
+
+
+@contextmanager
+def idempotency_scope(name: str) -> Iterator[None]:
+    """Derive the idempotency keys of calls in the block (and tasks it creates) from ``name``."""
+    token = _scope.set(name)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current_scope() -> Optional[str]:
+    """The name of the innermost `idempotency_scope`, if any."""
+    return _scope.get()
+
+
+def derive_key(
+    scope: str,
+    method: str,
+    path: str,
+    *,
+    content: Optional[bytes] = None,
+    json: Optional[dict] = None,
+    params: Optional[dict] = None,
+    data: Optional[dict] = None,
+    files: Optional[Any] = None,
+) -> str:
+    """A key that is the same whenever the same request is made in ``scope``.
+
+    ``content`` is the encoded body; ``json`` is used for multipart
+    requests, which have none. Files are identified by field, file name
+    and a digest of their content: in-memory bytes as they are, seekable
+    file objects read through and put back at their position. Other file
+    objects are identified by their path (``name``) only.
+    """
+    digest = hashlib.sha256()
+    for part in (scope, method.upper(), str(path), _canonical(json), _canonical(params), _canonical(data)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    if content is not None:
+        digest.update(content)
+    for field, value in sorted((files or {}).items()):
+        name, body = (value[0], value[1]) if isinstance(value, tuple) else (None, value)
+        digest.update(f"\0{field}\0{name}\0".encode())
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            digest.update(body)
+        elif isinstance(body, str):
+            digest.update(body.encode())
+        else:
+            _update_from_file(digest, body)
+    return f"{scope}:{digest.hexdigest()[:32]}"
+
+
+def _update_from_file(digest: Any, file: Any) -> None:
+    seekable = getattr(file, "seekable", None)
+    if seekable is None or not seekable():
+        digest.update(str(getattr(file, "name", "")).encode())
+        return
+    position = file.tell()
+    try:
+        while True:
+            block = file.read(_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block.encode() if isinstance(block, str) else block)
+    finally:
+        file.seek(position)
+
+
+def new_key() -> str:
+    """A random key, for calls outside a scope."""
+    return uuid.uuid4().hex
+
+
+def _canonical(value: Optional[dict]) -> str:
+    return "" if value is None else JSON.dumps(value, sort_keys=True, default=str)
+
+
+class IdempotencyJournal:
+    """Responses of completed calls, by idempotency key.
+
+    Args:
+        path: JSON lines file to persist the journal to. None keeps it in
+            memory, which deduplicates within one process only.
+        fsync: Sync the file to disk after every record. Defaults to False
+            (flushed to the OS only).
+    """
+
+    def __init__(self, path: Optional[str] = None, *, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.entries: Dict[str, Tuple[bytes, float]] = {}
+        self.hits = 0
+        self._file: Optional[IO[str]] = None
+        if path is not None:
+            if os.path.exists(path):
+                self._load(path)
+            self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    entry = JSON.loads(line)
+                    self.entries[entry["key"]] = (entry["body"].encode(), float(entry["at"]))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    logger.warning("Skipping unreadable line %d of idempotency journal %s", number, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The recorded response body of ``key``, if the call completed."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def record(self, key: str, body: bytes) -> None:
+        """Record that the call with ``key`` completed with response ``body``."""
+        at = time.time()
+        self.entries[key] = (bytes(body), at)
+        if self._file is not None:
+            text = bytes(body).decode("utf-8", errors="replace")
+            self._file.write(JSON.dumps({"key": key, "at": at, "body": text}, ensure_ascii=False) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
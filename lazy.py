@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+
+"""Lazy views over large list responses.
+
+A `LazyPage` keeps the response body and decodes it on access: the
+top-level fields (``has_more``, ``total``, ...) and the items of the
+``data`` array are decoded only when read. Iterating walks the array in
+chunks, so reading the first few items of a huge page does not decode the
+rest, and a full pass never holds more than one chunk of decoded items:
+
+    >>> page = await client.documents.list(dataset_id, limit=100, lazy=True)
+    >>> statuses = [(d["id"], d["indexing_status"]) for d in page["data"]]
+    >>> page["has_more"]
+
+`LazyPage` is a read-only `Mapping`, so code written against the dict
+response keeps working; its ``data`` value is a `LazyItems` sequence.
+Only the most recently decoded chunk is kept; keep a reference (or call
+`LazyPage.to_dict`) when items are read repeatedly.
+
+Chunk ends are found on the raw bytes: bracket counts (taken by
+``bytes.count``, in C) mark where the items so far are closed, and the
+codec decoding the chunk confirms it. The first chunk holds one item and
+chunks then double, up to `MAX_CHUNK` bytes. Brackets inside strings can
+throw the counts off; the item at hand is then decoded on its own with
+the standard library scanner.
+"""
+
+import json
+import re
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union, overload
+
+from .codec import JSONCodec, default_codec
+
+# Largest chunk of items decoded at once, in bytes of the body.
+MAX_CHUNK = 64 * 1024
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_SEPARATOR = re.compile(rb"[ \t\n\r]*,?[ \t\n\r]*")
+_DELIMITER = re.compile(rb"[,\]}]")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = re.compile(rb"[^,\]} \t\n\r]+")
+
+# Fallback for bodies the bracket counts cannot split.
+_scanner = json.JSONDecoder()
+
+
+class LazyPage(Mapping[str, Any]):
+    """A paginated list response decoded on access.
+
+    Args:
+        content: The JSON response body.
+        codec: Codec for item access and `to_dict`; defaults to the "auto" codec.
+        key: Name of the array field decoded item by item. Defaults to "data".
+    """
+
+    def __init__(self, content: Union[bytes, str], codec: Optional[JSONCodec] = None, key: str = "data"):
+        self._body = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+        self._codec = codec or default_codec()
+        self._key = key
+        self._fields: Dict[str, Any] = {}
+        self._parsed_to: Optional[int] = None  # offset after the last top-level field read
+        self._array_start: Optional[int] = None
+        self._array_bound = 0  # the array ends at or before this offset
+        self._chunks: List[Tuple[int, int, int]] = []  # (first item index, begin, end) offsets
+        self._firsts: List[int] = []
+        self._count = 0
+        self._scan_pos = 0
+        self._array_end: Optional[int] = None
+        self._complete = False
+        self._decoded: Tuple[int, List[Any]] = (-1, [])
+        self._text: Optional[str] = None  # decoded body, for the stdlib fallback
+        self._items = LazyItems(self)
+
+    @classmethod
+    def model_validate_json(cls, data: Union[bytes, str], codec: Optional[JSONCodec] = None) -> "LazyPage":
+        """Construct from a JSON body; lets ``typed=LazyPage`` be passed like a response model."""
+        return cls(data, codec)
+
+    @property
+    def raw(self) -> bytes:
+        """The response body."""
+        return self._body
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode the whole body at once."""
+        return self._codec.loads(self._body)
+
+    def pluck(self, *fields: str) -> Iterator[Tuple[Any, ...]]:
+        """Yield the given fields of every item as tuples, one chunk decoded at a time."""
+        for item in self._items:
+            yield tuple(item.get(f) for f in fields)
+
+    # Mapping interface
+
+    def __getitem__(self, name: str) -> Any:
+        if name == self._key:
+            self._find_array()
+        if name not in self._fields:
+            self._parse_fields()
+        return self._fields[name]
+
+    def __iter__(self) -> Iterator[str]:
+        self._parse_fields()
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        self._parse_fields()
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        found = f"{self._count}{'' if self._array_end is not None else '+'}"
+        return f"<LazyPage {len(self._body)} bytes, {found} items scanned>"
+
+    # Parsing
+
+    def _skip(self, pos: int) -> int:
+        return _WHITESPACE.match(self._body, pos).end()
+
+    def _next_field(self, pos: int) -> Tuple[Optional[str], int]:
+        """Read the key at ``pos``; returns (None, end) at the closing brace."""
+        body = self._body
+        pos = self._skip(pos)
+        if body[pos:pos + 1] == b",":
+            pos = self._skip(pos + 1)
+        if body[pos:pos + 1] == b"}":
+            return None, pos + 1
+        match = _STRING.match(body, pos)
+        if match is None:
+            raise ValueError(f"Expected a field name at offset {pos}")
+        name, pos = self._codec.loads(match.group()), self._skip(match.end())
+        if body[pos:pos + 1] != b":":
+            raise ValueError(f"Expected ':' at offset {pos}")
+        return name, self._skip(pos + 1)
+
+    def _value(self, pos: int) -> Tuple[Any, int]:
+        """Decode the top-level field value at ``pos``; returns (value, end)."""
+        body = self._body
+        first = body[pos:pos + 1]
+        if first not in (b"{", b"["):
+            match = (_STRING if first == b'"' else _SCALAR).match(body, pos)
+            if match is None:
+                raise ValueError(f"Expected a value at offset {pos}")
+            return self._codec.loads(match.group()), match.end()
+        for end in self._closed(pos, pos, b",}"):
+            try:
+                return self._codec.loads(body[pos:end]), end
+            except ValueError:
+                continue
+        return self._raw_decode(pos)
+
+    def _raw_decode(self, pos: int) -> Tuple[Any, int]:
+        """Decode the value at ``pos`` with the stdlib scanner; returns (value, end)."""
+        if self._text is None:
+            self._text = self._body.decode("utf-8")
+        if len(self._text) == len(self._body):  # ASCII: character and byte offsets agree
+            return _scanner.raw_decode(self._text, pos)
+        text = self._body[pos:].decode("utf-8")
+        value, size = _scanner.raw_decode(text)
+        return value, pos + len(text[:size].encode("utf-8"))
+
+    def _closed(self, pos: int, start: int, stops: bytes) -> Iterator[int]:
+        """Offsets from ``start`` on of ``stops`` delimiters with every bracket opened after ``pos`` closed."""
+        body, objects, arrays, last = self._body, 0, 0, pos
+        for match in _DELIMITER.finditer(body, start):
+            at = match.start()
+            objects += body.count(b"{", last, at) - body.count(b"}", last, at)
+            arrays += body.count(b"[", last, at) - body.count(b"]", last, at)
+            last = at
+            if not objects and not arrays and body[at] in stops:
+                yield at
+
+    def _find_array(self) -> None:
+        """Read top-level fields up to the start of the item array."""
+        if self._parsed_to is None:
+            pos = self._skip(0)
+            if self._body[pos:pos + 1] != b"{":
+                raise ValueError("Lazy pages require a JSON object body")
+            self._parsed_to = pos + 1
+        while self._array_start is None and not self._complete:
+            name, pos = self._next_field(self._parsed_to)
+            if name is None:
+                self._parsed_to, self._complete = pos, True
+            elif name == self._key and self._body[pos:pos + 1] == b"[":
+                self._fields[name] = self._items
+                self._array_start = self._scan_pos = pos + 1
+                self._array_bound = self._body.rfind(b"]")
+                self._parsed_to = pos
+            else:
+                self._fields[name], self._parsed_to = self._value(pos)
+
+    def _parse_fields(self) -> None:
+        """Read every top-level field, walking the item array if it comes first."""
+        self._find_array()
+        while self._array_start is not None and self._array_end is None:
+            self._next_chunk()
+        if self._array_end is not None and self._parsed_to < self._array_end:
+            self._parsed_to = self._array_end
+        while not self._complete:
+            name, pos = self._next_field(self._parsed_to)
+            if name is None:
+                self._parsed_to, self._complete = pos, True
+            else:
+                self._fields[name], self._parsed_to = self._value(pos)
+
+    def _next_chunk(self) -> List[Any]:
+        """Decode the next chunk of items and record where it lies."""
+        body = self._body
+        pos = _SEPARATOR.match(body, self._scan_pos).end()
+        if body[pos:pos + 1] == b"]":
+            self._array_end = pos + 1
+            return []
+        size = min(2 * (self._chunks[-1][2] - self._chunks[-1][1]), MAX_CHUNK) if self._chunks else 0
+        for end in self._closed(pos, max(pos, min(pos + size, self._array_bound)), b",]"):
+            try:
+                items = self._codec.loads(b"".join((b"[", memoryview(body)[pos:end], b"]")))
+            except ValueError:
+                continue
+            self._add_chunk(pos, end, items)
+            if body[end] == 0x5D:  # "]"
+                self._array_end = end + 1
+            else:
+                self._scan_pos = end + 1
+            return items
+        # Brackets in strings threw the counts off; take this item on its own.
+        item, self._scan_pos = self._raw_decode(pos)
+        self._add_chunk(pos, self._scan_pos, [item])
+        return [item]
+
+    def _add_chunk(self, begin: int, end: int, items: List[Any]) -> None:
+        self._chunks.append((self._count, begin, end))
+        self._firsts.append(self._count)
+        self._count += len(items)
+        self._decoded = (len(self._chunks) - 1, items)
+
+    def _chunk(self, index: int) -> List[Any]:
+        """The decoded items of chunk ``index``."""
+        if self._decoded[0] != index:
+            _, begin, end = self._chunks[index]
+            items = self._codec.loads(b"".join((b"[", memoryview(self._body)[begin:end], b"]")))
+            self._decoded = (index, items)
+        return self._decoded[1]
+
+    def _walk(self, start: int) -> Iterator[Any]:
+        """Yield items from index ``start``, scanning past the known ones as needed."""
+        index = start
+        while True:
+            if index < self._count:
+                chunk = bisect_right(self._firsts, index) - 1
+                first = self._firsts[chunk]
+                items = self._chunk(chunk)
+            elif self._array_end is not None:
+                return
+            else:
+                first, items = self._count, self._next_chunk()
+            for item in items[index - first:]:
+                yield item
+            index = first + len(items)
+
+    def _item(self, index: int) -> Any:
+        while index >= self._count and self._array_end is None:
+            self._next_chunk()
+        if index >= self._count:
+            raise IndexError("LazyPage item index out of range")
+        chunk = bisect_right(self._firsts, index) - 1
+        return self._chunk(chunk)[index - self._firsts[chunk]]
+
+
+class LazyItems(Sequence[Any]):
+    """The item array of a `LazyPage`; items are decoded when accessed."""
+
+    def __init__(self, page: LazyPage):
+        self._page = page
+
+    def __iter__(self) -> Iterator[Any]:
+        self._page._find_array()
+        return self._page._walk(0) if self._page._array_start is not None else iter(())
+
+    def __len__(self) -> int:
+        page = self._page
+        page._find_array()
+        while page._array_start is not None and page._array_end is None:
+            page._next_chunk()
+        return page._count
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Any]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+            if index < 0:
+                raise IndexError("LazyPage item index out of range")
+        self._page._find_array()
+        if self._page._array_start is None:
+            raise IndexError("LazyPage item index out of range")
+        return self._page._item(index)
+
+    def __repr__(self) -> str:
+        return f"<LazyItems of {self._page!r}>"
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""Adaptive concurrency limits for outbound requests.
+
+Instead of a fixed cap, an `AdaptiveLimiter` keeps a concurrency limit per
+endpoint family and API key name and adjusts it from what it observes,
+in the style of Netflix's concurrency-limits:
+
+- `AIMDLimit` grows the limit by one while requests succeed and the limit
+  is actually used, and multiplies it by ``backoff`` when a request is
+  dropped (429, 503 or timeout).
+- `GradientLimit` compares the recent round-trip time with a slowly moving
+  baseline. When latency rises above the baseline, the limit shrinks in
+  proportion. Otherwise it grows by a queue allowance of about sqrt(limit).
+  Drops also back off multiplicatively.
+
+Requests over the limit wait in FIFO order until a permit is released.
+Limits, permits in flight and queue depth are published as gauges on the
+client's `MetricsRegistry`:
+
+    >>> client = AsyncClient(base_url, api_key, limiter="gradient")
+    >>> client.limiter.stats()["chat-messages", "DIFY_API_KEY"]["limit"]
+
+Streams hold their permit until they end; their round-trip time is the time
+to the response headers.
+"""
+
+import asyncio
+import math
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+from .base import API_KEY_NAME
+from .metrics import MetricsRegistry
+
+# Responses that mean the server shed load.
+DROP_STATUS = frozenset({429, 503})
+
+
+class AIMDLimit:
+    """Additive-increase/multiplicative-decrease limit.
+
+    Args:
+        initial: Starting limit. Defaults to 20.
+        min_limit: Lower bound. Defaults to 1.
+        max_limit: Upper bound. Defaults to 200.
+        backoff: Factor applied on a drop. Defaults to 0.9.
+    """
+
+    def __init__(self, initial: int = 20, min_limit: int = 1, max_limit: int = 200, backoff: float = 0.9):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+
+    def update(self, rtt: float, in_flight: int, dropped: bool) -> None:
+        if dropped:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif in_flight * 2 >= self.limit:
+            # Only grow while the limit is actually reached.
+            self.limit = min(self.max_limit, self.limit + 1)
+
+
+class GradientLimit:
+    """Latency-gradient limit, after Netflix's Gradient2.
+
+    Args:
+        initial: Starting limit. Defaults to 20.
+        min_limit: Lower bound. Defaults to 1.
+        max_limit: Upper bound. Defaults to 200.
+        smoothing: Weight of a new estimate in the limit. Defaults to 0.2.
+        tolerance: Latency increase over the baseline tolerated before
+            the limit shrinks. Defaults to 1.5.
+        long_window: Samples averaged into the baseline RTT. Defaults to 600.
+        backoff: Factor applied on a drop. Defaults to 0.9.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        long_window: int = 600,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.long_rtt: Optional[float] = None
+        self._long_alpha = 2.0 / (long_window + 1)
+
+    def update(self, rtt: float, in_flight: int, dropped: bool) -> None:
+        if dropped:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            return
+        if self.long_rtt is None:
+            self.long_rtt = rtt
+            return
+        self.long_rtt += self._long_alpha * (rtt - self.long_rtt)
+        if self.long_rtt > 2 * rtt:
+            # Latency dropped sharply (e.g. the backend recovered): let the baseline catch up.
+            self.long_rtt = (self.long_rtt + rtt) / 2
+        if in_flight * 2 < self.limit:
+            # The limit is not what bounds throughput; latency says nothing about it.
+            return
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / max(rtt, 1e-9)))
+        estimate = self.limit * gradient + math.sqrt(self.limit)
+        limit = self.limit * (1 - self.smoothing) + estimate * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+
+ALGORITHMS: Dict[str, Callable[..., Any]] = {"aimd": AIMDLimit, "gradient": GradientLimit}
+
+
+@lru_cache(maxsize=256)
+def endpoint_family(endpoint: str) -> str:
+    """The family of an endpoint template: its first path segment after the API version.
+
+    >>> endpoint_family("/v1/datasets/{dataset_id}/documents")
+    'datasets'
+    """
+    parts = [p for p in endpoint.split("/") if p]
+    if len(parts) > 1 and parts[0][:1] == "v" and parts[0][1:].isdigit():
+        parts = parts[1:]
+    return parts[0] if parts else endpoint
+
+
+class _Partition:
+    __slots__ = ("limit", "in_flight", "waiters", "labels")
+
+    def __init__(self, limit: Any, labels: Tuple[Tuple[str, str], ...]):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.labels = labels
+
+
+class Permit:
+    """A slot of an `AdaptiveLimiter` partition; release it exactly once."""
+
+    __slots__ = ("_limiter", "_partition", "_in_flight", "released")
+
+    def __init__(self, limiter: "AdaptiveLimiter", partition: _Partition):
+        self._limiter = limiter
+        self._partition = partition
+        self._in_flight = partition.in_flight
+        self.released = False
+
+    def release(self, rtt: Optional[float] = None, dropped: bool = False) -> None:
+        """Free the slot and feed the outcome to the limit.
+
+        Args:
+            rtt: Round-trip time in seconds; None releases without a sample
+                (for outcomes that say nothing about load, e.g. a connection error).
+            dropped: The request was rejected or timed out because of load.
+        """
+        if self.released:
+            return
+        self.released = True
+        self._limiter._release(self._partition, rtt, self._in_flight, dropped)
+
+
+class AdaptiveLimiter:
+    """Adaptive concurrency limits, one per endpoint family and API key name.
+
+    Args:
+        algorithm: "gradient", "aimd" or a factory returning a new limit
+            object (with a ``limit`` attribute and an ``update(rtt, in_flight,
+            dropped)`` method). Defaults to "gradient".
+        family: Maps an endpoint template to its family. Defaults to
+            `endpoint_family`.
+        metrics: Registry for the limit, in-flight and queue gauges.
+        **limit_kwargs: Passed to the algorithm, e.g. ``initial`` or ``max_limit``.
+    """
+
+    def __init__(
+        self,
+        algorithm: Union[str, Callable[[], Any]] = "gradient",
+        *,
+        family: Callable[[str], str] = endpoint_family,
+        metrics: Optional[MetricsRegistry] = None,
+        **limit_kwargs: Any,
+    ):
+        if isinstance(algorithm, str):
+            if algorithm not in ALGORITHMS:
+                raise ValueError(f"Unknown limit algorithm {algorithm!r}; expected one of {tuple(ALGORITHMS)}")
+            cls = ALGORITHMS[algorithm]
+            self._new_limit: Callable[[], Any] = lambda: cls(**limit_kwargs)
+        else:
+            self._new_limit = algorithm
+        self.family = family
+        self.metrics = metrics
+        self._partitions: Dict[Tuple[str, str], _Partition] = {}
+
+    def _partition(self, endpoint: str, key_name: Optional[str]) -> _Partition:
+        key = (self.family(endpoint), key_name or API_KEY_NAME)
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = self._partitions[key] = _Partition(self._new_limit(), (("family", key[0]), ("key", key[1])))
+            self._publish(partition)
+        return partition
+
+    async def acquire(self, endpoint: str, key_name: Optional[str] = None) -> Permit:
+        """Wait for a slot of the partition of ``endpoint`` and ``key_name``."""
+        partition = self._partition(endpoint, key_name)
+        if partition.in_flight < int(partition.limit.limit) and not partition.waiters:
+            partition.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            partition.waiters.append(waiter)
+            self._publish(partition)
+            try:
+                # The releasing request hands its slot over by resolving the future.
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release(partition, None, 0, False)
+                else:
+                    if waiter in partition.waiters:
+                        partition.waiters.remove(waiter)
+                    self._publish(partition)
+                raise
+        permit = Permit(self, partition)
+        self._publish(partition)
+        return permit
+
+    def _release(self, partition: _Partition, rtt: Optional[float], in_flight: int, dropped: bool) -> None:
+        partition.in_flight -= 1
+        if rtt is not None or dropped:
+            partition.limit.update(rtt or 0.0, in_flight, dropped)
+        limit = int(partition.limit.limit)
+        while partition.waiters and partition.in_flight < limit:
+            waiter = partition.waiters.popleft()
+            if not waiter.done():
+                partition.in_flight += 1
+                waiter.set_result(None)
+        self._publish(partition)
+
+    def _publish(self, partition: _Partition) -> None:
+        if self.metrics is None:
+            return
+        labels = partition.labels
+        self.metrics.set_gauge("dify_client_concurrency_limit", labels, int(partition.limit.limit))
+        self.metrics.set_gauge("dify_client_concurrency_in_flight", labels, partition.in_flight)
+        self.metrics.set_gauge("dify_client_concurrency_queued", labels, len(partition.waiters))
+
+    def stats(self) -> Dict[Tuple[str, str], Dict[str, int]]:
+        """Limit, permits in flight and queue depth per (family, key name)."""
+        return {
+            key: {"limit": int(p.limit.limit), "in_flight": p.in_flight, "queued": len(p.waiters)}
+            for key, p in self._partitions.items()
+        }
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+"""Load generation for capacity planning.
+
+Replays a weighted mix of Dify operations through `AsyncClient`, so the
+numbers include the client's own overhead, retries and connection pooling:
+
+- ``chat``: a streaming chat message (records time to first token),
+- ``search``: a dataset retrieval,
+- ``upload``: a document upload from bytes,
+- ``workflow``: a blocking workflow execution.
+
+Two modes are supported:
+
+- open loop (``--rps``): requests arrive as a Poisson process at the target
+  rate regardless of how fast earlier ones complete. Latency is measured
+  from the scheduled arrival, so queueing delay is not hidden (no
+  coordinated omission). Arrivals beyond ``--max-in-flight`` are counted as
+  dropped instead of being delayed.
+- closed loop (``--concurrency``): N workers issue requests back to back.
+
+Example:
+    python -m pydify_plus.loadgen --base-url https://dify.internal \\
+        --rps 50 --duration 120 --mix chat=6,search=3,upload=1 --dataset-id <id>
+
+    python -m pydify_plus.loadgen --mock --concurrency 200 --duration 10 --json report.json
+
+API keys are read from the DIFY_API_KEY, DIFY_APP_KEY, DIFY_DATASET_KEY
+and DIFY_WORKFLOW_KEY environment variables.
+"""
+
+import argparse
+import asyncio
+import json as JSON
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .errors import DifyAPIError
+from .metrics import is_content_event
+
+API_KEY_NAMES = ("DIFY_API_KEY", "DIFY_APP_KEY", "DIFY_DATASET_KEY", "DIFY_WORKFLOW_KEY")
+
+DEFAULT_QUERIES = (
+    "What is Dify?",
+    "Summarize the release notes of the latest version.",
+    "How do I configure a knowledge base for customer support?",
+    "Explain retrieval-augmented generation in two sentences.",
+    "Which models are supported for embeddings?",
+)
+
+DEFAULT_MIX = {"chat": 6.0, "search": 3.0, "upload": 0.5, "workflow": 0.5}
+
+
+@dataclass
+class LoadConfig:
+    """Parameters of a load run.
+
+    Attributes:
+        rps: Target arrival rate for open-loop mode.
+        concurrency: Number of workers for closed-loop mode (used when ``rps`` is None).
+        duration: Measured duration in seconds.
+        warmup: Seconds of load before measurement starts.
+        mix: Relative weights of the operations to run.
+        max_in_flight: Cap on outstanding requests in open-loop mode.
+        dataset_id: Dataset for ``search`` and ``upload``.
+        workflow_id: Workflow for ``workflow``.
+        workflow_inputs: Inputs passed to the workflow.
+        queries: Queries sampled for ``chat`` and ``search``.
+        upload_bytes: Size of each uploaded document.
+        user: End-user identifier sent with requests.
+        seed: Seed for arrivals, operation choice and queries.
+    """
+
+    rps: Optional[float] = None
+    concurrency: Optional[int] = None
+    duration: float = 30.0
+    warmup: float = 0.0
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    max_in_flight: int = 1000
+    dataset_id: Optional[str] = None
+    workflow_id: Optional[str] = None
+    workflow_inputs: Dict[str, Any] = field(default_factory=dict)
+    queries: List[str] = field(default_factory=lambda: list(DEFAULT_QUERIES))
+    upload_bytes: int = 64 * 1024
+    user: str = "loadgen"
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if (self.rps is None) == (self.concurrency is None):
+            raise ValueError("Exactly one of rps and concurrency must be set")
+        unknown = set(self.mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unknown operations {sorted(unknown)}; available: {sorted(OPERATIONS)}")
+        if self.mix.get("search") or self.mix.get("upload"):
+            if not self.dataset_id:
+                raise ValueError("dataset_id is required for search and upload operations")
+        if self.mix.get("workflow") and not self.workflow_id:
+            raise ValueError("workflow_id is required for workflow operations")
+
+
+Operation = Callable[[Any, LoadConfig, random.Random], Awaitable[Optional[float]]]
+
+
+async def _chat(client: Any, config: LoadConfig, rng: random.Random) -> Optional[float]:
+    started = time.perf_counter()
+    first_token = None
+    async for event in client.chat.stream_chat_message(messages=rng.choice(config.queries), user=config.user):
+        if first_token is None and is_content_event(event):
+            first_token = time.perf_counter() - started
+    return first_token
+
+
+async def _search(client: Any, config: LoadConfig, rng: random.Random) -> Optional[float]:
+    await client.dataset.search(dataset_id=config.dataset_id, query_content=rng.choice(config.queries))
+    return None
+
+
+async def _upload(client: Any, config: LoadConfig, rng: random.Random) -> Optional[float]:
+    content = (rng.choice(config.queries) + "\n").encode() * (config.upload_bytes // 64 + 1)
+    await client.documents.create_from_file_bytes(
+        config.dataset_id,
+        file_name=f"loadgen-{rng.getrandbits(32):08x}.txt",
+        content=content[: config.upload_bytes],
+        content_type="text/plain",
+        metadata=None,
+    )
+    return None
+
+
+async def _workflow(client: Any, config: LoadConfig, rng: random.Random) -> Optional[float]:
+    await client.workflows.execute(config.workflow_id, inputs=config.workflow_inputs, user=config.user)
+    return None
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "chat": _chat,
+    "search": _search,
+    "upload": _upload,
+    "workflow": _workflow,
+}
+
+
+def _percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def pct(q: float) -> float:
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99), "max": ordered[-1]}
+
+
+def _error_kind(error: BaseException) -> str:
+    status = getattr(error, "status_code", None)
+    if isinstance(error, DifyAPIError) and status:
+        return f"{type(error).__name__}({status})"
+    return type(error).__name__
+
+
+@dataclass
+class OperationStats:
+    """Measurements of one operation type."""
+
+    name: str
+    ok: int = 0
+    latencies: List[float] = field(default_factory=list)
+    ttft: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+
+    @property
+    def count(self) -> int:
+        return self.ok + sum(self.errors.values())
+
+    def as_dict(self, duration: float) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "ok": self.ok,
+            "throughput": self.ok / duration if duration else 0.0,
+            "latency": _percentiles(self.latencies),
+            "errors": dict(self.errors),
+        }
+        if self.ttft:
+            result["ttft"] = _percentiles(self.ttft)
+        return result
+
+
+@dataclass
+class LoadReport:
+    """Result of `run_load`.
+
+    Attributes:
+        config: The configuration the run used.
+        duration: Actual measured duration in seconds.
+        operations: Per-operation measurements.
+        dropped: Open-loop arrivals not sent because ``max_in_flight`` was reached.
+        max_in_flight: Highest number of outstanding requests observed.
+    """
+
+    config: LoadConfig
+    duration: float = 0.0
+    operations: Dict[str, OperationStats] = field(default_factory=dict)
+    dropped: int = 0
+    max_in_flight: int = 0
+
+    def stats(self, name: str) -> OperationStats:
+        if name not in self.operations:
+            self.operations[name] = OperationStats(name)
+        return self.operations[name]
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = OperationStats("total")
+        for stats in self.operations.values():
+            total.ok += stats.ok
+            total.latencies.extend(stats.latencies)
+            total.errors.update(stats.errors)
+        return {
+            "mode": "open" if self.config.rps is not None else "closed",
+            "target_rps": self.config.rps,
+            "concurrency": self.config.concurrency,
+            "duration": self.duration,
+            "dropped": self.dropped,
+            "max_in_flight": self.max_in_flight,
+            "total": total.as_dict(self.duration),
+            "operations": {name: stats.as_dict(self.duration) for name, stats in sorted(self.operations.items())},
+        }
+
+    def format(self) -> str:
+        data = self.as_dict()
+        mode = f"open loop at {data['target_rps']} rps" if data["mode"] == "open" else f"closed loop with {data['concurrency']} workers"
+        lines = [
+            f"{mode}, {data['duration']:.1f}s measured, max in flight {data['max_in_flight']}, dropped {data['dropped']}",
+            f"{'operation':<10} {'count':>7} {'ok/s':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'ttft p50':>9} {'ttft p99':>9}  errors",
+        ]
+        for name, stats in [*data["operations"].items(), ("total", data["total"])]:
+            latency, ttft = stats["latency"], stats.get("ttft", {})
+            errors = ", ".join(f"{kind}={n}" for kind, n in sorted(stats["errors"].items())) or "-"
+            lines.append(
+                f"{name:<10} {stats['count']:>7} {stats['throughput']:>9.1f} {_ms(latency['p50'])} {_ms(latency['p90'])} "
+                f"{_ms(latency['p99'])} {_ms(ttft.get('p50'), 9)} {_ms(ttft.get('p99'), 9)}  {errors}"
+            )
+        return "\n".join(lines)
+
+
+def _ms(value: Optional[float], width: int = 8) -> str:
+    return f"{value * 1e3:>{width - 2}.0f}ms" if value is not None else f"{'-':>{width}}"
+
+
+async def run_load(client: Any, config: LoadConfig) -> LoadReport:
+    """Drive ``client`` with the configured workload and return the measurements."""
+    rng = random.Random(config.seed)
+    names = [name for name, weight in config.mix.items() if weight > 0]
+    weights = [config.mix[name] for name in names]
+    report = LoadReport(config)
+    started = time.perf_counter()
+    measure_from = started + config.warmup
+    stop_at = measure_from + config.duration
+    in_flight = 0
+
+    def admit() -> None:
+        # Counted when the request is issued, not when its task first runs,
+        # so max_in_flight holds for arrivals spawned in a burst.
+        nonlocal in_flight
+        in_flight += 1
+        report.max_in_flight = max(report.max_in_flight, in_flight)
+
+    async def one(name: str, scheduled_at: float) -> None:
+        nonlocal in_flight
+        try:
+            ttft = await OPERATIONS[name](client, config, rng)
+        except Exception as e:
+            error: Optional[BaseException] = e
+            ttft = None
+        else:
+            error = None
+        finally:
+            in_flight -= 1
+        if scheduled_at < measure_from:
+            return
+        stats = report.stats(name)
+        if error is not None:
+            stats.errors[_error_kind(error)] += 1
+            return
+        stats.ok += 1
+        stats.latencies.append(time.perf_counter() - scheduled_at)
+        if ttft is not None:
+            stats.ttft.append(ttft)
+
+    if config.rps is not None:
+        tasks = set()
+        next_at = started
+        while next_at < stop_at:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if in_flight >= config.max_in_flight:
+                if next_at >= measure_from:
+                    report.dropped += 1
+            else:
+                admit()
+                task = asyncio.create_task(one(rng.choices(names, weights)[0], next_at))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_at += rng.expovariate(config.rps)
+        if tasks:
+            await asyncio.gather(*tasks)
+    else:
+
+        async def worker() -> None:
+            while time.perf_counter() < stop_at:
+                admit()
+                await one(rng.choices(names, weights)[0], time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+
+    report.duration = max(time.perf_counter() - measure_from, 0.0)
+    return report
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+async def _main(args: argparse.Namespace, config: LoadConfig) -> LoadReport:
+    from .async_client import AsyncClient
+
+    client_kwargs = {"timeout": args.timeout, "retries": args.retries}
+    if args.mock:
+        from .testing import DEFAULT_API_KEYS, Latency, MockDifyServer
+
+        server = MockDifyServer(
+            latency=Latency.lognormal(args.mock_latency, 0.5) if args.mock_latency else Latency.constant(0.0),
+            token_delay=Latency.constant(args.mock_token_delay),
+            seed=config.seed,
+        )
+        client = AsyncClient("http://mock-dify", dict(DEFAULT_API_KEYS), transport=server.transport(), **client_kwargs)
+    else:
+        api_key = {name: os.environ[name] for name in API_KEY_NAMES if os.environ.get(name)}
+        client = AsyncClient(args.base_url, api_key, **client_kwargs)
+
+    async with client:
+        return await run_load(client, config)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pydify_plus.loadgen", description="Generate load against a Dify deployment.")
+    # Not required: a --base-url default from DIFY_BASE_URL does not count for argparse.
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default=os.environ.get("DIFY_BASE_URL"), help="Dify API base URL (or DIFY_BASE_URL).")
+    target.add_argument("--mock", action="store_true", help="Run against an in-process MockDifyServer.")
+    rate = parser.add_mutually_exclusive_group(required=True)
+    rate.add_argument("--rps", type=float, help="Open-loop target arrival rate.")
+    rate.add_argument("--concurrency", type=int, help="Closed-loop number of workers.")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=0.0)
+    parser.add_argument("--mix", type=_parse_mix, help="Operation weights, e.g. chat=6,search=3,upload=1,workflow=1.")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--dataset-id")
+    parser.add_argument("--workflow-id")
+    parser.add_argument("--workflow-inputs", type=JSON.loads, default={}, help="Workflow inputs as JSON.")
+    parser.add_argument("--queries", help="File with one query per line.")
+    parser.add_argument("--upload-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="Median mock latency in seconds.")
+    parser.add_argument("--mock-token-delay", type=float, default=0.01, help="Mock delay between stream events.")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this file.")
+    args = parser.parse_args(argv)
+    if not (args.base_url or args.mock):
+        parser.error("one of --base-url (or DIFY_BASE_URL) and --mock is required")
+
+    mix = args.mix
+    if mix is None:
+        mix = dict(DEFAULT_MIX)
+        if not (args.dataset_id or args.mock):
+            for name in ("search", "upload"):
+                mix.pop(name)
+        if not (args.workflow_id or args.mock):
+            mix.pop("workflow")
+
+    queries = list(DEFAULT_QUERIES)
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    try:
+        config = LoadConfig(
+            rps=args.rps,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+            mix=mix,
+            max_in_flight=args.max_in_flight,
+            dataset_id=args.dataset_id or ("dataset-mock" if args.mock else None),
+            workflow_id=args.workflow_id or ("workflow-mock" if args.mock else None),
+            workflow_inputs=args.workflow_inputs,
+            queries=queries,
+            upload_bytes=args.upload_bytes,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = asyncio.run(_main(args, config))
+    print(report.format())
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            JSON.dump(report.as_dict(), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
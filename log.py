@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""Logging helpers for the request hot path.
+
+Debug logging of requests is lazy: nothing is formatted unless the logger
+is enabled for DEBUG and the request is sampled. Headers are redacted and
+payloads are summarized with bounded `reprlib` output, so neither the API
+key nor multi-megabyte document texts end up in logs.
+
+Records carry structured fields through ``extra`` (``dify_request_id``,
+``dify_endpoint``, ``dify_method``, ``dify_attempt`` and, for responses,
+``dify_status`` and ``dify_elapsed``) for JSON log formatters.
+"""
+
+import logging
+import random
+import reprlib
+from typing import Any, Dict, Mapping, Optional
+
+from .hooks import Hooks, RequestContext
+
+# Headers whose values must never be logged.
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "x-api-key", "proxy-authorization"})
+
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxdict = 16
+_repr.maxlist = 16
+_repr.maxstring = 120
+_repr.maxother = 120
+
+
+def redact_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    """Return a copy of ``headers`` with credentials masked.
+
+    Bearer tokens keep their last four characters so keys can still be told apart.
+    """
+    redacted = {}
+    for key, value in (headers or {}).items():
+        if key.lower() in SENSITIVE_HEADERS:
+            scheme, _, token = str(value).partition(" ")
+            if token:
+                value = f"{scheme} ***{token[-4:]}" if len(token) > 8 else f"{scheme} ***"
+            else:
+                value = "***"
+        redacted[key] = value
+    return redacted
+
+
+def summarize(payload: Any) -> str:
+    """Return a short, bounded representation of a request or response payload."""
+    if payload is None:
+        return "None"
+    if isinstance(payload, (bytes, bytearray)):
+        return f"<{len(payload)} bytes>"
+    return _repr.repr(payload)
+
+
+def summarize_files(files: Any) -> str:
+    """Describe multipart ``files`` by name and size without touching file contents."""
+    if not files:
+        return "None"
+    parts = []
+    for field_name, value in (files.items() if isinstance(files, Mapping) else files):
+        name = value[0] if isinstance(value, tuple) else getattr(value, "name", "?")
+        content = value[1] if isinstance(value, tuple) and len(value) > 1 else value
+        size = len(content) if isinstance(content, (bytes, bytearray, str)) else "stream"
+        parts.append(f"{field_name}={name}({size})")
+    return ", ".join(parts)
+
+
+class LogSampler:
+    """Decide per request whether debug logging is emitted.
+
+    Args:
+        rate: Default fraction (0.0-1.0) of requests to log.
+        rates: Per-endpoint-template overrides, e.g.
+            ``{"/v1/datasets/{dataset_id}/document/create-by-text": 0.01}``.
+    """
+
+    def __init__(self, rate: float = 1.0, rates: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.rates = dict(rates or {})
+
+    def sample(self, endpoint: str) -> bool:
+        rate = self.rates.get(endpoint, self.rate)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+class SlowRequestLogger(Hooks):
+    """Log a warning for request attempts slower than ``threshold`` seconds.
+
+    For streams the threshold applies to the time until response headers.
+    The phase breakdown is included when phase tracing is enabled.
+
+    Args:
+        logger: Logger to write to.
+        threshold: Threshold in seconds.
+    """
+
+    def __init__(self, logger: logging.Logger, threshold: float):
+        self.logger = logger
+        self.threshold = threshold
+
+    def on_response(self, ctx: RequestContext, response: Any) -> None:
+        self._check(ctx, f"status {ctx.status_code}")
+
+    def on_retry(self, ctx: RequestContext, error: BaseException, delay: float) -> None:
+        self._check(ctx, type(error).__name__)
+
+    def on_error(self, ctx: RequestContext, error: BaseException) -> None:
+        if ctx.status_code is None:
+            self._check(ctx, type(error).__name__)
+
+    def _check(self, ctx: RequestContext, outcome: str) -> None:
+        elapsed = ctx.elapsed
+        if elapsed < self.threshold or not self.logger.isEnabledFor(logging.WARNING):
+            return
+        phases = ctx.phases.as_dict() if ctx.phases is not None else None
+        self.logger.warning(
+            "%s: Slow %s request to %s took %.3fs (attempt %d/%d, %s)%s",
+            ctx.request_id, ctx.method, ctx.endpoint, elapsed, ctx.attempt, ctx.max_attempts, outcome,
+            f" phases={phases}" if phases else "",
+            extra=log_extra(ctx, dify_status=ctx.status_code, dify_elapsed=elapsed),
+        )
+
+
+def log_extra(ctx: RequestContext, **fields: Any) -> Dict[str, Any]:
+    """Structured ``extra`` fields for a log record about ``ctx``."""
+    return {
+        "dify_request_id": ctx.request_id,
+        "dify_endpoint": ctx.endpoint,
+        "dify_method": ctx.method,
+        "dify_attempt": ctx.attempt,
+        **fields,
+    }
@@ -0,0 +1,491 @@
+# -*- coding: utf-8 -*-
+
+"""In-process metrics for the Dify client.
+
+This module provides a small, dependency-free metrics surface: fixed-bucket
+histograms, per-stream timing records and a registry that aggregates request
+and stream metrics per endpoint template (as defined in `config.API_ENDPOINTS`)
+so label cardinality stays bounded regardless of how many IDs appear in URLs.
+The registry exports in the Prometheus text format.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .codec import default_codec
+from .config import API_ENDPOINTS
+from .hooks import Hooks, RequestContext
+from .timing import PHASES, PhaseTimings
+
+# Latency buckets in seconds, similar to the Prometheus client defaults but
+# extended to cover long streaming responses.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+# Label used for paths that do not match any known endpoint template.
+UNKNOWN_ENDPOINT = "other"
+
+# Dify stream events that carry generated content.
+CONTENT_EVENTS = ("message", "agent_message", "text_chunk")
+
+
+@lru_cache(maxsize=None)
+def _compile_templates() -> List[Tuple[re.Pattern, str]]:
+    templates = sorted(set(API_ENDPOINTS.values()), key=lambda t: (t.count("{"), -len(t)))
+    compiled = []
+    for template in templates:
+        pattern = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(template))
+        compiled.append((re.compile(pattern + "$"), template))
+    return compiled
+
+
+def resolve_endpoint(path: str) -> str:
+    """Map a formatted request path back to its `API_ENDPOINTS` template.
+
+    Paths built with `routes.ROUTES` carry their template and are not matched.
+
+    Args:
+        path: The request path, e.g. "/v1/datasets/abc/documents".
+
+    Returns:
+        The matching template, e.g. "/v1/datasets/{dataset_id}/documents",
+        or `UNKNOWN_ENDPOINT` if no template matches.
+    """
+    template = getattr(path, "template", None)
+    return template if template is not None else _match_template(path)
+
+
+@lru_cache(maxsize=4096)
+def _match_template(path: str) -> str:
+    path = "/" + path.split("?", 1)[0].lstrip("/")
+    for pattern, template in _compile_templates():
+        if pattern.match(path):
+            return template
+    return UNKNOWN_ENDPOINT
+
+
+class Histogram:
+    """A fixed-bucket histogram with cumulative export, in the Prometheus style.
+
+    Observations are counted into the first bucket whose upper bound is
+    greater than or equal to the value; values above the largest bound go
+    into an implicit +Inf bucket.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the observations of another histogram with the same buckets."""
+        if other.buckets != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile by linear interpolation within buckets.
+
+        Returns None if nothing has been observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * ((rank - seen) / c)
+            seen += c
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+@dataclass
+class StreamTimings:
+    """Timing record for a single SSE stream.
+
+    All durations are in seconds, measured from the start of the first
+    attempt with `time.perf_counter`. A value of None means the phase did not
+    happen (e.g. `connect` is None when a pooled connection was reused).
+
+    Attributes:
+        endpoint: Endpoint template the stream was made against.
+        connect: Time until the TCP (and TLS) connection was established.
+        headers: Time until the response headers were received.
+        first_event: Time until the first SSE event arrived.
+        first_token: Time until the first event carrying generated content.
+        duration: Total time until the stream ended.
+        events: Number of events received.
+        bytes: Number of response body bytes received.
+        attempts: Number of connection attempts made.
+        completed: Whether the stream was read to its end.
+        gaps: Histogram of the gaps between consecutive events.
+        phases: Phase breakdown of the last attempt, when phase tracing is enabled.
+    """
+
+    endpoint: str
+    connect: Optional[float] = None
+    headers: Optional[float] = None
+    first_event: Optional[float] = None
+    first_token: Optional[float] = None
+    duration: Optional[float] = None
+    events: int = 0
+    bytes: int = 0
+    attempts: int = 0
+    completed: bool = False
+    gaps: Histogram = field(default_factory=Histogram)
+    phases: Optional[PhaseTimings] = None
+    started_at: float = field(default_factory=time.perf_counter)
+    _last_event_at: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the stream started."""
+        return time.perf_counter() - self.started_at
+
+    def on_headers(self, ctx: Optional[RequestContext] = None) -> None:
+        """Record response headers; ``ctx`` supplies the attempt's connect time."""
+        self.headers = self.elapsed
+        if ctx is not None:
+            if ctx.connect is not None:
+                self.connect = ctx.started_at - self.started_at + ctx.connect
+            self.phases = ctx.phases
+
+    def on_event(self, event: Any) -> None:
+        now = time.perf_counter()
+        self.events += 1
+        if self._last_event_at is None:
+            self.first_event = now - self.started_at
+        else:
+            self.gaps.observe(now - self._last_event_at)
+        self._last_event_at = now
+        if self.first_token is None and is_content_event(event):
+            self.first_token = now - self.started_at
+
+    def finish(self, num_bytes: int = 0, completed: bool = False) -> None:
+        self.duration = self.elapsed
+        if self.phases is not None:
+            self.phases.finish()
+        self.bytes += num_bytes
+        self.completed = completed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "connect": self.connect,
+            "headers": self.headers,
+            "first_event": self.first_event,
+            "first_token": self.first_token,
+            "duration": self.duration,
+            "events": self.events,
+            "bytes": self.bytes,
+            "attempts": self.attempts,
+            "completed": self.completed,
+            "gaps": self.gaps.snapshot(),
+            "phases": self.phases.as_dict() if self.phases is not None else None,
+        }
+
+
+def is_content_event(event: Any) -> bool:
+    """Whether an SSE event carries generated text (the "first token" of a stream)."""
+    data = getattr(event, "data", None)
+    if not data or not any(name in data for name in CONTENT_EVENTS):
+        return False
+    try:
+        payload = default_codec().loads(data)
+    except ValueError:
+        return False
+    if not isinstance(payload, dict) or payload.get("event") not in CONTENT_EVENTS:
+        return False
+    data = payload.get("data")
+    return bool(payload.get("answer") or payload.get("text") or (isinstance(data, dict) and data.get("text")))
+
+
+class StreamStats:
+    """Per-endpoint aggregate of `StreamTimings`."""
+
+    def __init__(self):
+        self.streams = 0
+        self.completed = 0
+        self.events = 0
+        self.bytes = 0
+        self.connect = Histogram()
+        self.headers = Histogram()
+        self.first_event = Histogram()
+        self.first_token = Histogram()
+        self.duration = Histogram()
+        self.gaps = Histogram()
+
+    def add(self, timings: StreamTimings) -> None:
+        self.streams += 1
+        self.completed += int(timings.completed)
+        self.events += timings.events
+        self.bytes += timings.bytes
+        for name in ("connect", "headers", "first_event", "first_token", "duration"):
+            value = getattr(timings, name)
+            if value is not None:
+                getattr(self, name).observe(value)
+        self.gaps.merge(timings.gaps)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "streams": self.streams,
+            "completed": self.completed,
+            "events": self.events,
+            "bytes": self.bytes,
+            "connect": self.connect.snapshot(),
+            "headers": self.headers.snapshot(),
+            "first_event": self.first_event.snapshot(),
+            "first_token": self.first_token.snapshot(),
+            "duration": self.duration.snapshot(),
+            "gaps": self.gaps.snapshot(),
+        }
+
+
+# name -> (type, help) for everything exported by `MetricsRegistry.to_prometheus`.
+_METRICS = {
+    "dify_client_requests_total": ("counter", "Request attempts that received a response, by status code."),
+    "dify_client_errors_total": ("counter", "Request attempts that failed, by error type."),
+    "dify_client_retries_total": ("counter", "Request attempts that were retried."),
+    "dify_client_request_bytes_total": ("counter", "Request body bytes sent."),
+    "dify_client_response_bytes_total": ("counter", "Response body bytes received."),
+    "dify_client_request_duration_seconds": ("histogram", "Time from attempt start to response."),
+    "dify_client_pool_wait_seconds": ("histogram", "Time until a pooled connection was handed to the request."),
+    "dify_client_request_phase_seconds": ("histogram", "Time spent per request phase, when phase tracing is enabled."),
+    "dify_client_concurrency_limit": ("gauge", "Current adaptive concurrency limit."),
+    "dify_client_concurrency_in_flight": ("gauge", "Requests holding an adaptive concurrency permit."),
+    "dify_client_concurrency_queued": ("gauge", "Requests waiting for an adaptive concurrency permit."),
+    "dify_client_scheduler_queued": ("gauge", "Requests waiting in the priority scheduler, by priority."),
+    "dify_client_scheduler_wait_seconds": ("histogram", "Time queued requests waited in the priority scheduler."),
+    "dify_client_deduplicated_total": ("counter", "Calls answered from the idempotency journal instead of being sent."),
+    "dify_client_outbox_calls_total": ("counter", "Outbox delivery attempts, by outcome (sent, retried, dead)."),
+    "dify_client_outbox_pending": ("gauge", "Calls waiting in the outbox."),
+    "dify_client_feedback_votes_total": ("counter", "Feedback votes handled by a FeedbackBuffer, by outcome."),
+}
+
+_STREAM_PHASES = ("connect", "headers", "first_event", "first_token", "duration", "gaps")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(str(v))}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry(Hooks):
+    """In-memory metrics registry shared by a client.
+
+    The registry is itself a `Hooks` implementation and is always installed
+    on `AsyncClient`, recording per endpoint template and method:
+
+    - latency and pool wait histograms,
+    - response counters by status code and error counters by type,
+    - retry counts and request/response byte counts,
+    - aggregated stream timings (see `StreamTimings`),
+    - gauges set by other components (e.g. `pydify_plus.limiter`).
+
+    Metrics are keyed by endpoint template, never by formatted URL, so
+    cardinality stays bounded.
+
+    Example:
+        >>> client.metrics.snapshot()["streams"]["/v1/chat-messages"]["first_token"]["p50"]
+        >>> print(client.metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.streams: Dict[str, StreamStats] = {}
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        """Increment counter ``name`` for ``labels``."""
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def set_gauge(self, name: str, labels: Labels, value: float) -> None:
+        """Set gauge ``name`` for ``labels`` to ``value``."""
+        with self._lock:
+            self.gauges.setdefault(name, {})[labels] = value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        """Record ``value`` into histogram ``name`` for ``labels``."""
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(labels)
+            if hist is None:
+                hist = series[labels] = Histogram(self.buckets)
+            hist.observe(value)
+
+    # Hooks
+
+    def on_response(self, ctx: RequestContext, response: Any) -> None:
+        labels = (("endpoint", ctx.endpoint), ("method", ctx.method))
+        self.inc("dify_client_requests_total", labels + (("status", str(ctx.status_code)),))
+        self.observe("dify_client_request_duration_seconds", labels, ctx.elapsed)
+        if ctx.pool_wait is not None:
+            self.observe("dify_client_pool_wait_seconds", labels, ctx.pool_wait)
+        if ctx.bytes_out:
+            self.inc("dify_client_request_bytes_total", labels, ctx.bytes_out)
+        if ctx.bytes_in:
+            self.inc("dify_client_response_bytes_total", labels, ctx.bytes_in)
+        # Stream phases are recorded once the stream has been read.
+        if ctx.phases is not None and not ctx.streaming:
+            self.observe_phases(ctx.phases)
+
+    def on_retry(self, ctx: RequestContext, error: BaseException, delay: float) -> None:
+        labels = (("endpoint", ctx.endpoint), ("method", ctx.method))
+        self.inc("dify_client_retries_total", labels)
+        self.inc("dify_client_errors_total", labels + (("error", type(error).__name__),))
+        if ctx.phases is not None and ctx.status_code is None:
+            self.observe_phases(ctx.phases)
+
+    def on_error(self, ctx: RequestContext, error: BaseException) -> None:
+        labels = (("endpoint", ctx.endpoint), ("method", ctx.method))
+        self.inc("dify_client_errors_total", labels + (("error", type(error).__name__),))
+        if ctx.phases is not None and ctx.status_code is None:
+            self.observe_phases(ctx.phases)
+
+    def observe_phases(self, phases: PhaseTimings) -> None:
+        """Record each measured phase of ``phases`` into the phase histogram."""
+        for phase in PHASES:
+            value = getattr(phases, phase)
+            if value is not None:
+                self.observe("dify_client_request_phase_seconds", (("endpoint", phases.endpoint), ("phase", phase)), value)
+
+    # Streams
+
+    def record_stream(self, timings: StreamTimings) -> None:
+        """Aggregate a finished stream into the per-endpoint statistics."""
+        with self._lock:
+            stats = self.streams.get(timings.endpoint)
+            if stats is None:
+                stats = self.streams[timings.endpoint] = StreamStats()
+            stats.add(timings)
+        if timings.phases is not None:
+            self.observe_phases(timings.phases)
+
+    # Export
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        """Sum counter ``name`` over all series matching the given labels."""
+        with self._lock:
+            series = self.counters.get(name, {})
+            return sum(v for k, v in series.items() if all(dict(k).get(lk) == lv for lk, lv in labels.items()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of all metrics."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(labels), "value": value} for labels, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+                "histograms": {
+                    name: [{"labels": dict(labels), **hist.snapshot()} for labels, hist in series.items()]
+                    for name, series in self.histograms.items()
+                },
+                "gauges": {
+                    name: [{"labels": dict(labels), "value": value} for labels, value in series.items()]
+                    for name, series in self.gauges.items()
+                },
+                "streams": {endpoint: s.snapshot() for endpoint, s in self.streams.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self.counters.items():
+                kind, help_text = _METRICS.get(name, ("counter", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in self.gauges.items():
+                _, help_text = _METRICS.get(name, ("gauge", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in self.histograms.items():
+                _, help_text = _METRICS.get(name, ("histogram", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, hist in series.items():
+                    lines += self._histogram_lines(name, labels, hist)
+            if self.streams:
+                lines += self._stream_lines()
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(name: str, labels: Labels, hist: Histogram) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            bucket_labels = _format_labels(labels, f'le="{le}"')
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(hist.sum)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+        return lines
+
+    def _stream_lines(self) -> List[str]:
+        lines = []
+        for counter in ("streams", "completed", "events", "bytes"):
+            name = f"dify_client_stream_{counter}_total"
+            lines += [f"# HELP {name} Streaming requests: {counter}.", f"# TYPE {name} counter"]
+            for endpoint, stats in self.streams.items():
+                lines.append(f"{name}{_format_labels((('endpoint', endpoint),))} {getattr(stats, counter)}")
+        for phase in _STREAM_PHASES:
+            name = f"dify_client_stream_{phase}_seconds"
+            lines += [f"# HELP {name} Streaming requests: {phase} time.", f"# TYPE {name} histogram"]
+            for endpoint, stats in self.streams.items():
+                lines += self._histogram_lines(name, (("endpoint", endpoint),), getattr(stats, phase))
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.gauges.clear()
+            self.streams.clear()
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any, Union
+from typing import Generic, List, Optional, Dict, Any, TypeVar, Union
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -77,8 +77,8 @@ class DatasetResponse(BaseModel):
     description: Optional[str] = Field(None, description="Dataset description")
     provider: str = Field(..., description="Data provider")
     permission: str = Field(..., description="Permission level")
-    data_source_type: str = Field(..., description="Data source type")
-    indexing_technique: str = Field(..., description="Indexing technique")
+    data_source_type: Optional[str] = Field(None, description="Data source type (null until the first document)")
+    indexing_technique: Optional[str] = Field(None, description="Indexing technique")
     app_count: int = Field(..., description="Number of apps using this dataset")
     document_count: int = Field(..., description="Number of documents in the dataset")
     word_count: int = Field(..., description="Total word count")
@@ -91,7 +91,7 @@ class DocumentResponse(BaseModel):
     """Response model for document operations."""
 
     id: str = Field(..., description="Document ID")
-    dataset_id: str = Field(..., description="Dataset ID")
+    dataset_id: Optional[str] = Field(None, description="Dataset ID (absent from list items)")
     position: int = Field(..., description="Document position")
     data_source_type: str = Field(..., description="Data source type")
     data_source_info: Optional[Dict[str, Any]] = Field(None, description="Data source information")
@@ -112,6 +112,23 @@ class DocumentResponse(BaseModel):
     segment_count: Optional[int] = Field(None, description="Segment count")
 
 
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """A page of a paginated list response."""
+
+    data: List[T] = Field(default_factory=list, description="Items on this page")
+    has_more: bool = Field(False, description="Whether more pages follow")
+    limit: int = Field(..., description="Page size")
+    total: Optional[int] = Field(None, description="Total number of items")
+    page: Optional[int] = Field(None, description="Page number")
+
+
+DatasetPage = Page[DatasetResponse]
+DocumentPage = Page[DocumentResponse]
+
+
 class WorkflowExecutionResponse(BaseModel):
     """Response model for workflow execution."""
 
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+"""A durable outbox for fire-and-forget mutations.
+
+Feedback, conversation renames and segment updates need not hold up the
+request that triggers them, and should not be lost when Dify is down. An
+`Outbox` writes each call to a SQLite database and returns; a background
+worker sends the queued calls in batches, at a bounded rate, and retries
+them with exponential backoff until they succeed:
+
+    >>> async with Outbox(client, "dify-outbox.db") as outbox:
+    ...     await outbox.enqueue("POST", ROUTES["FEEDBACK_LIKE"].format(message_id=mid), json={"score": 1})
+    ...     await outbox.enqueue("POST", ROUTES["CONVERSATION_RENAME"].format(conversation_id=cid), json={"name": name})
+
+Calls to the same path (e.g. two renames of one conversation) are sent
+one at a time in the order they were queued: a call waits until the ones
+queued before it on its path were sent or dead-lettered, retries
+included. Calls to different paths may be sent concurrently and in any
+order.
+
+Enqueueing is a single insert, so a request handler awaits it in well
+under a millisecond. Calls survive a restart: whatever is left in the
+database is sent when the next `Outbox` on it starts. Delivery is at
+least once (a call whose response was lost to a crash is sent again), so
+every call carries an idempotency key fixed at enqueue time (see
+`pydify_plus.idempotency`). Rows are not claimed, so open one `Outbox`
+per database file; two on the same file would both send every call.
+
+Connection errors, timeouts, 429 and 5xx responses are retried; any
+other error response or unexpected exception, or running out of
+``max_attempts``, moves the call to the dead letters (`dead_letters`,
+`retry_dead`).
+"""
+
+import asyncio
+import json as JSON
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .errors import DifyAPIError, DifyConnectionError, DifyRateLimitError, DifyServerError, DifyTimeoutError
+from .idempotency import new_key
+from .routes import RoutePath
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    template TEXT,
+    name TEXT,
+    json TEXT,
+    params TEXT,
+    api_key_name TEXT,
+    idempotency_key TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_at, id);
+CREATE INDEX IF NOT EXISTS outbox_path ON outbox (path, id);
+"""
+
+_COLUMNS = "id, method, path, template, name, json, params, api_key_name, idempotency_key, attempts"
+
+# Pending calls with no earlier pending call on their path.
+_HEADS = (
+    "status = 'pending' AND NOT EXISTS"
+    " (SELECT 1 FROM outbox AS earlier WHERE earlier.path = outbox.path AND earlier.status = 'pending' AND earlier.id < outbox.id)"
+)
+
+# Failures worth trying again later.
+RETRYABLE_ERRORS = (DifyConnectionError, DifyTimeoutError, DifyRateLimitError, DifyServerError, httpx.TransportError)
+
+
+class Outbox:
+    """Queue mutations in SQLite and send them from a background worker.
+
+    Args:
+        client: The `AsyncClient` that sends the calls.
+        path: SQLite database file. Defaults to ":memory:", which is not
+            durable and only decouples callers from the request.
+        batch_size: Calls fetched and sent per round. Defaults to 50.
+        concurrency: Calls of a batch in flight at once. Defaults to 4.
+        rate: Calls sent per second at most. Defaults to None (no limit).
+        max_attempts: Attempts before a call is dead-lettered. Defaults to 10.
+        backoff: Seconds before the first retry, doubled per attempt.
+            Defaults to 1.0.
+        max_backoff: Longest wait between attempts. Defaults to 300.0.
+        poll_interval: Longest the idle worker sleeps between checks for due
+            calls. Defaults to 1.0.
+        priority: Scheduler priority of the calls. Defaults to "background".
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        path: str = ":memory:",
+        *,
+        batch_size: int = 50,
+        concurrency: int = 4,
+        rate: Optional[float] = None,
+        max_attempts: int = 10,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        poll_interval: float = 1.0,
+        priority: Optional[str] = "background",
+    ):
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.priority = priority
+        self._db = sqlite3.connect(path, isolation_level=None)
+        if path != ":memory:":
+            # Appends go to the write-ahead log; fsync happens at checkpoints.
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._next_send = 0.0
+        self._wake = asyncio.Event()
+        self._progress = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def __aenter__(self) -> "Outbox":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def start(self) -> None:
+        """Start the background worker."""
+        if self._worker is None:
+            self._closing = False
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def enqueue(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+        api_key_name: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> int:
+        """Queue a call; returns its id once it is stored.
+
+        ``path`` is best a formatted route (``ROUTES[name].format(...)``), so the
+        call keeps its endpoint profile when it is sent.
+        """
+        now = time.time()
+        cursor = self._db.execute(
+            "INSERT INTO outbox (method, path, template, name, json, params, api_key_name, idempotency_key, next_at, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                method, str(path), getattr(path, "template", None), getattr(path, "name", None),
+                None if json is None else JSON.dumps(json), None if params is None else JSON.dumps(params),
+                api_key_name, idempotency_key or new_key(), now, now,
+            ),
+        )
+        self._wake.set()
+        return cursor.lastrowid
+
+    async def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every queued call is sent or dead-lettered.
+
+        Raises:
+            RuntimeError: If the worker is not running or stops while waiting.
+            TimeoutError: If calls are still queued after ``timeout`` seconds.
+        """
+        worker = self._worker
+        if worker is None or worker.done():
+            raise RuntimeError("Outbox worker is not running; use `async with` or start()")
+        async with asyncio.timeout(timeout):
+            while self.pending():
+                self._progress.clear()
+                progress = asyncio.ensure_future(self._progress.wait())
+                try:
+                    await asyncio.wait((progress, worker), return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    progress.cancel()
+                if worker.done():
+                    error = None if worker.cancelled() else worker.exception()
+                    raise RuntimeError(f"Outbox worker stopped with {self.pending()} calls queued") from error
+
+    async def aclose(self, timeout: Optional[float] = 5.0) -> None:
+        """Send what is due within ``timeout`` seconds, then stop; the rest stays queued."""
+        worker, self._worker = self._worker, None
+        if worker is not None and worker.done():
+            if not worker.cancelled() and worker.exception() is not None:
+                logger.warning(f"Outbox worker had stopped: {worker.exception()!r}")
+        elif worker is not None:
+            self._closing = True
+            self._wake.set()
+            try:
+                await asyncio.wait_for(worker, timeout)
+            except TimeoutError:
+                logger.warning(f"Outbox closed with {self.pending()} calls queued")
+        self._db.close()
+
+    def pending(self) -> int:
+        """Calls waiting to be sent."""
+        return self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Calls that were given up on, oldest first."""
+        rows = self._db.execute(
+            "SELECT id, method, path, attempts, last_error, created_at FROM outbox WHERE status = 'dead' ORDER BY id"
+        ).fetchall()
+        return [dict(zip(("id", "method", "path", "attempts", "last_error", "created_at"), row)) for row in rows]
+
+    def retry_dead(self) -> int:
+        """Queue the dead letters again; returns how many."""
+        count = self._db.execute(
+            "UPDATE outbox SET status = 'pending', attempts = 0, next_at = ? WHERE status = 'dead'", (time.time(),)
+        ).rowcount
+        self._wake.set()
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            batch = self._db.execute(
+                f"SELECT {_COLUMNS} FROM outbox WHERE {_HEADS} AND next_at <= ? ORDER BY next_at, id LIMIT ?",
+                (time.time(), self.batch_size),
+            ).fetchall()
+            if batch:
+                await asyncio.gather(*(self._deliver(row) for row in batch))
+                self._publish()
+                self._progress.set()
+                continue
+            self._progress.set()
+            if self._closing:
+                return
+            row = self._db.execute(f"SELECT MIN(next_at) FROM outbox WHERE {_HEADS}").fetchone()
+            wait = self.poll_interval if row[0] is None else min(self.poll_interval, max(row[0] - time.time(), 0.0))
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait)
+            except TimeoutError:
+                pass
+
+    async def _deliver(self, row: tuple) -> None:
+        call_id, method, path, template, name, json, params, api_key_name, key, attempts = row
+        async with self._slots:
+            await self._pace()
+            try:
+                await self.client._arequest(
+                    method,
+                    RoutePath(path, template, name) if template else path,
+                    json=None if json is None else JSON.loads(json),
+                    params=None if params is None else JSON.loads(params),
+                    api_key_name=api_key_name,
+                    retries=0,
+                    priority=self.priority,
+                    idempotency_key=key,
+                )
+            except RETRYABLE_ERRORS as e:
+                attempts += 1
+                if attempts < self.max_attempts:
+                    delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+                    self._db.execute(
+                        "UPDATE outbox SET attempts = ?, next_at = ?, last_error = ? WHERE id = ?",
+                        (attempts, time.time() + delay, repr(e), call_id),
+                    )
+                    self._count("retried")
+                    return
+                self._dead(call_id, attempts, e)
+            except (DifyAPIError, ValueError) as e:
+                self._dead(call_id, attempts + 1, e)
+            except Exception as e:
+                # Not worth retrying, and it must not take the worker down.
+                logger.exception(f"Unexpected error sending outbox call {call_id}")
+                self._dead(call_id, attempts + 1, e)
+            else:
+                self._db.execute("DELETE FROM outbox WHERE id = ?", (call_id,))
+                self._count("sent")
+
+    async def _pace(self) -> None:
+        if self.rate is None:
+            return
+        now = time.monotonic()
+        at = max(now, self._next_send)
+        self._next_send = at + 1.0 / self.rate
+        if at > now:
+            await asyncio.sleep(at - now)
+
+    def _dead(self, call_id: int, attempts: int, error: Exception) -> None:
+        logger.warning(f"Outbox call {call_id} dead-lettered after {attempts} attempts: {error!r}")
+        self._db.execute("UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?", (attempts, repr(error), call_id))
+        self._count("dead")
+
+    def _count(self, outcome: str) -> None:
+        self.client.metrics.inc("dify_client_outbox_calls_total", (("outcome", outcome),))
+
+    def _publish(self) -> None:
+        self.client.metrics.set_gauge("dify_client_outbox_pending", (), self.pending())
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""Timeout and retry profiles per endpoint.
+
+One client-wide ``timeout`` and ``retries`` fit few endpoints well: app
+metadata answers in milliseconds, a document upload can take minutes and a
+streamed chat needs a long read timeout but should fail fast when it
+cannot connect. A `RequestProfile` sets the policy of one endpoint, keyed
+by its `API_ENDPOINTS` name. `DEFAULT_PROFILES` ships one per family, and
+the ``profiles`` argument of `AsyncClient` overrides them field by field:
+
+    >>> client = AsyncClient(base_url, api_key, profiles={
+    ...     "DOCUMENTS_CREATE_FILE": RequestProfile(timeout=httpx.Timeout(900.0, connect=5.0)),
+    ...     "FEEDBACK_LIKE": RequestProfile(retries=5),
+    ... })
+
+A field left as None falls through to the client setting. The timeout of
+a call is, in order: the ``timeout`` argument, ``endpoint_timeouts``, the
+profile and the client ``timeout``; its retries are the ``retries``
+argument, the profile and the client ``retries``.
+
+``retry_after_send`` decides whether an attempt that failed after the
+request was sent (a read or write timeout, or the deadline running out
+mid-request) is retried. The server may have acted on it, so by default
+only idempotent methods are; errors before sending (connect and pool
+timeouts, refused connections) are always retried. Streams set it, since
+a cut stream is requested again (see `AsyncClient._stream_request`).
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, List, Mapping, Optional, Union
+
+import httpx
+
+from .config import API_ENDPOINTS
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    """The timeout and retry policy of an endpoint.
+
+    Attributes:
+        timeout: Per-attempt timeout in seconds or as `httpx.Timeout`.
+        retries: Number of retry attempts.
+        retry_after_send: Whether to retry an attempt that failed after the
+            request was sent. None retries idempotent methods only.
+    """
+
+    timeout: Union[float, httpx.Timeout, None] = None
+    retries: Optional[int] = None
+    retry_after_send: Optional[bool] = None
+
+    def merge(self, other: "RequestProfile") -> "RequestProfile":
+        """This profile with the fields ``other`` sets."""
+        values = {f.name: getattr(other, f.name) for f in fields(other) if getattr(other, f.name) is not None}
+        return RequestProfile(**{f.name: getattr(self, f.name) for f in fields(self)} | values)
+
+
+NO_PROFILE = RequestProfile()
+
+# App settings and metadata are small reads.
+METADATA = RequestProfile(timeout=httpx.Timeout(2.0, connect=1.0))
+# Blocking generation waits for the whole answer.
+GENERATION = RequestProfile(timeout=httpx.Timeout(300.0, connect=3.0))
+# The read timeout bounds the gap between two events.
+STREAM = RequestProfile(timeout=httpx.Timeout(120.0, connect=3.0), retry_after_send=True)
+# Large files take a while to send and to be parsed by the server.
+UPLOAD = RequestProfile(timeout=httpx.Timeout(600.0, connect=5.0, pool=30.0))
+
+DEFAULT_PROFILES: Dict[str, RequestProfile] = {
+    **dict.fromkeys(
+        [
+            "APP_BASIC_INFO", "APP_PARAMETERS", "APP_META", "APP_WEBAPP_SETTINGS",
+            "WORKFLOW_APP_BASIC_INFO", "WORKFLOW_APP_PARAMETERS", "WORKFLOW_APP_WEBAPP_SETTINGS",
+            "EMBEDDING_MODELS_LIST",
+        ],
+        METADATA,
+    ),
+    **dict.fromkeys(["CHAT_MESSAGES_CREATE", "COMPLETION_MESSAGES_CREATE", "WORKFLOW_EXECUTE"], GENERATION),
+    **dict.fromkeys(["CHAT_MESSAGES_STREAM", "COMPLETION_MESSAGES_STREAM"], STREAM),
+    **dict.fromkeys(
+        ["FILES_UPLOAD", "FILE_UPLOAD", "WORKFLOW_FILES_UPLOAD", "DOCUMENTS_CREATE_FILE", "DOCUMENTS_UPDATE_FILE"],
+        UPLOAD,
+    ),
+}
+
+
+def _names(key: str) -> List[str]:
+    if key in API_ENDPOINTS:
+        return [key]
+    names = [name for name, template in API_ENDPOINTS.items() if template == key]
+    if not names:
+        raise ValueError(f"Unknown endpoint {key!r}; expected an API_ENDPOINTS name or template")
+    return names
+
+
+class ProfileTable:
+    """Profiles resolved for a client: ``overrides`` merged over ``defaults``.
+
+    Args:
+        overrides: Profiles keyed by `API_ENDPOINTS` name; a template applies
+            to every name sharing it.
+        defaults: The shipped profiles. Defaults to `DEFAULT_PROFILES`.
+
+    Raises:
+        ValueError: If a key is neither an endpoint name nor a template.
+    """
+
+    def __init__(
+        self,
+        overrides: Optional[Mapping[str, RequestProfile]] = None,
+        defaults: Mapping[str, RequestProfile] = DEFAULT_PROFILES,
+    ):
+        self.by_name: Dict[str, RequestProfile] = dict(defaults)
+        for key, profile in (overrides or {}).items():
+            for name in _names(key):
+                self.by_name[name] = self.by_name.get(name, NO_PROFILE).merge(profile)
+        # Plain string paths only know their template, which several names may
+        # share (e.g. DATASETS_CREATE and DATASETS_LIST); it is used when they agree.
+        candidates: Dict[str, List[RequestProfile]] = {}
+        for name, template in API_ENDPOINTS.items():
+            candidates.setdefault(template, []).append(self.by_name.get(name, NO_PROFILE))
+        self.by_template: Dict[str, RequestProfile] = {
+            template: found[0] for template, found in candidates.items() if all(p == found[0] for p in found)
+        }
+
+    def lookup(self, path: str, endpoint: str) -> RequestProfile:
+        """The profile of a request to ``path``, whose template is ``endpoint``."""
+        name = getattr(path, "name", None)
+        if name is not None:
+            return self.by_name.get(name, NO_PROFILE)
+        return self.by_template.get(endpoint, NO_PROFILE)
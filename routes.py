@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""Precompiled endpoint routes.
+
+Every template in `API_ENDPOINTS` is parsed once into a `Route` that
+formats request paths without re-parsing the template and validates the
+placeholder values. Formatted paths are `RoutePath` strings that remember
+their template and route name, so metrics, logging and endpoint profiles
+can label the request without matching the path against every template
+again.
+
+    >>> ROUTES["DOCUMENTS_LIST"].format(dataset_id="d1")
+    '/v1/datasets/d1/documents'
+    >>> ROUTES["DOCUMENTS_LIST"].format(dataset_id="d1").template
+    '/v1/datasets/{dataset_id}/documents'
+    >>> ROUTES["DOCUMENTS_LIST"].format(dataset_id="d1").name
+    'DOCUMENTS_LIST'
+"""
+
+import string
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import API_ENDPOINTS
+
+
+class RoutePath(str):
+    """A request path carrying the endpoint template and route name it was formatted from."""
+
+    def __new__(cls, path: str, template: str, name: Optional[str] = None) -> "RoutePath":
+        self = super().__new__(cls, path)
+        self.template = template
+        self.name = name
+        return self
+
+
+class Route:
+    """An endpoint template compiled for fast, validated formatting.
+
+    Args:
+        name: The `API_ENDPOINTS` key.
+        template: The path template, e.g. "/v1/datasets/{dataset_id}".
+
+    Raises:
+        ValueError: If the template uses positional fields, format specs or
+            conversions, or repeats a placeholder.
+    """
+
+    __slots__ = ("name", "template", "params", "path", "_pattern", "_slashes")
+
+    def __init__(self, name: str, template: str):
+        pattern: List[str] = []
+        params: List[str] = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            pattern.append(literal.replace("%", "%%"))
+            if field is None:
+                continue
+            if not field.isidentifier() or spec or conversion:
+                raise ValueError(f"Unsupported placeholder {{{field}}} in route {name}: {template}")
+            if field in params:
+                raise ValueError(f"Repeated placeholder {{{field}}} in route {name}: {template}")
+            pattern.append("%s")
+            params.append(field)
+        self.name = name
+        self.template = template
+        self.params: Tuple[str, ...] = tuple(params)
+        self._pattern = "".join(pattern)
+        self._slashes = template.count("/")
+        # Routes without placeholders are formatted once.
+        self.path = RoutePath(template, template, name) if not params else None
+
+    def format(self, **values: Any) -> RoutePath:
+        """Substitute the placeholders.
+
+        Raises:
+            ValueError: If a placeholder is missing, unexpected, empty or contains "/".
+        """
+        if self.path is not None and not values:
+            return self.path
+        try:
+            path = self._pattern % tuple([values[name] for name in self.params])
+        except KeyError:
+            path = None
+        # A value that is empty or contains "/" changes the segment count.
+        if path is None or len(values) != len(self.params) or path.count("/") != self._slashes or "//" in path or path.endswith("/"):
+            self._invalid(values)
+        return RoutePath(path, self.template, self.name)
+
+    def _invalid(self, values: Dict[str, Any]) -> None:
+        missing = [p for p in self.params if p not in values]
+        unexpected = [k for k in values if k not in self.params]
+        if missing or unexpected:
+            raise ValueError(f"Route {self.name} ({self.template}) missing {missing}, unexpected {unexpected}")
+        for name in self.params:
+            value = str(values[name])
+            if not value or "/" in value:
+                raise ValueError(f"Invalid {name}={value!r} for route {self.name}")
+
+    def __repr__(self) -> str:
+        return f"Route({self.name!r}, {self.template!r})"
+
+
+ROUTES: Dict[str, Route] = {name: Route(name, template) for name, template in API_ENDPOINTS.items()}
@@ -1,16 +1,30 @@
 import anyio
+import asyncio
+import functools
 import logging
-from typing import Any, Optional, Iterator
-from httpx_sse import connect_sse, ServerSentEvent
+from typing import TYPE_CHECKING, Any, Optional, Iterator
 
 from .base import BaseClient
 from .async_client import AsyncClient
 
+if TYPE_CHECKING:
+    from httpx_sse import ServerSentEvent
+
+
+def connect_sse(*args: Any, **kwargs: Any) -> Any:
+    """`httpx_sse.connect_sse`, imported on first use to keep the package import light."""
+    from httpx_sse import connect_sse as connect
+
+    return connect(*args, **kwargs)
+
+
 class Client(BaseClient):
     """Synchronous client for interacting with the Dify API.
 
     This client provides synchronous methods for all Dify API endpoints and supports
-    streaming responses using Server-Sent Events. It wraps the AsyncClient internally.
+    streaming responses using Server-Sent Events. It wraps the AsyncClient internally;
+    the API modules (``client.chat``, ``client.dataset``, ...) are coroutines that
+    run on that wrapped client.
 
     Example:
         >>> from pydify_plus import Client
@@ -57,28 +71,28 @@ class Client(BaseClient):
             logger=logger,
             **kwargs
         )
+        self.metrics = self._async_client.metrics
 
-    def _arequest(
-        self,
-        method: str,
-        path: str,
-        *,
-        json: Optional[dict] = None,
-        params: Optional[dict] = None,
-        files: Optional[Any] = None,
-        timeout: Optional[float] = None,
-        retries: Optional[int] = None,
-    ) -> dict:
-        return anyio.run(
-            self._async_client._arequest,
-            method,
-            path,
-            json=json,
-            params=params,
-            files=files,
-            timeout=timeout,
-            retries=retries,
-        )
+    @property
+    def _api_client(self) -> AsyncClient:
+        # The API modules are coroutines; they run on the wrapped client.
+        return self._async_client
+
+    def _arequest(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Make a request through the wrapped `AsyncClient` and return its result.
+
+        Takes the keyword arguments of `AsyncClient._arequest` (``json``,
+        ``data``, ``files``, ``api_key_name``, ``idempotency_key``, ...).
+
+        Raises:
+            RuntimeError: If called from a running event loop; await the API
+                modules (``client.dataset``, ...) or use `AsyncClient` there.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return anyio.run(functools.partial(self._async_client._arequest, method, path, **kwargs))
+        raise RuntimeError("Client._arequest blocks and cannot run inside an event loop; use AsyncClient instead")
 
     def __enter__(self):
         anyio.run(self._async_client.__aenter__)
@@ -95,7 +109,7 @@ class Client(BaseClient):
         json: Optional[dict] = None,
         params: Optional[dict] = None,
         timeout: Optional[float] = None,
-    ) -> Iterator[ServerSentEvent]:
+    ) -> Iterator["ServerSentEvent"]:
         """Make a streaming request using Server-Sent Events (synchronous version).
         
         Args:
@@ -120,7 +134,7 @@ class Client(BaseClient):
             self._async_client._cli,
             method,
             url,
-            headers=headers,
+            headers=dict(headers),
             json=json,
             params=params,
             timeout=_timeout,
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+"""Many tenants on one connection pool.
+
+A `ClientManager` hands out a `TenantClient` per tenant (one Dify app or
+API key). All tenant clients share a single `httpx.AsyncClient`, so the
+number of sockets is bounded by the pool limits rather than the number of
+tenants, and they record into one metrics registry. Only the credentials
+and a per-tenant concurrency quota differ between them.
+
+Tenant clients are kept in a bounded LRU: the least recently used tenant
+is dropped when ``max_tenants`` is exceeded, and tenants idle for longer
+than ``idle_timeout`` are dropped as the manager is used. A dropped tenant
+is simply created again on its next use.
+
+    >>> async with ClientManager("https://api.dify.ai", api_keys=lookup_key) as manager:
+    ...     client = manager.client("tenant-42")
+    ...     await client.chat.create_chat_message(...)
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence, Set, Union
+
+import httpx
+
+from .async_client import AsyncClient
+from .balancer import LoadBalancer
+from .base import API_KEY_NAME
+from .metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+ApiKey = Union[str, Dict[str, str]]
+
+
+class TenantClient(AsyncClient):
+    """An `AsyncClient` bound to one tenant of a `ClientManager`.
+
+    Requests and streams wait for a slot of the tenant's concurrency quota
+    (if any) before they are sent. Closing a tenant client does not close
+    the shared connection pool.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        base_url: Union[str, Sequence[str]],
+        api_key: ApiKey,
+        *,
+        max_concurrency: Optional[int] = None,
+        on_use: Optional[Callable[["TenantClient"], None]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(base_url, api_key, **kwargs)
+        self.tenant_id = tenant_id
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self._quota = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._on_use = on_use
+
+    def _begin(self) -> None:
+        self.in_flight += 1
+        if self._on_use is not None:
+            self._on_use(self)
+
+    async def _arequest(self, *args: Any, **kwargs: Any) -> Any:
+        self._begin()
+        try:
+            if self._quota is None:
+                return await super()._arequest(*args, **kwargs)
+            async with self._quota:
+                return await super()._arequest(*args, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+    async def _iter_sse(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        self._begin()
+        try:
+            if self._quota is None:
+                async with aclosing(super()._iter_sse(*args, **kwargs)) as events:
+                    async for event in events:
+                        yield event
+                return
+            async with self._quota:
+                async with aclosing(super()._iter_sse(*args, **kwargs)) as events:
+                    async for event in events:
+                        yield event
+        finally:
+            self.in_flight -= 1
+
+    def __repr__(self) -> str:
+        return f"<TenantClient {self.tenant_id!r} in_flight={self.in_flight}>"
+
+
+class ClientManager:
+    """Tenant-scoped clients sharing one connection pool.
+
+    Args:
+        base_url: The base URL of the Dify API, or a list of replica base URLs,
+            shared by all tenants. Replicas are balanced by one `LoadBalancer`
+            for all tenants.
+        api_keys: Looks up a tenant's API key (a key or a dict of keys, as
+            accepted by `AsyncClient`) when ``client`` is called without one.
+        max_tenants: Tenant clients kept at most; the least recently used
+            idle tenant is dropped beyond that. Defaults to 1000.
+        idle_timeout: Seconds after which an unused tenant is dropped; None
+            keeps tenants until they are pushed out of the LRU. Defaults to 600.
+        max_concurrency_per_tenant: Requests (and streams) a tenant may have in
+            flight at once; further calls wait. None means unlimited.
+        limits: Connection pool limits of the shared pool.
+        timeout: Request timeout in seconds. Defaults to 30.0.
+        transport: Custom httpx transport for the shared pool.
+        metrics: Registry all tenants record into; a new one by default.
+        **client_kwargs: Passed to every `TenantClient` (e.g. ``retries``, ``hooks``).
+    """
+
+    def __init__(
+        self,
+        base_url: Union[str, Sequence[str]],
+        api_keys: Optional[Callable[[str], ApiKey]] = None,
+        *,
+        max_tenants: int = 1000,
+        idle_timeout: Optional[float] = 600.0,
+        max_concurrency_per_tenant: Optional[int] = None,
+        limits: Optional[httpx.Limits] = None,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        **client_kwargs: Any,
+    ):
+        if max_tenants < 1:
+            raise ValueError("max_tenants must be at least 1")
+        if not isinstance(base_url, str) and not isinstance(client_kwargs.get("balance"), LoadBalancer):
+            client_kwargs["balance"] = LoadBalancer(base_url, client_kwargs.get("balance", "least_outstanding"))
+        self.base_url = base_url
+        self.api_keys = api_keys
+        self.max_tenants = max_tenants
+        self.idle_timeout = idle_timeout
+        self.max_concurrency_per_tenant = max_concurrency_per_tenant
+        self.limits = limits or httpx.Limits()
+        self.timeout = timeout
+        self.transport = transport
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.client_kwargs = client_kwargs
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        self._tenants: "OrderedDict[str, TenantClient]" = OrderedDict()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._closing: Set[asyncio.Task] = set()
+        self._clock: Callable[[], float] = time.monotonic
+        self._last_sweep = self._clock()
+
+    async def __aenter__(self) -> "ClientManager":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all tenants (running their close hooks, e.g. feedback buffers) and the shared pool."""
+        tenants = list(self._tenants.values())
+        self._tenants.clear()
+        await asyncio.gather(*(tenant.aclose() for tenant in tenants), *self._closing)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The connection pool shared by all tenants."""
+        if self._http is None:
+            # Tenant clients send absolute URLs, so the pool has no base URL of its own.
+            self._http = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self.transport)
+        return self._http
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def __contains__(self, tenant_id: str) -> bool:
+        return tenant_id in self._tenants
+
+    def client(self, tenant_id: str, api_key: Optional[ApiKey] = None, *, max_concurrency: Optional[int] = None) -> TenantClient:
+        """The client of ``tenant_id``, created on first use.
+
+        Args:
+            tenant_id: Any stable tenant identifier.
+            api_key: The tenant's key(s). Replaces the stored key if it changed;
+                looked up with ``api_keys`` when the tenant is new and no key is given.
+            max_concurrency: Quota for a new tenant; defaults to
+                ``max_concurrency_per_tenant``.
+
+        Raises:
+            ValueError: If the tenant is new and no key is given or found.
+        """
+        now = self._clock()
+        if self.idle_timeout is not None and now - self._last_sweep >= self.idle_timeout / 4:
+            self.evict_idle(now)
+
+        tenant = self._tenants.get(tenant_id)
+        if tenant is not None:
+            if api_key is not None:
+                api_key = {API_KEY_NAME: api_key} if isinstance(api_key, str) else api_key
+                if api_key != tenant.api_key:
+                    tenant.api_key = api_key
+            self._touch(tenant)
+            return tenant
+
+        if api_key is None:
+            if self.api_keys is None:
+                raise ValueError(f"No API key for tenant {tenant_id!r}")
+            api_key = self.api_keys(tenant_id)
+        tenant = TenantClient(
+            tenant_id,
+            self.base_url,
+            api_key,
+            max_concurrency=max_concurrency if max_concurrency is not None else self.max_concurrency_per_tenant,
+            on_use=self._touch,
+            timeout=self.timeout,
+            metrics=self.metrics,
+            http_client=self.http_client,
+            **self.client_kwargs,
+        )
+        tenant.last_used = now
+        self._tenants[tenant_id] = tenant
+        if len(self._tenants) > self.max_tenants:
+            self._evict_lru()
+        return tenant
+
+    def remove(self, tenant_id: str) -> None:
+        """Forget a tenant (e.g. after its key was revoked)."""
+        tenant = self._tenants.pop(tenant_id, None)
+        if tenant is not None:
+            self._drop(tenant)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop tenants idle for longer than ``idle_timeout``; returns how many."""
+        now = self._clock() if now is None else now
+        self._last_sweep = now
+        if self.idle_timeout is None:
+            return 0
+        evicted = 0
+        # Tenants are ordered by last use, so the sweep stops at the first active one.
+        while self._tenants:
+            tenant = next(iter(self._tenants.values()))
+            if now - tenant.last_used < self.idle_timeout or tenant.in_flight:
+                break
+            del self._tenants[tenant.tenant_id]
+            self._drop(tenant)
+            evicted += 1
+        self.evicted_idle += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Tenant counts and eviction totals."""
+        return {
+            "tenants": len(self._tenants),
+            "max_tenants": self.max_tenants,
+            "in_flight": sum(t.in_flight for t in self._tenants.values()),
+            "evicted_lru": self.evicted_lru,
+            "evicted_idle": self.evicted_idle,
+        }
+
+    def _touch(self, tenant: TenantClient) -> None:
+        tenant.last_used = self._clock()
+        if self._tenants.get(tenant.tenant_id) is tenant:
+            self._tenants.move_to_end(tenant.tenant_id)
+
+    def _evict_lru(self) -> None:
+        # Tenants with requests in flight keep their quota; skip them.
+        for tenant_id, tenant in self._tenants.items():
+            if not tenant.in_flight:
+                del self._tenants[tenant_id]
+                self._drop(tenant)
+                self.evicted_lru += 1
+                return
+
+    def _drop(self, tenant: TenantClient) -> None:
+        """Run the close hooks of a tenant that was let go; `aclose` waits for them."""
+        if not tenant._closers:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(tenant.aclose())
+        except RuntimeError:
+            logger.warning(f"Tenant {tenant.tenant_id!r} dropped outside an event loop; its close hooks did not run")
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""Offline testing utilities: a local stand-in for the Dify API, fault specifications and cassettes."""
+
+from .cassette import Cassette, CassetteMissError, Interaction, RecordingTransport, ReplayTransport
+from .faults import ZERO, Fault, FaultInjectionTransport, Latency, RetryCostTracker
+from .server import DEFAULT_API_KEYS, InProcessTransport, LocalServer, MockDifyServer, RecordedRequest
+
+__all__ = [
+    "Cassette",
+    "CassetteMissError",
+    "DEFAULT_API_KEYS",
+    "Fault",
+    "FaultInjectionTransport",
+    "InProcessTransport",
+    "Interaction",
+    "Latency",
+    "LocalServer",
+    "MockDifyServer",
+    "RecordedRequest",
+    "RecordingTransport",
+    "ReplayTransport",
+    "RetryCostTracker",
+    "ZERO",
+]
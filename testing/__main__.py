@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+"""Run the local Dify stand-in: ``python -m pydify_plus.testing --port 8080``."""
+
+from .server import main
+
+main()
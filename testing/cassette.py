@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+"""Record and replay HTTP traffic for deterministic performance tests.
+
+A `Cassette` holds request/response interactions together with their
+timing: when the response headers arrived and when every body chunk
+arrived, so SSE streams keep their original inter-event gaps. Cassettes
+are stored as JSON lines (gzip-compressed when the path ends in ``.gz``).
+
+Record against a live (or stand-in) service, then replay offline at the
+original speed, accelerated, or with no delay at all:
+
+    >>> cassette = Cassette()
+    >>> async with AsyncClient(base_url, api_key, transport=cassette.recorder()) as client:
+    ...     async for event in client.chat.stream_chat_message(messages="Hello"):
+    ...         pass
+    >>> cassette.save("chat.jsonl.gz")
+    >>>
+    >>> player = Cassette.load("chat.jsonl.gz").player(speed=10.0)
+    >>> client = AsyncClient(base_url, api_key, transport=player)
+
+Only the method, path, query string and a digest of the request body
+are stored; request headers (including the API key) are not.
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json as JSON
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+FORMAT_VERSION = 1
+
+# Response headers never written to a cassette.
+_DROPPED_HEADERS = frozenset({"set-cookie", "date"})
+
+
+class CassetteMissError(LookupError):
+    """Raised on replay when no recorded interaction matches a request."""
+
+
+@dataclass
+class Interaction:
+    """One recorded request and its response.
+
+    Attributes:
+        method: HTTP method.
+        path: URL path.
+        query: Raw query string.
+        body_digest: SHA-256 of the request body (used when matching bodies).
+        body_size: Request body size in bytes.
+        status: Response status code.
+        headers: Response headers.
+        headers_at: Seconds from the request start until the response headers arrived.
+        chunks: ``(offset, data)`` pairs, offsets in seconds from the request start.
+        complete: Whether the whole body was read while recording.
+        error: Name of the httpx exception raised while recording, if any: before
+            the response when ``status`` is 0, otherwise while reading the body.
+    """
+
+    method: str
+    path: str
+    query: str = ""
+    body_digest: Optional[str] = None
+    body_size: int = 0
+    status: int = 0
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    headers_at: float = 0.0
+    chunks: List[Tuple[float, bytes]] = field(default_factory=list)
+    complete: bool = True
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.method, self.path, self.query)
+
+    @property
+    def duration(self) -> float:
+        return self.chunks[-1][0] if self.chunks else self.headers_at
+
+    def to_json(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "body_digest": self.body_digest,
+            "body_size": self.body_size,
+            "status": self.status,
+            "headers": [list(h) for h in self.headers],
+            "headers_at": round(self.headers_at, 6),
+            "chunks": [_encode_chunk(offset, chunk) for offset, chunk in self.chunks],
+        }
+        if not self.complete:
+            data["complete"] = False
+        if self.error:
+            data["error"] = self.error
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Interaction":
+        return cls(
+            method=data["method"],
+            path=data["path"],
+            query=data.get("query", ""),
+            body_digest=data.get("body_digest"),
+            body_size=data.get("body_size", 0),
+            status=data.get("status", 0),
+            headers=[tuple(h) for h in data.get("headers", [])],
+            headers_at=data.get("headers_at", 0.0),
+            chunks=[_decode_chunk(c) for c in data.get("chunks", [])],
+            complete=data.get("complete", True),
+            error=data.get("error"),
+        )
+
+
+def _encode_chunk(offset: float, chunk: bytes) -> List[Any]:
+    try:
+        return [round(offset, 6), chunk.decode("utf-8")]
+    except UnicodeDecodeError:
+        return [round(offset, 6), base64.b64encode(chunk).decode("ascii"), "b64"]
+
+
+def _decode_chunk(data: List[Any]) -> Tuple[float, bytes]:
+    if len(data) > 2 and data[2] == "b64":
+        return data[0], base64.b64decode(data[1])
+    return data[0], data[1].encode("utf-8")
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class Cassette:
+    """An ordered collection of recorded interactions."""
+
+    def __init__(self, interactions: Optional[List[Interaction]] = None):
+        self.interactions: List[Interaction] = list(interactions or [])
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def recorder(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> "RecordingTransport":
+        """A transport recording into this cassette; wraps ``transport`` (default: a new connection pool)."""
+        return RecordingTransport(self, transport)
+
+    def player(self, speed: Optional[float] = 1.0, *, match_body: bool = False, loop: bool = False) -> "ReplayTransport":
+        """A transport replaying this cassette; see `ReplayTransport`."""
+        return ReplayTransport(self, speed=speed, match_body=match_body, loop=loop)
+
+    def save(self, path: str) -> None:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(JSON.dumps({"version": FORMAT_VERSION, "interactions": len(self.interactions)}) + "\n")
+            for interaction in self.interactions:
+                f.write(JSON.dumps(interaction.to_json(), ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            header = JSON.loads(f.readline() or "{}")
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported cassette format version {header.get('version')!r} in {path}")
+            return cls([Interaction.from_json(JSON.loads(line)) for line in f if line.strip()])
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, interaction: Interaction, started: float, cassette: Cassette):
+        self._stream = stream
+        self._interaction = interaction
+        self._started = started
+        self._cassette = cassette
+        self._saved = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self._interaction.complete = False
+        try:
+            async for chunk in self._stream:
+                self._interaction.chunks.append((time.perf_counter() - self._started, chunk))
+                yield chunk
+        except httpx.TransportError as e:
+            self._interaction.error = type(e).__name__
+            raise
+        self._interaction.complete = True
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._saved:
+                self._saved = True
+                self._cassette.interactions.append(self._interaction)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that forwards requests and records them into a `Cassette`.
+
+    Interactions are appended when their response is closed, i.e. in
+    completion order. A stream closed before it was fully read is recorded
+    up to that point and marked incomplete.
+    """
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        interaction = Interaction(
+            method=request.method,
+            path=request.url.path,
+            query=request.url.query.decode("ascii", "replace"),
+            body_digest=_digest(body),
+            body_size=len(body),
+        )
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            interaction.headers_at = time.perf_counter() - started
+            interaction.error = type(e).__name__
+            self.cassette.interactions.append(interaction)
+            raise
+        interaction.headers_at = time.perf_counter() - started
+        interaction.status = response.status_code
+        interaction.headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS]
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, interaction, started, self.cassette),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, interaction: Interaction, started: float, speed: Optional[float]):
+        self._interaction = interaction
+        self._started = started
+        self._speed = speed
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for offset, chunk in self._interaction.chunks:
+            if self._speed:
+                delay = self._started + offset / self._speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield chunk
+        if self._interaction.error:
+            # The connection broke mid-body while recording.
+            raise _replayed_error(self._interaction.error)
+
+
+def _replayed_error(name: str, request: Optional[httpx.Request] = None) -> httpx.TransportError:
+    error_type = getattr(httpx, name, None)
+    if not (isinstance(error_type, type) and issubclass(error_type, httpx.TransportError)):
+        error_type = httpx.TransportError
+    return error_type(f"Replayed {name}", request=request)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering requests from a `Cassette`.
+
+    Requests are matched on method, path and query string (and the body
+    digest with ``match_body``); repeated identical requests receive the
+    recorded responses in order.
+
+    Args:
+        cassette: The recorded interactions.
+        speed: Playback speed: 1.0 reproduces the recorded timing, 10.0 plays
+            ten times faster, None or 0 replays without any delay.
+        match_body: Also require the request body to match.
+        loop: When the recordings for a request are used up, start over
+            instead of raising `CassetteMissError`.
+    """
+
+    def __init__(self, cassette: Cassette, speed: Optional[float] = 1.0, *, match_body: bool = False, loop: bool = False):
+        self.cassette = cassette
+        self.speed = speed
+        self.match_body = match_body
+        self.loop = loop
+        self.played = 0
+        self._queues: Dict[Tuple[str, ...], Deque[Interaction]] = defaultdict(deque)
+        for interaction in cassette.interactions:
+            self._queues[self._key(interaction)].append(interaction)
+
+    def _key(self, interaction: Interaction) -> Tuple[str, ...]:
+        key = interaction.key
+        return key + (interaction.body_digest or "",) if self.match_body else key
+
+    def _next(self, key: Tuple[str, ...]) -> Interaction:
+        queue = self._queues.get(key)
+        if not queue:
+            raise CassetteMissError(f"No recorded interaction for {' '.join(key[:2])}{'?' + key[2] if key[2] else ''}")
+        interaction = queue.popleft()
+        if self.loop:
+            queue.append(interaction)
+        return interaction
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        body = await request.aread()
+        probe = Interaction(request.method, request.url.path, request.url.query.decode("ascii", "replace"), body_digest=_digest(body))
+        interaction = self._next(self._key(probe))
+        self.played += 1
+
+        if self.speed:
+            await asyncio.sleep(interaction.headers_at / self.speed)
+        if interaction.error and not interaction.status:
+            raise _replayed_error(interaction.error, request)
+        return httpx.Response(
+            interaction.status,
+            headers=interaction.headers,
+            stream=_ReplayStream(interaction, started, self.speed),
+            request=request,
+        )
@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+
+"""Latency distributions, fault specifications and fault injection for simulated Dify traffic.
+
+`Fault` and `Latency` describe what should go wrong; `MockDifyServer`
+applies them server-side, while `FaultInjectionTransport` wraps any httpx
+transport (including a real connection pool) and applies them between the
+client and the service, together with bandwidth throttling.
+
+`RetryCostTracker` measures what the client's retry logic spent on those
+faults: extra requests, time in failed attempts and time in backoff.
+
+Example:
+    >>> injector = FaultInjectionTransport(
+    ...     faults=[Fault.timeout(endpoint="/v1/datasets/{dataset_id}/search", probability=0.05)],
+    ...     latency=Latency.lognormal(0.2, 0.5),
+    ...     seed=42,
+    ... )
+    >>> client = AsyncClient(base_url, api_key, transport=injector, hooks=[injector.retry_cost])
+    >>> ...
+    >>> injector.report()["retries"]["amplification"]
+    1.05
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from ..hooks import Hooks, RequestContext
+from ..metrics import resolve_endpoint
+
+
+class Latency:
+    """A latency distribution in seconds, sampled with a caller-provided RNG.
+
+    Example:
+        >>> Latency.lognormal(median=0.2, sigma=0.5).sample(random.Random(0))
+    """
+
+    def __init__(self, sampler: Callable[[random.Random], float], description: str = "custom"):
+        self._sampler = sampler
+        self.description = description
+
+    def sample(self, rng: random.Random) -> float:
+        return max(self._sampler(rng), 0.0)
+
+    def __repr__(self) -> str:
+        return f"Latency({self.description})"
+
+    @classmethod
+    def constant(cls, seconds: float) -> "Latency":
+        return cls(lambda rng: seconds, f"constant={seconds}")
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Latency":
+        return cls(lambda rng: rng.uniform(low, high), f"uniform={low}..{high}")
+
+    @classmethod
+    def exponential(cls, mean: float) -> "Latency":
+        return cls(lambda rng: rng.expovariate(1.0 / mean) if mean > 0 else 0.0, f"exponential mean={mean}")
+
+    @classmethod
+    def lognormal(cls, median: float, sigma: float) -> "Latency":
+        """Long-tailed latency typical of LLM backends; ``median`` is in seconds."""
+        mu = math.log(median) if median > 0 else float("-inf")
+        return cls(lambda rng: rng.lognormvariate(mu, sigma) if median > 0 else 0.0, f"lognormal median={median} sigma={sigma}")
+
+
+ZERO = Latency.constant(0.0)
+
+
+@dataclass
+class Fault:
+    """A fault to inject into matching requests.
+
+    Exactly one kind of fault applies per rule: an HTTP ``status`` response
+    (optionally with ``retry_after``), a connection ``reset`` before any
+    response, a ``hang`` until the client's read timeout, or a reset of a
+    stream after ``after_events`` events.
+
+    Attributes:
+        status: Respond with this HTTP status code (e.g. 429, 500, 503).
+        retry_after: Value of the Retry-After header, in seconds.
+        reset: Drop the connection without a response.
+        hang: Never respond, so the request ends in a read timeout.
+        after_events: For streaming responses, drop the connection after this many events.
+        probability: Chance (0.0-1.0) that a matching request is affected.
+        endpoint: Endpoint template to match (from `config.API_ENDPOINTS`); None matches all.
+        method: HTTP method to match; None matches all.
+        times: Maximum number of injections; None for unlimited.
+    """
+
+    status: Optional[int] = None
+    retry_after: Optional[float] = None
+    reset: bool = False
+    hang: bool = False
+    after_events: Optional[int] = None
+    probability: float = 1.0
+    endpoint: Optional[str] = None
+    method: Optional[str] = None
+    times: Optional[int] = None
+    injected: int = 0
+
+    def matches(self, method: str, endpoint: str, rng: random.Random) -> bool:
+        """Whether this fault fires for a request, consuming one of ``times`` if so."""
+        if self.endpoint is not None and self.endpoint != endpoint:
+            return False
+        if self.method is not None and self.method.upper() != method.upper():
+            return False
+        if self.times is not None and self.injected >= self.times:
+            return False
+        if self.probability < 1.0 and rng.random() >= self.probability:
+            return False
+        self.injected += 1
+        return True
+
+    @classmethod
+    def rate_limited(cls, retry_after: float = 1.0, **kwargs) -> "Fault":
+        return cls(status=429, retry_after=retry_after, **kwargs)
+
+    @classmethod
+    def server_error(cls, status: int = 500, **kwargs) -> "Fault":
+        return cls(status=status, **kwargs)
+
+    @classmethod
+    def connection_reset(cls, **kwargs) -> "Fault":
+        return cls(reset=True, **kwargs)
+
+    @classmethod
+    def timeout(cls, **kwargs) -> "Fault":
+        return cls(hang=True, **kwargs)
+
+    @classmethod
+    def stream_reset(cls, after_events: int, **kwargs) -> "Fault":
+        return cls(after_events=after_events, **kwargs)
+
+
+class RetryCostTracker(Hooks):
+    """Hooks measuring the cost of client-side retries.
+
+    Register it on the client. Every first attempt counts as a call; every
+    further attempt is an extra request whose failed predecessor's duration
+    and backoff delay are added to the extra wall time.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.failed_attempt_time = 0.0
+        self.backoff_time = 0.0
+        self.errors: Counter = Counter()
+        self.endpoints: Dict[str, Counter] = defaultdict(Counter)
+
+    def on_request_start(self, ctx: RequestContext) -> None:
+        self.attempts += 1
+        self.endpoints[ctx.endpoint]["attempts"] += 1
+        if ctx.attempt == 1:
+            self.calls += 1
+            self.endpoints[ctx.endpoint]["calls"] += 1
+
+    def on_retry(self, ctx: RequestContext, error: BaseException, delay: float) -> None:
+        self.failed_attempt_time += ctx.elapsed
+        self.backoff_time += delay
+        self.errors[type(error).__name__] += 1
+
+    @property
+    def extra_requests(self) -> int:
+        return self.attempts - self.calls
+
+    @property
+    def amplification(self) -> float:
+        """Requests sent per logical call (1.0 means no retries)."""
+        return self.attempts / self.calls if self.calls else 1.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "extra_requests": self.extra_requests,
+            "amplification": self.amplification,
+            "extra_wall_time": self.failed_attempt_time + self.backoff_time,
+            "failed_attempt_time": self.failed_attempt_time,
+            "backoff_time": self.backoff_time,
+            "errors": dict(self.errors),
+            "endpoints": {endpoint: dict(counts) for endpoint, counts in self.endpoints.items()},
+        }
+
+
+class _FaultyStream(httpx.AsyncByteStream):
+    """Response body wrapper that throttles bandwidth and cuts SSE streams."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, injector: "FaultInjectionTransport", request: httpx.Request, endpoint: str, after_events: Optional[int]):
+        self._stream = stream
+        self._injector = injector
+        self._request = request
+        self._endpoint = endpoint
+        self._after_events = after_events
+        self._events = 0
+        self._tail = b""
+
+    def _split(self, chunk: bytes) -> Tuple[bytes, bool]:
+        """The part of ``chunk`` to deliver, and whether the stream is cut after it."""
+        if self._after_events is None:
+            return chunk, False
+        if self._after_events <= 0:
+            return b"", True
+        data = self._tail + chunk
+        offset = len(self._tail)
+        pos = 0
+        while True:
+            index = data.find(b"\n\n", pos)
+            if index < 0:
+                break
+            pos = index + 2
+            self._events += 1
+            if self._events >= self._after_events:
+                return chunk[: max(pos - offset, 0)], True
+        self._tail = data[-1:]
+        return chunk, False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        throttle = self._injector._throttler()
+        async for chunk in self._stream:
+            chunk, cut = self._split(chunk)
+            async for piece in throttle(chunk):
+                yield piece
+            if cut:
+                self._injector._count(self._endpoint, "stream_reset")
+                raise httpx.RemoteProtocolError("peer closed connection without sending complete message body (injected)", request=self._request)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class FaultInjectionTransport(httpx.AsyncBaseTransport):
+    """httpx transport injecting latency, errors and slow links in front of another transport.
+
+    Faults are the same `Fault` rules used by `MockDifyServer`, matched per
+    endpoint template and method with a seeded RNG; the first matching rule
+    applies. Status faults are answered without reaching the wrapped
+    transport; ``reset`` and ``hang`` raise the httpx errors a real dropped
+    or silent connection produces; ``after_events`` cuts an SSE stream.
+
+    Args:
+        transport: Transport to wrap. Defaults to a new connection pool.
+        faults: Fault rules.
+        latency: Extra latency added before every request is forwarded.
+        endpoint_latency: Per-endpoint-template latency overrides.
+        bandwidth: Link speed in bytes per second applied to request and
+            response bodies; None for unlimited.
+        seed: Seed for latency sampling and fault probabilities.
+
+    Attributes:
+        retry_cost: A `RetryCostTracker`; register it as a client hook to
+            include retry amplification in `report`.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        *,
+        faults: Optional[List[Fault]] = None,
+        latency: Latency = ZERO,
+        endpoint_latency: Optional[Dict[str, Latency]] = None,
+        bandwidth: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.faults: List[Fault] = list(faults or [])
+        self.latency = latency
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.bandwidth = bandwidth
+        self.rng = random.Random(seed)
+        self.retry_cost = RetryCostTracker()
+        self.requests: Counter = Counter()
+        self.injected: Dict[str, Counter] = defaultdict(Counter)
+        self.injected_latency = 0.0
+        self.throttle_time = 0.0
+
+    def add_fault(self, fault: Fault) -> Fault:
+        self.faults.append(fault)
+        return fault
+
+    def _count(self, endpoint: str, kind: str) -> None:
+        self.injected[endpoint][kind] += 1
+
+    def _throttler(self) -> Callable[[bytes], AsyncIterator[bytes]]:
+        """A per-body generator factory pacing bytes to ``bandwidth``."""
+        started = time.perf_counter()
+        sent = 0
+
+        async def throttle(data: bytes) -> AsyncIterator[bytes]:
+            nonlocal sent
+            if not self.bandwidth:
+                if data:
+                    yield data
+                return
+            step = max(int(self.bandwidth / 50), 1024)
+            for start in range(0, len(data), step):
+                piece = data[start:start + step]
+                sent += len(piece)
+                ahead = sent / self.bandwidth - (time.perf_counter() - started)
+                if ahead > 0:
+                    self.throttle_time += ahead
+                    await asyncio.sleep(ahead)
+                yield piece
+
+        return throttle
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = resolve_endpoint(request.url.path)
+        self.requests[endpoint] += 1
+
+        delay = self.endpoint_latency.get(endpoint, self.latency).sample(self.rng)
+        if delay:
+            self.injected_latency += delay
+            await asyncio.sleep(delay)
+
+        fault = next((f for f in self.faults if f.matches(request.method, endpoint, self.rng)), None)
+        if fault is not None:
+            if fault.reset:
+                self._count(endpoint, "reset")
+                raise httpx.RemoteProtocolError("Server disconnected without sending a response. (injected)", request=request)
+            if fault.hang:
+                self._count(endpoint, "timeout")
+                timeout = (request.extensions.get("timeout") or {}).get("read")
+                if timeout is None:
+                    await asyncio.Event().wait()
+                await asyncio.sleep(timeout)
+                raise httpx.ReadTimeout("Injected read timeout", request=request)
+            if fault.status is not None:
+                self._count(endpoint, f"status_{fault.status}")
+                headers = {"retry-after": str(fault.retry_after)} if fault.retry_after is not None else {}
+                return httpx.Response(fault.status, headers=headers, json={"code": "injected_fault", "message": "injected fault", "status": fault.status}, request=request)
+
+        if self.bandwidth:
+            body = await request.aread()
+            async for _ in self._throttler()(body):
+                pass
+
+        response = await self.transport.handle_async_request(request)
+        after_events = fault.after_events if fault is not None else None
+        if after_events is None and not self.bandwidth:
+            return response
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_FaultyStream(response.stream, self, request, endpoint, after_events),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def report(self) -> Dict[str, Any]:
+        """Requests seen, faults injected per endpoint template, injected delays and retry cost."""
+        return {
+            "requests": sum(self.requests.values()),
+            "endpoints": dict(self.requests),
+            "faults": {endpoint: dict(kinds) for endpoint, kinds in self.injected.items()},
+            "injected_latency": self.injected_latency,
+            "throttle_time": self.throttle_time,
+            "retries": self.retry_cost.as_dict(),
+        }
@@ -0,0 +1,706 @@
+# -*- coding: utf-8 -*-
+
+"""A lightweight stand-in for the Dify API.
+
+`MockDifyServer` is a plain ASGI application that answers every endpoint in
+`config.API_ENDPOINTS` with realistic, deterministic payloads, including
+streaming chat and completion events. Latency, 429/5xx responses,
+connection resets and slow SSE drips can be injected per endpoint template,
+seeded for reproducibility.
+
+It can be used in three ways:
+
+- in-process, through `MockDifyServer.transport()` (no sockets; streams are
+  delivered incrementally and read timeouts are enforced),
+- on localhost, through `MockDifyServer.serve()`, which exercises the real
+  httpx connection pool,
+- as a standalone process: ``python -m pydify_plus.testing --port 8080``.
+
+Example:
+    >>> server = MockDifyServer(latency=Latency.constant(0.01), seed=1)
+    >>> server.add_fault(Fault.rate_limited(endpoint="/v1/datasets/{dataset_id}/search", probability=0.1))
+    >>> async with server.client() as client:
+    ...     async for event in client.chat.stream_chat_message(messages="Hello"):
+    ...         print(event.data)
+    >>>
+    >>> async with server.serve() as base_url:
+    ...     ...  # point any client at base_url
+"""
+
+import argparse
+import asyncio
+import json as JSON
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+
+from ..config import API_ENDPOINTS
+from ..metrics import UNKNOWN_ENDPOINT, resolve_endpoint
+from .faults import ZERO, Fault, Latency
+
+DEFAULT_ANSWER = (
+    "Dify is an open-source platform for building LLM applications. "
+    "It combines workflow orchestration, retrieval-augmented generation and agent capabilities."
+)
+
+# API keys accepted by `MockDifyServer.client()`, one per key name used by the API modules.
+DEFAULT_API_KEYS = {
+    "DIFY_API_KEY": "app-mock",
+    "DIFY_APP_KEY": "app-mock",
+    "DIFY_DATASET_KEY": "dataset-mock",
+    "DIFY_WORKFLOW_KEY": "app-mock",
+}
+
+_NAMES_BY_TEMPLATE: Dict[str, List[str]] = {}
+for _name, _template in API_ENDPOINTS.items():
+    _NAMES_BY_TEMPLATE.setdefault(_template, []).append(_name)
+
+_STREAM_TEMPLATES = {API_ENDPOINTS["CHAT_MESSAGES_STREAM"], API_ENDPOINTS["COMPLETION_MESSAGES_CREATE"]}
+_ALWAYS_STREAM_TEMPLATES = {API_ENDPOINTS["COMPLETION_MESSAGES_STREAM"]}
+
+
+class ConnectionReset(Exception):
+    """Raised inside the app to drop the connection without a (complete) response."""
+
+
+@dataclass
+class RecordedRequest:
+    """A request received by `MockDifyServer`."""
+
+    method: str
+    path: str
+    endpoint: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes
+    received_at: float = field(default_factory=time.monotonic)
+
+    def json(self) -> Any:
+        return JSON.loads(self.body) if self.body else None
+
+
+class MockDifyServer:
+    """ASGI stand-in for the Dify API.
+
+    Args:
+        latency: Default latency before each response.
+        endpoint_latency: Per-endpoint-template latency overrides.
+        token_delay: Delay between consecutive SSE events.
+        faults: Faults to inject (see `Fault`); the first matching rule wins.
+        answer: Text streamed back by chat and completion endpoints.
+        list_size: Total number of items behind every list endpoint.
+        seed: Seed for latency sampling and fault probabilities.
+        require_auth: Respond 401 to requests without a Bearer token.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: Latency = ZERO,
+        endpoint_latency: Optional[Dict[str, Latency]] = None,
+        token_delay: Latency = ZERO,
+        faults: Optional[List[Fault]] = None,
+        answer: str = DEFAULT_ANSWER,
+        list_size: int = 50,
+        seed: Optional[int] = None,
+        require_auth: bool = True,
+    ):
+        self.latency = latency
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.token_delay = token_delay
+        self.faults: List[Fault] = list(faults or [])
+        self.answer = answer
+        self.list_size = list_size
+        self.require_auth = require_auth
+        self.rng = random.Random(seed)
+        self.requests: List[RecordedRequest] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def add_fault(self, fault: Fault) -> Fault:
+        self.faults.append(fault)
+        return fault
+
+    def requests_to(self, endpoint: str) -> List[RecordedRequest]:
+        """Requests received for an endpoint template."""
+        return [r for r in self.requests if r.endpoint == endpoint]
+
+    def transport(self) -> "InProcessTransport":
+        """An httpx transport that calls this app in-process."""
+        return InProcessTransport(self)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "LocalServer":
+        """A localhost HTTP server for this app; use as ``async with server.serve() as base_url``."""
+        return LocalServer(self, host=host, port=port)
+
+    def client(self, api_key: Optional[Dict[str, str]] = None, **kwargs: Any):
+        """An `AsyncClient` wired to this app in-process."""
+        from ..async_client import AsyncClient
+
+        return AsyncClient(
+            base_url="http://mock-dify",
+            api_key=api_key or dict(DEFAULT_API_KEYS),
+            transport=self.transport(),
+            **kwargs,
+        )
+
+    # ASGI
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await self._handle(scope, body, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _handle(self, scope: Dict[str, Any], body: bytes, send: Any) -> None:
+        method = scope["method"].upper()
+        path = scope["path"]
+        endpoint = resolve_endpoint(path)
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        request = RecordedRequest(method, path, endpoint, query, headers, body)
+        self.requests.append(request)
+
+        delay = self.endpoint_latency.get(endpoint, self.latency).sample(self.rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+        fault = next((f for f in self.faults if f.matches(method, endpoint, self.rng)), None)
+        if fault is not None and fault.reset:
+            raise ConnectionReset(f"Injected connection reset for {method} {path}")
+        if fault is not None and fault.hang:
+            # Never answer; the client's read timeout (or server shutdown) ends the request.
+            await asyncio.Event().wait()
+        if fault is not None and fault.status is not None:
+            extra = [(b"retry-after", str(fault.retry_after).encode())] if fault.retry_after is not None else []
+            await _send_json(send, fault.status, _error_body(fault.status, "injected fault"), extra)
+            return
+
+        if self.require_auth and not headers.get("authorization", "").startswith("Bearer "):
+            await _send_json(send, 401, _error_body(401, "Access token is invalid"))
+            return
+        if endpoint == UNKNOWN_ENDPOINT:
+            await _send_json(send, 404, _error_body(404, f"{path} not found"))
+            return
+
+        if method == "POST" and endpoint in _STREAM_TEMPLATES | _ALWAYS_STREAM_TEMPLATES:
+            payload = request.json() if "json" in headers.get("content-type", "") else None
+            payload = payload if isinstance(payload, dict) else {}
+            if endpoint in _ALWAYS_STREAM_TEMPLATES or payload.get("response_mode") == "streaming":
+                reset_after = fault.after_events if fault is not None else None
+                await self._send_stream(send, endpoint, payload, reset_after)
+                return
+
+        status, response = self._respond(method, endpoint, path, request)
+        await _send_json(send, status, response)
+
+    async def _send_stream(self, send: Any, endpoint: str, payload: Dict[str, Any], reset_after: Optional[int]) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        })
+        for i, event in enumerate(self._stream_events(endpoint, payload)):
+            if reset_after is not None and i >= reset_after:
+                raise ConnectionReset("Injected reset mid-stream")
+            if i:
+                gap = self.token_delay.sample(self.rng)
+                if gap:
+                    await asyncio.sleep(gap)
+            data = b"data: " + JSON.dumps(event, ensure_ascii=False).encode() + b"\n\n"
+            await send({"type": "http.response.body", "body": data, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    def _stream_events(self, endpoint: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        task_id, message_id = str(uuid.uuid4()), str(uuid.uuid4())
+        conversation_id = payload.get("conversation_id") or str(uuid.uuid4())
+        created_at = int(time.time())
+        base = {"task_id": task_id, "message_id": message_id, "id": message_id, "created_at": created_at}
+        if endpoint == API_ENDPOINTS["CHAT_MESSAGES_STREAM"]:
+            base["conversation_id"] = conversation_id
+        tokens = _tokenize(self.answer)
+        events = [{"event": "message", "answer": token, **base} for token in tokens]
+        events.append({
+            "event": "message_end",
+            **base,
+            "metadata": {"usage": _usage(payload, tokens)},
+        })
+        return events
+
+    def _respond(self, method: str, endpoint: str, path: str, request: RecordedRequest) -> Tuple[int, Any]:
+        names = _NAMES_BY_TEMPLATE.get(endpoint, [])
+        ids = _path_params(endpoint, path)
+        now = int(time.time())
+
+        if endpoint.endswith("/stop"):
+            return 200, {"result": "success"}
+        if method == "DELETE":
+            return 200, {"result": "success"}
+        if "upload" in endpoint:
+            return 201, {
+                "id": str(uuid.uuid4()),
+                "name": "upload",
+                "size": len(request.body),
+                "extension": "txt",
+                "mime_type": "text/plain",
+                "created_by": "mock",
+                "created_at": now,
+            }
+        if method == "GET" and any(n.endswith(("_LIST", "_HISTORY")) for n in names):
+            return 200, self._page(endpoint, request)
+        if endpoint == API_ENDPOINTS["DOCUMENTS_EMBED_STATUS"]:
+            return 200, {"data": [{"id": ids.get("batch_id"), "indexing_status": "completed", "completed_segments": 10, "total_segments": 10}]}
+        if endpoint == API_ENDPOINTS["DATASETS_SEARCH"]:
+            body = request.json() or {}
+            top_k = int(body.get("top_k") or 5)
+            return 200, {
+                "query": body.get("query"),
+                "records": [
+                    {"segment": {"id": f"segment-{i}", "content": f"Matching content {i}", "position": i}, "score": round(1.0 - i * 0.05, 2)}
+                    for i in range(top_k)
+                ],
+            }
+        if "document/create-by" in endpoint or "update-by" in endpoint:
+            document_id = ids.get("document_id") or str(uuid.uuid4())
+            return 200, {"document": _document(document_id, 0, now), "batch": str(uuid.uuid4())}
+        if endpoint == API_ENDPOINTS["WORKFLOW_EXECUTE"]:
+            run_id = str(uuid.uuid4())
+            return 200, {
+                "workflow_run_id": run_id,
+                "task_id": str(uuid.uuid4()),
+                "data": {"id": run_id, "status": "succeeded", "outputs": {}, "elapsed_time": 0.1, "total_tokens": 0, "total_steps": 1, "created_at": now, "finished_at": now},
+            }
+        if method == "POST" and endpoint in _STREAM_TEMPLATES:
+            body = request.json() or {}
+            tokens = _tokenize(self.answer)
+            return 200, {
+                "event": "message",
+                "task_id": str(uuid.uuid4()),
+                "id": str(uuid.uuid4()),
+                "message_id": str(uuid.uuid4()),
+                "conversation_id": body.get("conversation_id") or str(uuid.uuid4()),
+                "mode": "chat",
+                "answer": self.answer,
+                "metadata": {"usage": _usage(body, tokens)},
+                "created_at": now,
+            }
+        if method == "GET":
+            item_id = next(reversed(ids.values()), None) if ids else None
+            return 200, {"id": item_id or str(uuid.uuid4()), "name": "mock", "created_at": now, "updated_at": now}
+        if any(n.endswith(("_CREATE", "_ADD")) for n in names):
+            body = request.json() if request.body and "json" in request.headers.get("content-type", "") else None
+            return 200, {"id": str(uuid.uuid4()), **(body if isinstance(body, dict) else {}), "created_at": now}
+        return 200, {"result": "success"}
+
+    def _page(self, endpoint: str, request: RecordedRequest) -> Dict[str, Any]:
+        page = int(request.query.get("page", ["1"])[0])
+        limit = int(request.query.get("limit", ["20"])[0])
+        start = (page - 1) * limit
+        end = min(start + limit, self.list_size)
+        now = int(time.time())
+        items = [_list_item(endpoint, i, now) for i in range(start, end)] if start < self.list_size else []
+        return {"data": items, "has_more": end < self.list_size, "limit": limit, "total": self.list_size, "page": page}
+
+
+def _tokenize(text: str) -> List[str]:
+    words = text.split(" ")
+    return [w + " " for w in words[:-1]] + [words[-1]]
+
+
+def _usage(payload: Dict[str, Any], tokens: List[str]) -> Dict[str, Any]:
+    prompt_tokens = max(len(str(payload.get("query", "")).split()), 1)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(tokens),
+        "total_tokens": prompt_tokens + len(tokens),
+        "currency": "USD",
+    }
+
+
+def _path_params(template: str, path: str) -> Dict[str, str]:
+    params = {}
+    for t, p in zip(template.strip("/").split("/"), path.strip("/").split("/")):
+        if t.startswith("{") and t.endswith("}"):
+            params[t[1:-1]] = p
+    return params
+
+
+def _document(document_id: str, position: int, now: int) -> Dict[str, Any]:
+    return {
+        "id": document_id,
+        "position": position,
+        "data_source_type": "upload_file",
+        "name": f"document-{position}.txt",
+        "created_from": "api",
+        "created_by": "mock",
+        "created_at": now,
+        "tokens": 128,
+        "indexing_status": "completed",
+        "enabled": True,
+        "archived": False,
+        "display_status": "available",
+        "word_count": 100,
+        "hit_count": 0,
+    }
+
+
+def _list_item(endpoint: str, i: int, now: int) -> Dict[str, Any]:
+    if endpoint == API_ENDPOINTS["DOCUMENTS_LIST"]:
+        return _document(f"document-{i}", i, now)
+    if endpoint == API_ENDPOINTS["FEEDBACK_LIST"]:
+        return {
+            "id": f"feedback-{i}",
+            "app_id": "app-mock",
+            "message_id": f"message-{i}",
+            "rating": "like" if i % 3 else "dislike",
+            "content": None,
+            "from_source": "api",
+            "created_at": now - i * 60,
+        }
+    if endpoint in (API_ENDPOINTS["SEGMENTS_LIST"], API_ENDPOINTS["SEGMENT_CHILDREN_LIST"]):
+        return {"id": f"segment-{i}", "position": i, "content": f"Segment {i} content", "word_count": 3, "tokens": 4, "status": "completed", "enabled": True}
+    if endpoint == API_ENDPOINTS["CONVERSATION_HISTORY"]:
+        return {"id": f"message-{i}", "query": f"Question {i}", "answer": f"Answer {i}", "created_at": now - i * 60}
+    return {"id": f"item-{i}", "name": f"item-{i}", "created_at": now - i * 60}
+
+
+def _error_body(status: int, message: str) -> Dict[str, Any]:
+    return {"code": f"mock_{status}", "message": message, "status": status}
+
+
+async def _send_json(send: Any, status: int, payload: Any, extra_headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    body = JSON.dumps(payload, ensure_ascii=False).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers + (extra_headers or [])})
+    await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+# In-process transport
+
+
+async def _next_message(queue: asyncio.Queue, task: asyncio.Task, timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+    """Next ASGI message sent by the app; None if the app dropped the connection."""
+    if not queue.empty():
+        return queue.get_nowait()
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        done, _ = await asyncio.wait({getter, task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not getter.done():
+            getter.cancel()
+    if getter in done:
+        return getter.result()
+    if task in done:
+        if not queue.empty():
+            return queue.get_nowait()
+        error = task.exception()
+        if error is None or isinstance(error, ConnectionReset):
+            return None
+        raise error
+    raise asyncio.TimeoutError
+
+
+class _AppResponseStream(httpx.AsyncByteStream):
+    def __init__(self, queue: asyncio.Queue, task: asyncio.Task, timeout: Optional[float], request: httpx.Request):
+        self._queue = queue
+        self._task = task
+        self._timeout = timeout
+        self._request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            try:
+                message = await _next_message(self._queue, self._task, self._timeout)
+            except asyncio.TimeoutError:
+                raise httpx.ReadTimeout("Timed out reading response body", request=self._request)
+            if message is None:
+                raise httpx.RemoteProtocolError("peer closed connection without sending complete message body", request=self._request)
+            if message["type"] == "http.response.body":
+                if message.get("body"):
+                    yield message["body"]
+                if not message.get("more_body", False):
+                    return
+
+    async def aclose(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+
+
+class InProcessTransport(httpx.AsyncBaseTransport):
+    """httpx transport that dispatches requests to an ASGI app in the same event loop.
+
+    Unlike `httpx.ASGITransport`, response bodies are streamed as the app
+    sends them (so SSE timing is preserved), the "read" timeout is enforced,
+    and `ConnectionReset` raised by the app surfaces as the httpx error a
+    real dropped connection would produce.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.path.encode(),
+            "query_string": request.url.query,
+            "root_path": "",
+            "headers": [(k.lower(), v) for k, v in request.headers.raw],
+            "server": (request.url.host, request.url.port or 80),
+            "client": ("127.0.0.1", 0),
+        }
+        timeout = (request.extensions.get("timeout") or {}).get("read")
+        queue: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+        body_sent = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            await queue.put(message)
+
+        task = asyncio.get_running_loop().create_task(self.app(scope, receive, send))
+        try:
+            start = await _next_message(queue, task, timeout)
+        except asyncio.TimeoutError:
+            task.cancel()
+            raise httpx.ReadTimeout("Timed out waiting for response headers", request=request)
+        if start is None:
+            raise httpx.RemoteProtocolError("Server disconnected without sending a response.", request=request)
+
+        return httpx.Response(
+            start["status"],
+            headers=start.get("headers", []),
+            stream=_AppResponseStream(queue, task, timeout, request),
+            request=request,
+        )
+
+
+# Localhost server
+
+
+class LocalServer:
+    """Minimal HTTP/1.1 server running an ASGI app on localhost.
+
+    It supports keep-alive, Content-Length and chunked bodies, which is all
+    the Dify client needs; `ConnectionReset` raised by the app aborts the
+    TCP connection.
+
+    Example:
+        >>> async with LocalServer(app) as base_url:
+        ...     ...
+    """
+
+    def __init__(self, app: Any, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> str:
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while await self._handle_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            if not writer.is_closing():
+                writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return False
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers: List[Tuple[bytes, bytes]] = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers.append((key.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+        header_map = dict(headers)
+
+        if header_map.get(b"transfer-encoding", b"").lower() == b"chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+        else:
+            body = await reader.readexactly(int(header_map.get(b"content-length", b"0")))
+
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "server": (self.host, self.port),
+            "client": writer.get_extra_info("peername"),
+        }
+        keep_alive = header_map.get(b"connection", b"").lower() != b"close"
+        state = {"start": None, "chunked": False}
+        body_sent = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            chunk = message.get("body", b"")
+            more = message.get("more_body", False)
+            start = state.pop("start", None)
+            if start is not None:
+                response_headers = list(start.get("headers", []))
+                names = {k.lower() for k, _ in response_headers}
+                if b"content-length" not in names:
+                    if more:
+                        state["chunked"] = True
+                        response_headers.append((b"transfer-encoding", b"chunked"))
+                    else:
+                        response_headers.append((b"content-length", str(len(chunk)).encode()))
+                head = f"HTTP/1.1 {start['status']} {_reason(start['status'])}\r\n".encode()
+                head += b"".join(k + b": " + v + b"\r\n" for k, v in response_headers)
+                writer.write(head + b"\r\n")
+            if state["chunked"]:
+                if chunk:
+                    writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                if not more:
+                    writer.write(b"0\r\n\r\n")
+            elif chunk:
+                writer.write(chunk)
+            await writer.drain()
+
+        try:
+            await self.app(scope, receive, send)
+        except ConnectionReset:
+            writer.transport.abort()
+            return False
+        return keep_alive
+
+
+def _reason(status: int) -> str:
+    try:
+        from http import HTTPStatus
+
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Dify API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Median response latency in seconds (lognormal).")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Lognormal sigma; 0 for constant latency.")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Delay between SSE events in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 response.")
+    parser.add_argument("--list-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    latency = Latency.lognormal(args.latency, args.latency_sigma) if args.latency_sigma else Latency.constant(args.latency)
+    faults = []
+    if args.rate_limit_rate:
+        faults.append(Fault.rate_limited(probability=args.rate_limit_rate))
+    if args.error_rate:
+        faults.append(Fault.server_error(probability=args.error_rate))
+    app = MockDifyServer(
+        latency=latency,
+        token_delay=Latency.constant(args.token_delay),
+        faults=faults,
+        list_size=args.list_size,
+        seed=args.seed,
+    )
+    server = LocalServer(app, host=args.host, port=args.port)
+    print(f"Mock Dify API listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -190,3 +190,17 @@ class TestDataFactory:
             "total": len(data),
             "page": 1
         }
+
+
+@pytest.fixture
+def mock_dify():
+    """Fixture for a seeded local stand-in for the Dify API."""
+    from pydify_plus.testing import MockDifyServer
+
+    return MockDifyServer(seed=0)
+
+
+@pytest.fixture
+def mock_dify_client(mock_dify):
+    """Fixture for an AsyncClient talking to `mock_dify` in-process, without retry backoff."""
+    return mock_dify.client(retry_backoff_factor=0.0)
@@ -0,0 +1,105 @@
+import httpx
+import pytest
+from pydify_plus import AsyncClient
+from pydify_plus.balancer import LoadBalancer
+from pydify_plus.errors import DifyServerError
+from pydify_plus.testing import DEFAULT_API_KEYS, MockDifyServer
+
+URLS = ["http://dify-a", "http://dify-b", "http://dify-c"]
+
+
+def test_least_outstanding_and_ewma_selection():
+    balancer = LoadBalancer(URLS)
+    picked = [balancer.pick() for _ in range(3)]
+    for upstream in picked:
+        balancer.start(upstream)
+    assert sorted(u.url for u in picked) == URLS
+
+    balancer.start(picked[0])
+    balancer.finish(picked[1])
+    assert balancer.pick() is picked[1]
+
+    balancer = LoadBalancer(URLS[:2], "ewma")
+    fast, slow = balancer.upstreams
+    balancer.start(fast), balancer.finish(fast, 0.05)
+    balancer.start(slow), balancer.finish(slow, 0.5)
+    assert [balancer.pick() for _ in range(4)] == [fast] * 4
+    for _ in range(12):
+        balancer.start(fast)  # the fast upstream is saturated
+    assert balancer.pick() is slow
+
+
+def test_passive_ejection_and_panic_mode():
+    now = [0.0]
+    balancer = LoadBalancer(URLS[:2], eject_after=2, eject_time=10.0)
+    balancer._clock = lambda: now[0]
+    a, b = balancer.upstreams
+
+    for _ in range(2):
+        balancer.start(a), balancer.finish(a, failed=True)
+    assert [balancer.pick() for _ in range(4)] == [b] * 4
+    assert balancer.stats()[0]["ejected"] is True
+
+    for _ in range(2):
+        balancer.start(b), balancer.finish(b, failed=True)
+    assert balancer.pick() in (a, b)  # everything ejected: keep sending
+
+    now[0] = 10.0
+    assert balancer.pick(exclude=[b]) is a
+    balancer.start(a), balancer.finish(a, failed=True)
+    balancer.start(a), balancer.finish(a, failed=True)
+    assert a.ejected_until == 30.0  # ejection time doubles
+
+
+def _replicas(server, down=(), status=None):
+    hosts = []
+    inner = server.transport()
+
+    async def handler(request):
+        hosts.append(request.url.host)
+        if request.url.host in down:
+            if status is None:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(status, json={"message": "unavailable"})
+        return await inner.handle_async_request(request)
+
+    return httpx.MockTransport(handler), hosts
+
+
+@pytest.mark.asyncio
+async def test_requests_fail_over_and_spread():
+    server = MockDifyServer(seed=0)
+    transport, hosts = _replicas(server, down={"dify-a"})
+    async with AsyncClient(URLS, dict(DEFAULT_API_KEYS), transport=transport, retry_backoff_factor=0.0) as client:
+        for _ in range(6):
+            await client.dataset.list_datasets()
+
+    assert hosts.count("dify-a") == 3  # ejected after three connection errors
+    assert {"dify-b", "dify-c"} <= set(hosts)
+    assert [s["errors"] for s in client.balancer.stats()] == [3, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_gateway_errors_fail_over_for_idempotent_calls_only():
+    server = MockDifyServer(seed=0)
+    transport, hosts = _replicas(server, down={"dify-a"}, status=503)
+    async with AsyncClient(URLS[:2], dict(DEFAULT_API_KEYS), transport=transport, retry_backoff_factor=0.0) as client:
+        client.balancer._next = 0  # start at dify-a
+        assert "data" in await client.dataset.list_datasets()
+        assert hosts == ["dify-a", "dify-b"]
+
+        client.balancer._next = 0
+        client.balancer.upstreams[0].failures = 0
+        with pytest.raises(DifyServerError):
+            await client.dataset.create_dataset(name="kb")
+
+
+@pytest.mark.asyncio
+async def test_streams_stick_to_one_upstream():
+    server = MockDifyServer(seed=0)
+    transport, hosts = _replicas(server)
+    async with AsyncClient(URLS, dict(DEFAULT_API_KEYS), transport=transport) as client:
+        stream = client._stream_request("POST", "/v1/chat-messages", json={"query": "hi", "response_mode": "streaming", "user": "u"})
+        events = [event async for event in stream]
+        assert events and len(hosts) == 1
+        assert sum(s["outstanding"] for s in client.balancer.stats()) == 0
@@ -101,3 +101,32 @@ class TestBaseClient:
         assert client.api_key == "custom-key"
         assert client.timeout == 60.0
         assert client.retries == 5
+
+    def test_headers_are_cached_per_key(self):
+        """Header sets are reused until the key changes."""
+        client = BaseClient.__new__(BaseClient)
+        client.__init__(
+            base_url="https://api.dify.ai/",
+            api_key={"DIFY_API_KEY": "app-key", "DIFY_DATASET_KEY": "dataset-key"}
+        )
+
+        headers = client._build_headers()
+        assert client._build_headers() is headers
+        assert client._build_headers("DIFY_DATASET_KEY")["Authorization"] == "Bearer dataset-key"
+        assert "Content-Type" not in client._build_headers(content_type=False)
+        with pytest.raises(TypeError):
+            headers["Authorization"] = "Bearer other"
+
+        client.api_key["DIFY_API_KEY"] = "rotated"
+        assert client._build_headers()["Authorization"] == "Bearer rotated"
+        assert client._build_url("/v1/files/upload") == "https://api.dify.ai/v1/files/upload"
+
+    def test_request_ids_are_unique(self):
+        """Request IDs come from a per-client counter."""
+        client = BaseClient.__new__(BaseClient)
+        client.__init__(base_url="https://api.dify.ai", api_key="test-api-key")
+        other = BaseClient.__new__(BaseClient)
+        other.__init__(base_url="https://api.dify.ai", api_key="test-api-key")
+
+        ids = {client._build_request_id() for _ in range(100)} | {other._build_request_id() for _ in range(100)}
+        assert len(ids) == 200
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+from pydify_plus.benchmarks import BenchConfig, compare, load_report, run_benchmarks, write_report
+
+
+def test_quick_run_produces_json_report(tmp_path):
+    config = BenchConfig.quick(iterations=10, warmup=1, sse_events=20)
+    report = run_benchmarks(config, ["arequest_overhead", "sync_vs_async", "sse_throughput"])
+
+    names = [r["name"] for r in report["results"]]
+    assert "arequest_overhead[default]" in names
+    assert "sync_vs_async[sync]" in names
+    sse = next(r for r in report["results"] if r["name"] == "sse_throughput")
+    assert sse["metrics"]["events"] == 21.0
+    assert report["meta"]["config"]["target"] == "mock"
+
+    path = tmp_path / "report.json"
+    write_report(report, str(path))
+    assert load_report(str(path)) == json.loads(path.read_text())
+
+
+def test_unknown_benchmark_rejected():
+    with pytest.raises(ValueError):
+        run_benchmarks(BenchConfig.quick(), ["nope"])
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    def report(ops, ns):
+        return {"results": [
+            {"name": "a", "metrics": {"ops_per_sec": ops}, "primary": "ops_per_sec", "higher_is_better": True},
+            {"name": "b", "metrics": {"ns_per_op": ns}, "primary": "ns_per_op", "higher_is_better": False},
+        ]}
+
+    rows = {row["name"]: row for row in compare(report(1000, 100), report(800, 90), threshold=0.1)}
+
+    assert rows["a"]["regression"] is True
+    assert rows["a"]["change"] == pytest.approx(-0.2)
+    assert rows["b"]["regression"] is False
+    assert rows["b"]["change"] == pytest.approx(0.1)
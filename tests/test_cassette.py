@@ -0,0 +1,83 @@
+import json
+import time
+
+import httpx
+import pytest
+from pydify_plus import AsyncClient
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.testing import DEFAULT_API_KEYS, Cassette, CassetteMissError, Fault, Latency, MockDifyServer
+
+
+async def _record(server, path):
+    cassette = Cassette()
+    async with AsyncClient("http://mock-dify", DEFAULT_API_KEYS, transport=cassette.recorder(server.transport()), retries=0) as client:
+        events = [e async for e in client.chat.stream_chat_message(messages="Hello")]
+        page = await client.feedback.list(limit=3)
+    cassette.save(str(path))
+    return events, page
+
+
+def _client(transport):
+    return AsyncClient("http://mock-dify", DEFAULT_API_KEYS, transport=transport, retries=0)
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay_round_trip(tmp_path):
+    server = MockDifyServer(token_delay=Latency.constant(0.01), answer="one two three four")
+    path = tmp_path / "chat.jsonl.gz"
+    events, page = await _record(server, path)
+
+    cassette = Cassette.load(str(path))
+    assert len(cassette) == 2
+    stream = next(i for i in cassette.interactions if i.path == API_ENDPOINTS["CHAT_MESSAGES_STREAM"])
+    assert len(stream.chunks) == 5 and stream.complete
+    assert stream.chunks[-1][0] - stream.chunks[0][0] >= 0.03
+
+    async with _client(cassette.player(speed=None)) as client:
+        started = time.perf_counter()
+        replayed = [e async for e in client.chat.stream_chat_message(messages="Hello")]
+        fast = time.perf_counter() - started
+        assert await client.feedback.list(limit=3) == page
+    assert [e.data for e in replayed] == [e.data for e in events]
+    assert fast < 0.03
+
+    async with _client(cassette.player(speed=1.0)) as client:
+        started = time.perf_counter()
+        [e async for e in client.chat.stream_chat_message(messages="Hello")]
+        assert time.perf_counter() - started >= 0.03
+
+
+@pytest.mark.asyncio
+async def test_replay_misses_and_loop(tmp_path):
+    path = tmp_path / "chat.jsonl"
+    await _record(MockDifyServer(), path)
+    cassette = Cassette.load(str(path))
+
+    async with _client(cassette.player(speed=None)) as client:
+        await client.feedback.list(limit=3)
+        with pytest.raises(CassetteMissError):
+            await client.feedback.list(limit=3)
+        with pytest.raises(CassetteMissError):
+            await client.feedback.list(limit=4)
+
+    async with _client(cassette.player(speed=None, loop=True)) as client:
+        for _ in range(3):
+            assert len((await client.feedback.list(limit=3))["data"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_recorded_and_replayed(tmp_path):
+    server = MockDifyServer()
+    server.add_fault(Fault.connection_reset(endpoint=API_ENDPOINTS["FEEDBACK_LIST"]))
+    cassette = Cassette()
+    async with _client(cassette.recorder(server.transport())) as client:
+        with pytest.raises(httpx.RemoteProtocolError):
+            await client.feedback.list()
+
+    path = tmp_path / "errors.jsonl"
+    cassette.save(str(path))
+    assert json.loads(path.read_text().splitlines()[1])["error"] == "RemoteProtocolError"
+
+    async with _client(Cassette.load(str(path)).player(speed=None)) as client:
+        with pytest.raises(httpx.RemoteProtocolError):
+            await client.feedback.list()
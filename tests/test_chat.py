@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from httpx import Response, AsyncClient
 from pydify_plus import AsyncClient as DifyAsyncClient
@@ -17,4 +18,49 @@ async def test_chat_upload_file_bytes(respx_mock):
     respx_mock.post("/v1/files/upload").mock(return_value=Response(200, json={"file_id": "f_1"}))
     async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
         resp = await client.chat.upload_file_bytes(file_name="a.txt", content=b"hello", content_type="text/plain", purpose="conversation")
-        assert resp["file_id"] == "f_1"
\ No newline at end of file
+        assert resp["file_id"] == "f_1"
+
+@pytest.mark.asyncio
+async def test_stream_chat_message_stops_task_on_cancel(respx_mock):
+    from pydify_plus.apis import base
+
+    body = (
+        'data: {"event": "message", "task_id": "t_1", "answer": "Hi"}\n\n'
+        'data: {"event": "message", "task_id": "t_1", "answer": " there"}\n\n'
+        'data: {"event": "message_end", "task_id": "t_1"}\n\n'
+    )
+    respx_mock.post("/v1/chat-messages").mock(
+        return_value=Response(200, headers={"content-type": "text/event-stream"}, content=body)
+    )
+    stop_route = respx_mock.post("/v1/chat-messages/t_1/stop").mock(return_value=Response(200, json={"result": "success"}))
+    api_key = {"DIFY_API_KEY": "test", "DIFY_APP_KEY": "app"}
+    async with DifyAsyncClient(base_url="http://localhost", api_key=api_key) as client:
+        stream = client.chat.stream_chat_message(messages="Hello", user="u_1")
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.gather(*base._background_tasks)
+
+    assert stop_route.called
+    assert stop_route.calls.last.request.content == b'{"user":"u_1"}'
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_message_finished_does_not_stop(respx_mock):
+    from pydify_plus.apis import base
+
+    body = (
+        'data: {"event": "message", "task_id": "t_2", "answer": "Hi"}\n\n'
+        'data: {"event": "message_end", "task_id": "t_2"}\n\n'
+    )
+    respx_mock.post("/v1/chat-messages").mock(
+        return_value=Response(200, headers={"content-type": "text/event-stream"}, content=body)
+    )
+    stop_route = respx_mock.post("/v1/chat-messages/t_2/stop").mock(return_value=Response(200, json={"result": "success"}))
+    api_key = {"DIFY_API_KEY": "test", "DIFY_APP_KEY": "app"}
+    async with DifyAsyncClient(base_url="http://localhost", api_key=api_key) as client:
+        async for event in client.chat.stream_chat_message(messages="Hello"):
+            if "message_end" in event.data:
+                break
+        await asyncio.gather(*base._background_tasks)
+
+    assert not stop_route.called
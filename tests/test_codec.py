@@ -0,0 +1,76 @@
+from typing import List
+
+import httpx
+import pytest
+from pydantic import BaseModel
+from pydify_plus import AsyncClient
+from pydify_plus.codec import JSONCodec, OrjsonCodec, get_codec
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.models import DocumentPage
+from pydify_plus.testing import DEFAULT_API_KEYS
+
+
+def test_get_codec_resolves_names_and_instances():
+    orjson = pytest.importorskip("orjson")
+    assert isinstance(get_codec("auto"), OrjsonCodec)
+    assert get_codec("json").dumps({"q": "你好", "n": 1}) == '{"q":"你好","n":1}'.encode()
+    assert get_codec("orjson").loads(orjson.dumps({"a": [1, 2]})) == {"a": [1, 2]}
+
+    custom = JSONCodec()
+    assert get_codec(custom) is custom
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+    with pytest.raises(ValueError):
+        get_codec("json").loads(b"not json")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", ["json", "auto"])
+async def test_client_sends_pre_encoded_bodies_and_decodes_once(codec):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path.endswith("/text"):
+            return httpx.Response(200, content=b"plain text")
+        return httpx.Response(200, content=b'{"result":"success"}')
+
+    async with AsyncClient("http://dify.test", DEFAULT_API_KEYS, codec=codec, transport=httpx.MockTransport(handler)) as client:
+        assert await client._arequest("POST", "/v1/json", json={"query": "你好"}) == {"result": "success"}
+        assert await client._arequest("GET", "/v1/text") == "plain text"
+
+    request = seen[0]
+    assert request.content == '{"query":"你好"}'.encode()
+    assert request.headers["content-type"] == "application/json"
+    assert request.headers["content-length"] == str(len(request.content))
+
+
+@pytest.mark.asyncio
+async def test_document_metadata_is_encoded_with_the_client_codec(mock_dify, mock_dify_client):
+    async with mock_dify_client as client:
+        await client.documents.create_from_file_bytes("dataset-1", file_name="a.txt", content=b"hello", metadata={"doc_form": "text_model"})
+
+    body = mock_dify.requests_to(API_ENDPOINTS["DOCUMENTS_CREATE_FILE"])[-1].body
+    assert b'"doc_form":"text_model"' in body
+
+
+@pytest.mark.asyncio
+async def test_typed_mode_decodes_into_models(mock_dify):
+    class DocumentStatus(BaseModel):
+        id: str
+        indexing_status: str
+
+    class StatusPage(BaseModel):
+        data: List[DocumentStatus]
+
+    async with mock_dify.client(typed=True) as client:
+        page = await client.documents.list("dataset-1", limit=5)
+        assert isinstance(page, DocumentPage)
+        assert [d.id for d in page.data] == [f"document-{i}" for i in range(5)]
+        assert page.has_more and page.data[0].indexing_status == "completed"
+
+        assert isinstance(await client.documents.list("dataset-1", typed=False), dict)
+        narrow = await client.documents.list("dataset-1", typed=StatusPage)
+        assert narrow.data[0] == DocumentStatus(id="document-0", indexing_status="completed")
+        # Endpoints without a response model keep returning dicts.
+        assert isinstance(await client.feedback.list(), dict)
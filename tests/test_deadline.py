@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from pydify_plus import AsyncClient
+from pydify_plus.deadline import cap_timeout, current_deadline, deadline, resolve_deadline
+from pydify_plus.errors import DifyConnectionError, DifyDeadlineExceeded
+from pydify_plus.testing import DEFAULT_API_KEYS, Fault, Latency, MockDifyServer
+
+
+def test_deadlines_nest_and_cap_timeouts():
+    assert current_deadline() is None and resolve_deadline() is None
+    with deadline(10.0) as outer:
+        with deadline(60.0) as inner:
+            assert inner == outer  # an inner block cannot extend the deadline
+        with deadline(1.0) as inner:
+            assert inner < outer and resolve_deadline(5.0) == inner
+        assert resolve_deadline(1.0) < outer
+    assert current_deadline() is None
+
+    capped = cap_timeout(httpx.Timeout(60.0, connect=0.5), 2.0)
+    assert (capped.connect, capped.read, capped.write, capped.pool) == (0.5, 2.0, 2.0, 2.0)
+
+
+@pytest.mark.asyncio
+async def test_deadline_spans_attempts():
+    server = MockDifyServer(seed=0, faults=[Fault(hang=True)])
+    async with server.client(timeout=30.0, retries=3, retry_backoff_factor=0.0) as client:
+        started = time.monotonic()
+        with pytest.raises(DifyDeadlineExceeded):
+            await client._arequest("GET", "/v1/datasets", api_key_name="DIFY_DATASET_KEY", deadline=0.4)
+        elapsed = time.monotonic() - started
+
+    assert 0.35 < elapsed < 0.6
+    # Attempts get half of what is left: 0.2s, 0.1s, 0.05s, then the rest.
+    assert len(server.requests) == 4
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_when_the_deadline_cannot_be_met():
+    attempts = []
+
+    def refuse(request):
+        attempts.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async with AsyncClient("http://dify.test", dict(DEFAULT_API_KEYS), retries=3, retry_backoff_factor=1.0, transport=httpx.MockTransport(refuse)) as client:
+        started = time.monotonic()
+        with deadline(0.5):
+            with pytest.raises(DifyConnectionError):
+                await client._arequest("GET", "/v1/parameters")
+        assert time.monotonic() - started < 0.2
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_and_endpoint_timeouts():
+    server = MockDifyServer(seed=0, latency=Latency.constant(0.2))
+    async with server.client(scheduler=1, endpoint_timeouts={"DATASETS_LIST": httpx.Timeout(5.0, connect=1.0)}) as client:
+        assert client.endpoint_timeouts == {"/v1/datasets": httpx.Timeout(5.0, connect=1.0)}
+        busy = asyncio.ensure_future(client.dataset.list_datasets())
+        await asyncio.sleep(0)
+        with pytest.raises(DifyDeadlineExceeded, match="queued"):
+            with deadline(0.05):
+                await client.dataset.list_datasets()
+        await busy
+        assert client.scheduler.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_calls_not_retried_after_send_get_the_whole_budget():
+    server = MockDifyServer(seed=0, endpoint_latency={"/v1/chat-messages": Latency.constant(0.35)})
+    async with server.client(timeout=30.0, retries=3, retry_backoff_factor=0.0) as client:
+        with deadline(0.5):
+            answer = await client.chat.create_chat_message(model="m", messages=[], query="hi", user="u", response_mode="blocking")
+        assert answer["answer"] and len(server.requests) == 1
+
+        # Retried calls still hold each attempt to a share of the budget.
+        server.endpoint_latency["/v1/datasets"] = Latency.constant(0.35)
+        with deadline(0.5), pytest.raises(DifyDeadlineExceeded):
+            await client._arequest("GET", "/v1/datasets", api_key_name="DIFY_DATASET_KEY")
+
+    capped = cap_timeout(httpx.Timeout(60.0), 2.0, 0.5)
+    assert (capped.connect, capped.read, capped.write, capped.pool) == (0.5, 2.0, 2.0, 0.5)
@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+from pydify_plus import AsyncClient
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.errors import DifyServerError, DifyTimeoutError
+from pydify_plus.testing import DEFAULT_API_KEYS, Fault, FaultInjectionTransport, Latency, MockDifyServer
+
+FEEDBACK_LIST = API_ENDPOINTS["FEEDBACK_LIST"]
+
+
+def _client(injector, **kwargs):
+    kwargs.setdefault("retry_backoff_factor", 0.0)
+    return AsyncClient("http://mock-dify", DEFAULT_API_KEYS, transport=injector, hooks=[injector.retry_cost], **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_retried_and_costed():
+    injector = FaultInjectionTransport(MockDifyServer().transport(), faults=[Fault.timeout(endpoint=FEEDBACK_LIST, times=2)])
+
+    async with _client(injector, timeout=0.05, retries=3) as client:
+        assert (await client.feedback.list())["data"]
+
+    report = injector.report()
+    assert report["faults"] == {FEEDBACK_LIST: {"timeout": 2}}
+    retries = report["retries"]
+    assert retries["calls"] == 1 and retries["attempts"] == 3
+    assert retries["extra_requests"] == 2
+    assert retries["amplification"] == 3.0
+    assert retries["failed_attempt_time"] >= 0.1
+    assert retries["errors"] == {"DifyTimeoutError": 2}
+
+
+@pytest.mark.asyncio
+async def test_status_faults_are_seeded_per_endpoint():
+    async def run(seed):
+        injector = FaultInjectionTransport(MockDifyServer().transport(), faults=[Fault.server_error(503, endpoint=FEEDBACK_LIST, probability=0.3)], seed=seed)
+        outcomes = []
+        async with _client(injector, retries=0) as client:
+            for _ in range(30):
+                try:
+                    await client.feedback.list()
+                    outcomes.append("ok")
+                except DifyServerError:
+                    outcomes.append("503")
+            await client._arequest("GET", API_ENDPOINTS["CONVERSATIONS_LIST"])
+        return outcomes, injector.report()
+
+    first, report = await run(seed=5)
+    second, _ = await run(seed=5)
+
+    assert first == second
+    assert 0 < first.count("503") < 30
+    assert report["faults"][FEEDBACK_LIST]["status_503"] == first.count("503")
+    assert API_ENDPOINTS["CONVERSATIONS_LIST"] not in report["faults"]
+
+
+@pytest.mark.asyncio
+async def test_stream_cut_mid_sse():
+    injector = FaultInjectionTransport(MockDifyServer(answer="a b c d").transport(), faults=[Fault.stream_reset(after_events=2, times=1)])
+
+    async with _client(injector, retries=1) as client:
+        events = [e async for e in client.chat.stream_chat_message(messages="Hello")]
+
+    # Two events from the cut attempt, then the full stream from the retry.
+    assert len(events) == 2 + 5
+    assert json.loads(events[-1].data)["event"] == "message_end"
+    report = injector.report()
+    assert report["faults"][API_ENDPOINTS["CHAT_MESSAGES_STREAM"]] == {"stream_reset": 1}
+    assert report["retries"]["extra_requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_latency_and_bandwidth_throttle():
+    injector = FaultInjectionTransport(MockDifyServer().transport(), latency=Latency.constant(0.02), bandwidth=200_000)
+
+    async with _client(injector) as client:
+        started = time.perf_counter()
+        await client.files.upload_file_bytes("a.bin", b"x" * 20_000)
+        elapsed = time.perf_counter() - started
+
+    assert elapsed >= 0.02 + 0.1 * 0.8
+    assert injector.report()["injected_latency"] == pytest.approx(0.02)
+    assert injector.throttle_time > 0
+
+
+@pytest.mark.asyncio
+async def test_server_side_hang_times_out():
+    server = MockDifyServer()
+    server.add_fault(Fault.timeout(endpoint=FEEDBACK_LIST))
+
+    async with server.client(timeout=0.05, retries=0) as client:
+        with pytest.raises(DifyTimeoutError):
+            await client.feedback.list()
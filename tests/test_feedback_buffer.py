@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.testing import Fault, Latency, MockDifyServer
+
+LIKE = API_ENDPOINTS["FEEDBACK_LIKE"]
+
+
+def _votes(server):
+    return [(r.path.rsplit("/", 2)[-2], r.json()["score"]) for r in server.requests_to(LIKE)]
+
+
+@pytest.mark.asyncio
+async def test_votes_coalesce_and_flush_on_size():
+    server = MockDifyServer(seed=0)
+    async with server.client() as client:
+        buffer = client.feedback.buffer(max_events=3, flush_interval=60.0)
+        buffer.add("m1", score=1)
+        buffer.add("m2", score=1)
+        buffer.add("m1", score=-1)  # last write wins
+        assert server.requests == []
+        buffer.add("m3")
+        await asyncio.sleep(0.05)
+        assert sorted(_votes(server)) == [("m1", -1), ("m2", 1), ("m3", 1)]
+        assert buffer.pending == {}
+
+    assert client.metrics.counter_value("dify_client_feedback_votes_total", outcome="coalesced") == 1
+    assert client.metrics.counter_value("dify_client_feedback_votes_total", outcome="sent") == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_on_interval_retry_and_close():
+    server = MockDifyServer(seed=0, faults=[Fault.server_error(503, endpoint=LIKE, times=1)])
+    async with server.client(retries=0) as client:
+        buffer = client.feedback.buffer(flush_interval=0.02)
+        buffer.add("m1")
+        await asyncio.sleep(0.1)
+        # The 503 kept the vote for the next flush.
+        assert _votes(server) == [("m1", 1), ("m1", 1)]
+
+        buffer.add("m2", score=-1)
+    # Closing the client flushed the buffer.
+    assert _votes(server)[-1] == ("m2", -1)
+    assert buffer.closed and client._closers == []
+    with pytest.raises(RuntimeError):
+        buffer.add("m3")
+
+
+@pytest.mark.asyncio
+async def test_close_survives_a_failing_closer():
+    server = MockDifyServer(seed=0)
+    client = server.client()
+    buffer = client.feedback.buffer(flush_interval=60.0)
+    buffer.add("message-1", score=1)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    client._closers.append(broken)
+    await client.aclose()
+
+    assert client._closers == [] and client._cli is None
+    assert len(server.requests_to(API_ENDPOINTS["FEEDBACK_LIKE"])) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_a_flush_in_progress():
+    server = MockDifyServer(seed=0, endpoint_latency={LIKE: Latency.constant(0.1)})
+    client = server.client()
+    buffer = client.feedback.buffer(flush_interval=0.01)
+    buffer.add("m1", score=1)
+    await asyncio.sleep(0.05)  # the timer's flush is sending m1
+    assert buffer.pending == {}
+    await client.aclose()
+
+    assert client.metrics.counter_value("dify_client_feedback_votes_total", outcome="sent") == 1
+    assert buffer.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_sends_keep_their_votes():
+    server = MockDifyServer(seed=0, endpoint_latency={LIKE: Latency.constant(0.1)})
+    async with server.client() as client:
+        buffer = client.feedback.buffer(flush_interval=60.0)
+        buffer.add("m1", score=-1)
+        flush = asyncio.ensure_future(buffer.flush())
+        await asyncio.sleep(0.05)
+        flush.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush
+        assert buffer.pending == {"m1": -1}
+    assert client.metrics.counter_value("dify_client_feedback_votes_total", outcome="sent") == 1
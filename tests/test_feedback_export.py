@@ -0,0 +1,84 @@
+import csv
+import json
+
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.feedback_export import UNKNOWN_DAY, FeedbackStats, RatingCounts, aggregate_feedback, export_feedback, iter_feedback_pages
+from pydify_plus.scheduler import current_priority
+from pydify_plus.testing import MockDifyServer
+
+# The mock server rates every third item "dislike", starting with the first.
+ITEMS = 50
+
+
+@pytest.mark.asyncio
+async def test_export_streams_pages_and_counts(tmp_path):
+    server = MockDifyServer(seed=0, list_size=ITEMS)
+    stats = FeedbackStats(vectorized=False)
+    async with server.client() as client:
+        assert await export_feedback(client, str(tmp_path / "fb.jsonl"), limit=20, stats=stats) == ITEMS
+        assert await export_feedback(client, str(tmp_path / "fb.csv"), format="csv", limit=20) == ITEMS
+        with pytest.raises(ValueError):
+            await export_feedback(client, str(tmp_path / "fb.parquet"), format="parquet")
+
+    assert len(server.requests_to(API_ENDPOINTS["FEEDBACK_LIST"])) == 6
+    lines = (tmp_path / "fb.jsonl").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [f"feedback-{i}" for i in range(ITEMS)]
+    with open(tmp_path / "fb.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == ITEMS and rows[1]["rating"] == "like"
+
+    dislikes = len(range(0, ITEMS, 3))
+    assert stats.items == ITEMS
+    assert stats.total() == RatingCounts(ITEMS - dislikes, dislikes)
+    assert stats.by_app() == {"app-mock": stats.total()}
+    assert stats.by_message()["message-0"] == RatingCounts(0, 1)
+    assert sum(c.total for c in stats.by_day().values()) == ITEMS
+
+
+@pytest.mark.asyncio
+async def test_vectorized_counts_match_fallback():
+    pytest.importorskip("numpy")
+    server = MockDifyServer(seed=0, list_size=ITEMS)
+    async with server.client() as client:
+        fast = await aggregate_feedback(client, limit=7, vectorized=True)
+        slow = await aggregate_feedback(client, limit=7, vectorized=False)
+    assert fast.by_app() == slow.by_app()
+    assert fast.by_day() == slow.by_day()
+    assert fast.by_message() == slow.by_message()
+
+
+class _Feedback:
+    """Pages without ``has_more`` and with string timestamps."""
+
+    def __init__(self, items):
+        self.items = items
+        self.pages = []
+        self.priorities = []
+
+    async def list(self, *, page, limit):
+        self.pages.append(page)
+        self.priorities.append(current_priority())
+        return {"data": self.items[(page - 1) * limit:page * limit]}
+
+
+class _Client:
+    def __init__(self, items):
+        self.feedback = _Feedback(items)
+
+
+@pytest.mark.asyncio
+async def test_pages_without_has_more_and_string_timestamps():
+    stamps = ["2025-06-02T10:00:00Z", "2025-06-02 23:59:59", "Tue, 03 Jun 2025 08:00:00 GMT", "1748908800", None, "yesterday"]
+    items = [{"message_id": f"m{i}", "app_id": "a", "rating": "like", "created_at": stamp} for i, stamp in enumerate(stamps)]
+
+    client = _Client(items)
+    pages = [page async for page in iter_feedback_pages(client, limit=2)]
+    # Three full pages, then an empty one that ends the walk.
+    assert [len(p) for p in pages] == [2, 2, 2, 0] and client.feedback.pages == [1, 2, 3, 4]
+    assert set(client.feedback.priorities) == {"background"}
+
+    stats = await aggregate_feedback(_Client(items), limit=4, vectorized=False)
+    assert stats.items == 6
+    assert {day: c.likes for day, c in stats.by_day().items()} == {"2025-06-02": 2, "2025-06-03": 2, UNKNOWN_DAY: 2}
+    assert list(stats.by_day())[-1] == UNKNOWN_DAY
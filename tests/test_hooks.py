@@ -0,0 +1,128 @@
+import httpx
+import pytest
+from httpx import Response
+from pydify_plus import AsyncClient as DifyAsyncClient
+from pydify_plus.errors import DifyServerError, DifyTimeoutError
+from pydify_plus.hooks import Hooks, OpenTelemetryHooks
+
+
+class RecordingHooks(Hooks):
+    def __init__(self):
+        self.calls = []
+
+    def on_request_start(self, ctx):
+        self.calls.append(("start", ctx.endpoint, ctx.attempt))
+
+    def on_response(self, ctx, response):
+        self.calls.append(("response", ctx.status_code))
+
+    def on_retry(self, ctx, error, delay):
+        self.calls.append(("retry", type(error).__name__))
+
+    def on_error(self, ctx, error):
+        self.calls.append(("error", type(error).__name__))
+
+    def on_stream_event(self, ctx, event):
+        self.calls.append(("event", event.data))
+
+
+class FakeSpan:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.exceptions = []
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, error):
+        self.exceptions.append(error)
+
+    def set_status(self, status):
+        pass
+
+    def end(self):
+        self.ended = True
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None, **kwargs):
+        span = FakeSpan(name, attributes or {})
+        self.spans.append(span)
+        return span
+
+
+@pytest.mark.asyncio
+async def test_hooks_called_with_endpoint_template(respx_mock):
+    respx_mock.get("/v1/datasets/d_1/documents").mock(return_value=Response(200, json={"data": []}))
+    hooks = RecordingHooks()
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test", hooks=[hooks]) as client:
+        await client._arequest("GET", "/v1/datasets/d_1/documents")
+
+    assert hooks.calls == [("start", "/v1/datasets/{dataset_id}/documents", 1), ("response", 200)]
+
+
+@pytest.mark.asyncio
+async def test_hooks_on_retry_and_error(respx_mock):
+    respx_mock.get("/v1/app/meta").mock(side_effect=httpx.ReadTimeout("timed out"))
+    hooks = RecordingHooks()
+    client = DifyAsyncClient(base_url="http://localhost", api_key="test", retries=1, retry_backoff_factor=0, hooks=[hooks])
+    async with client:
+        with pytest.raises(DifyTimeoutError):
+            await client._arequest("GET", "/v1/app/meta")
+
+    assert [c[0] for c in hooks.calls] == ["start", "retry", "start", "error"]
+    assert client.metrics.counter_value("dify_client_retries_total", endpoint="/v1/app/meta") == 1
+    assert client.metrics.counter_value("dify_client_errors_total", error="DifyTimeoutError") == 2
+
+
+@pytest.mark.asyncio
+async def test_hooks_on_stream_event(respx_mock):
+    body = 'data: {"event": "message", "answer": "Hi"}\n\n'
+    respx_mock.post("/v1/chat-messages").mock(
+        return_value=Response(200, headers={"content-type": "text/event-stream"}, content=body)
+    )
+    hooks = RecordingHooks()
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test", hooks=[hooks]) as client:
+        events = [e async for e in client._stream_request("POST", "/v1/chat-messages", json={})]
+
+    assert len(events) == 1
+    assert hooks.calls[1:] == [("response", 200), ("event", '{"event": "message", "answer": "Hi"}')]
+
+
+@pytest.mark.asyncio
+async def test_stream_error_response_raises_mapped_error(respx_mock):
+    respx_mock.post("/v1/chat-messages").mock(return_value=Response(500, json={"message": "boom"}))
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
+        with pytest.raises(DifyServerError):
+            async for _ in client._stream_request("POST", "/v1/chat-messages", json={}):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_failing_hook_does_not_break_request(respx_mock):
+    class Broken(Hooks):
+        def on_response(self, ctx, response):
+            raise RuntimeError("boom")
+
+    respx_mock.get("/v1/app/meta").mock(return_value=Response(200, json={"ok": True}))
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test", hooks=[Broken()]) as client:
+        assert await client._arequest("GET", "/v1/app/meta") == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_opentelemetry_hooks_emit_spans(respx_mock):
+    respx_mock.get("/v1/conversations/c_1/messages").mock(return_value=Response(404, json={"message": "nope"}))
+    tracer = FakeTracer()
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test", hooks=[OpenTelemetryHooks(tracer)]) as client:
+        with pytest.raises(Exception):
+            await client._arequest("GET", "/v1/conversations/c_1/messages")
+
+    [span] = tracer.spans
+    assert span.name == "GET /v1/conversations/{conversation_id}/messages"
+    assert span.attributes["http.response.status_code"] == 404
+    assert span.ended
@@ -0,0 +1,106 @@
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.errors import DifyTimeoutError
+from pydify_plus.idempotency import IdempotencyJournal, derive_key, idempotency_scope
+from pydify_plus.testing import Fault, MockDifyServer
+
+LIKE = API_ENDPOINTS["FEEDBACK_LIKE"]
+
+
+def _keys(server, endpoint=LIKE):
+    return [r.headers.get("idempotency-key") for r in server.requests_to(endpoint)]
+
+
+def test_derived_keys_depend_on_scope_and_body():
+    key = derive_key("job", "POST", "/v1/datasets", content=b'{"name":"a"}')
+    assert key == derive_key("job", "post", "/v1/datasets", content=b'{"name":"a"}')
+    assert key != derive_key("job", "POST", "/v1/datasets", content=b'{"name":"b"}')
+    assert key != derive_key("other", "POST", "/v1/datasets", content=b'{"name":"a"}')
+    upload = derive_key("job", "POST", "/v1/files/upload", files={"file": ("a.txt", b"hello", "text/plain")})
+    assert upload != derive_key("job", "POST", "/v1/files/upload", files={"file": ("a.txt", b"world", "text/plain")})
+
+
+def test_derived_keys_hash_open_files(tmp_path):
+    first, second = tmp_path / "a", tmp_path / "b"
+    for folder, text in ((first, b"quarterly numbers"), (second, b"annual numbers")):
+        folder.mkdir()
+        (folder / "report.pdf").write_bytes(text)
+
+    def key(folder):
+        with open(folder / "report.pdf", "rb") as f:
+            f.read(3)
+            derived = derive_key("job", "POST", "/v1/files/upload", files={"file": ("report.pdf", f)})
+            assert f.tell() == 3  # put back where it was
+            return derived
+
+    assert key(first) == key(first) != key(second)
+    before = key(first)
+    (first / "report.pdf").write_bytes(b"quarterly numbers, revised")
+    assert key(first) != before
+
+
+@pytest.mark.asyncio
+async def test_keys_are_stable_across_retries():
+    server = MockDifyServer(seed=0, faults=[Fault.timeout(endpoint=LIKE, times=2)])
+    async with server.client(timeout=0.05, retries=3, retry_backoff_factor=0.0, idempotency_keys=True) as client:
+        await client.feedback.like("message-1")
+        await client.feedback.like("message-1")
+        await client.feedback.list()
+
+    # Keyed POSTs are retried after a timeout; each call has its own key.
+    keys = _keys(server)
+    assert len(keys) == 4 and keys[0] == keys[1] == keys[2] != keys[3]
+    assert server.requests_to(API_ENDPOINTS["FEEDBACK_LIST"])[0].headers.get("idempotency-key") is None
+
+
+@pytest.mark.asyncio
+async def test_journal_skips_completed_calls(tmp_path):
+    path = str(tmp_path / "import.journal")
+    server = MockDifyServer(seed=0)
+    journal = IdempotencyJournal(path)
+    async with server.client(journal=journal) as client:
+        with idempotency_scope("import"):
+            first = [await client.feedback.like(m) for m in ("m1", "m2")]
+        await client.feedback.like("m1")  # unscoped: not journaled
+    journal.close()
+    assert len(journal) == 2 and len(server.requests_to(LIKE)) == 3
+
+    # A re-run after a crash; the last line was cut short.
+    with open(path, "a") as f:
+        f.write('{"key": "import:')
+    journal = IdempotencyJournal(path)
+    async with server.client(journal=journal) as client:
+        with idempotency_scope("import"):
+            again = [await client.feedback.like(m) for m in ("m1", "m2", "m3")]
+        assert client.metrics.counter_value("dify_client_deduplicated_total") == 2
+    journal.close()
+
+    assert again[:2] == first
+    assert len(server.requests_to(LIKE)) == 4
+    assert len(set(_keys(server))) == 4
+
+
+@pytest.mark.asyncio
+async def test_scoped_keys_are_sent_without_retrying_after_send():
+    server = MockDifyServer(seed=0, faults=[Fault.timeout(endpoint=LIKE, times=1)])
+    async with server.client(timeout=0.05, retries=3, retry_backoff_factor=0.0) as client:
+        with idempotency_scope("job"), pytest.raises(DifyTimeoutError):
+            await client.feedback.like("message-1")
+
+    # The header goes out, but only `idempotency_keys=True` allows a resend.
+    keys = _keys(server)
+    assert len(keys) == 1 and keys[0].startswith("job:")
+
+
+def test_journal_skips_lines_that_are_not_entries(tmp_path):
+    path = tmp_path / "import.journal"
+    path.write_text(
+        '{"key": "a", "at": 1.0, "body": "{}"}\n'
+        '{"key": "b", "body": "{}"}\n'
+        '["not", "an", "entry"]\n'
+        '{"key": "c", "at": 1.0, "body": 7}\n'
+        '{"key": "d", "at": "later", "body": "{}"}\n'
+    )
+    journal = IdempotencyJournal(str(path))
+    journal.close()
+    assert list(journal.entries) == ["a"]
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Self time (microseconds) all pydify_plus modules may spend importing;
+# httpx and asyncio are not counted.
+IMPORT_BUDGET_US = 60_000
+
+# Modules a bare `import pydify_plus` plus client construction must not load.
+LAZY_MODULES = ("pydantic", "httpx_sse", "anyio", "pydify_plus.apis", "pydify_plus.models", "pydify_plus.sync_client")
+
+
+def _python(code):
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # The package directory itself must not be on the path (its types.py would shadow the stdlib).
+    path = [p for p in sys.path if p and os.path.abspath(p) != package_dir]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path))
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=tempfile.gettempdir(), env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def test_client_construction_imports_nothing_optional():
+    result = _python(
+        "import json, sys, pydify_plus\n"
+        "client = pydify_plus.AsyncClient('http://dify.test', 'app-key')\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+        "client.documents\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    before, after = (json.loads(line) for line in result.stdout.splitlines())
+    assert [m for m in before if m.startswith(LAZY_MODULES)] == []
+    assert "pydify_plus.apis.documents" in after and "pydify_plus.apis.chat" not in after
+    assert "pydantic" not in after
+
+
+def test_import_time_budget():
+    result = _python("import pydify_plus")
+    self_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if name.strip().startswith("pydify_plus"):
+            self_us += int(own)
+    assert 0 < self_us < IMPORT_BUDGET_US
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from pydify_plus.lazy import LazyPage
+
+
+BODY = b'{"total": 3, "data": [ {"id": "a", "tags": ["]", "}"]} , {"id": "b,}"}, {"id": "c"} ] , "has_more": true}'
+
+
+def test_lazy_page_decodes_on_access():
+    page = LazyPage(BODY)
+    assert page["data"][0] == {"id": "a", "tags": ["]", "}"]}
+    assert page._array_end is None  # only the first item has been scanned
+
+    assert page["has_more"] is True and page["total"] == 3
+    assert [item["id"] for item in page["data"]] == ["a", "b,}", "c"]
+    assert len(page["data"]) == 3 and page["data"][-1] == {"id": "c"}
+    assert list(page.pluck("id")) == [("a",), ("b,}",), ("c",)]
+    assert list(page) == ["total", "data", "has_more"] and len(page) == 3
+    assert {**page}["data"] is page["data"] and dict(page.items())["has_more"] is True
+    assert page.to_dict()["data"][1] == {"id": "b,}"}
+
+    with pytest.raises(IndexError):
+        page["data"][3]
+    with pytest.raises(KeyError):
+        page["missing"]
+
+
+@pytest.mark.asyncio
+async def test_list_methods_return_lazy_pages(mock_dify):
+    async with mock_dify.client() as client:
+        page = await client.documents.list("dataset-1", limit=20, lazy=True)
+        assert isinstance(page, LazyPage) and page._codec is client.codec
+        assert list(page.pluck("id", "indexing_status"))[:2] == [("document-0", "completed"), ("document-1", "completed")]
+        assert page["has_more"] is True and page["limit"] == 20
+
+        feedback = await client.feedback.list(lazy=True)
+        assert feedback["data"][0]["id"] == "feedback-0"
+        segments = await client.blocks.list("dataset-1", "document-1", lazy=True)
+        assert len(segments["data"]) == segments["limit"]
+
+
+def test_lazy_page_splits_large_arrays_into_chunks():
+    items = [{"id": f"item-{i}", "tags": ["x"] * (i % 3), "meta": {"n": i}} for i in range(3000)]
+    odd = [{"id": "]", "note": "}{["}, "a,]", [1, [2]], None]
+    body = json.dumps({"data": items + odd, "has_more": False, "extra": {"k": "}"}}).encode()
+
+    page = LazyPage(body)
+    assert page["has_more"] is False and page["extra"] == {"k": "}"}
+    assert len(page["data"]) == 3004 and len(page._chunks) > 2
+    assert page["data"][2999] == items[-1] and page["data"][1500] == items[1500]
+    assert list(LazyPage(body)["data"]) == items + odd
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from pydify_plus.errors import DifyRateLimitError
+from pydify_plus.limiter import AdaptiveLimiter, AIMDLimit, GradientLimit, endpoint_family
+from pydify_plus.testing import Fault, Latency, MockDifyServer
+
+
+def test_limit_algorithms():
+    aimd = AIMDLimit(initial=10, max_limit=12)
+    aimd.update(0.1, in_flight=2, dropped=False)
+    assert aimd.limit == 10  # not saturated: no growth
+    for _ in range(5):
+        aimd.update(0.1, in_flight=10, dropped=False)
+    assert aimd.limit == 12
+    aimd.update(0.1, in_flight=10, dropped=True)
+    assert aimd.limit == pytest.approx(10.8)
+
+    gradient = GradientLimit(initial=20)
+    for _ in range(50):
+        gradient.update(0.1, in_flight=20, dropped=False)
+    grown = gradient.limit
+    assert grown > 20
+    for _ in range(20):
+        gradient.update(0.6, in_flight=int(gradient.limit), dropped=False)
+    assert gradient.limit < grown / 2
+
+    assert endpoint_family("/v1/datasets/{dataset_id}/documents") == "datasets"
+    assert endpoint_family("/v1/chat-messages") == "chat-messages"
+
+
+@pytest.mark.asyncio
+async def test_permits_queue_in_order_per_partition():
+    limiter = AdaptiveLimiter("aimd", initial=1)
+    first = await limiter.acquire("/v1/chat-messages")
+    other = await limiter.acquire("/v1/datasets", "DIFY_DATASET_KEY")  # separate partition
+    waiters = [asyncio.ensure_future(limiter.acquire("/v1/chat-messages")) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.stats()["chat-messages", "DIFY_API_KEY"] == {"limit": 1, "in_flight": 1, "queued": 3}
+
+    waiters[0].cancel()
+    await asyncio.sleep(0)
+    first.release()
+    await asyncio.sleep(0)
+    assert waiters[1].done() and not waiters[2].done()
+    waiters[1].result().release()
+    (await waiters[2]).release()
+    other.release()
+    assert limiter.stats()["chat-messages", "DIFY_API_KEY"] == {"limit": 1, "in_flight": 0, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_client_adapts_to_load_shedding():
+    server = MockDifyServer(seed=0, latency=Latency.constant(0.01))
+    limiter = AdaptiveLimiter("aimd", initial=4, max_limit=4)
+    async with server.client(limiter=limiter, retries=0) as client:
+        limiter.metrics = client.metrics
+        await asyncio.gather(*(client.dataset.list_datasets() for _ in range(12)))
+        assert server.max_in_flight == 4
+
+        server.add_fault(Fault.rate_limited(times=4))
+        results = await asyncio.gather(*(client.dataset.list_datasets() for _ in range(4)), return_exceptions=True)
+        assert all(isinstance(r, DifyRateLimitError) for r in results)
+
+    assert limiter.stats()["datasets", "DIFY_DATASET_KEY"]["limit"] == 2
+    exported = client.metrics.to_prometheus()
+    assert 'dify_client_concurrency_limit{family="datasets",key="DIFY_DATASET_KEY"} 2' in exported
+    assert "# TYPE dify_client_concurrency_queued gauge" in exported
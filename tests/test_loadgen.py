@@ -0,0 +1,65 @@
+import pytest
+from pydify_plus import loadgen
+from pydify_plus.loadgen import LoadConfig, run_load
+from pydify_plus.testing import Fault, Latency, MockDifyServer
+
+
+@pytest.mark.asyncio
+async def test_closed_loop_mixed_workload(mock_dify_client):
+    config = LoadConfig(concurrency=4, duration=0.3, mix={"chat": 1, "search": 1, "workflow": 1}, dataset_id="d1", workflow_id="w1", seed=1)
+
+    report = await run_load(mock_dify_client, config)
+    data = report.as_dict()
+
+    assert data["mode"] == "closed"
+    assert set(data["operations"]) == {"chat", "search", "workflow"}
+    assert data["total"]["ok"] == data["total"]["count"] > 0
+    assert data["operations"]["chat"]["ttft"]["p50"] is not None
+    assert "chat" in report.format()
+
+
+@pytest.mark.asyncio
+async def test_open_loop_counts_errors_and_drops():
+    server = MockDifyServer(latency=Latency.constant(0.05), seed=0)
+    server.add_fault(Fault.rate_limited(probability=0.5))
+    client = server.client(retries=0)
+    config = LoadConfig(rps=400, duration=0.3, mix={"search": 1}, dataset_id="d1", max_in_flight=5, seed=3)
+
+    report = await run_load(client, config)
+    stats = report.operations["search"]
+
+    assert stats.errors["DifyRateLimitError(429)"] > 0
+    assert stats.ok > 0
+    assert report.dropped > 0
+    assert report.max_in_flight <= 5
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        LoadConfig(duration=1)
+    with pytest.raises(ValueError):
+        LoadConfig(rps=1, mix={"search": 1})
+    with pytest.raises(ValueError):
+        LoadConfig(rps=1, mix={"nope": 1})
+
+
+def test_cli_takes_the_base_url_from_the_environment(monkeypatch, capsys):
+    seen = {}
+
+    class _Report:
+        def format(self):
+            return "report"
+
+    async def fake_main(args, config):
+        seen["base_url"] = args.base_url
+        return _Report()
+
+    monkeypatch.setattr(loadgen, "_main", fake_main)
+    monkeypatch.setenv("DIFY_BASE_URL", "http://dify.example")
+    assert loadgen.main(["--rps", "1", "--duration", "1"]) == 0
+    assert seen["base_url"] == "http://dify.example"
+
+    monkeypatch.delenv("DIFY_BASE_URL")
+    with pytest.raises(SystemExit):
+        loadgen.main(["--rps", "1", "--duration", "1"])
+    assert "--base-url" in capsys.readouterr().err
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+from httpx import Response
+from pydify_plus import AsyncClient as DifyAsyncClient
+from pydify_plus.log import LogSampler, redact_headers, summarize, summarize_files
+
+
+def test_redact_headers_masks_credentials():
+    headers = {"Authorization": "Bearer app-1234567890abcd", "Content-Type": "application/json"}
+    redacted = redact_headers(headers)
+    assert redacted["Authorization"] == "Bearer ***abcd"
+    assert redacted["Content-Type"] == "application/json"
+    assert headers["Authorization"] == "Bearer app-1234567890abcd"
+
+
+def test_summarize_is_bounded():
+    text = summarize({"text": "x" * 1_000_000, "title": "doc"})
+    assert len(text) < 300
+    assert "title" in text
+    assert summarize(b"\x00" * 2048) == "<2048 bytes>"
+    assert summarize_files({"file": ("a.txt", b"hello", "text/plain")}) == "file=a.txt(5)"
+
+
+def test_log_sampler_rates():
+    sampler = LogSampler(rate=1.0, rates={"/v1/feedbacks": 0.0})
+    assert sampler.sample("/v1/app/meta")
+    assert not any(sampler.sample("/v1/feedbacks") for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_debug_logging_redacts_and_summarizes(respx_mock, caplog):
+    respx_mock.post("/v1/datasets/d_1/document/create-by-text").mock(return_value=Response(200, json={"ok": True}))
+    logger = logging.getLogger("pydify_plus.test.debug")
+    async with DifyAsyncClient(base_url="http://localhost", api_key="app-secret-key-1234", logger=logger) as client:
+        with caplog.at_level(logging.DEBUG, logger=logger.name):
+            await client._arequest("POST", "/v1/datasets/d_1/document/create-by-text", json={"text": "x" * 100_000})
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("Making POST request" in m for m in messages)
+    assert not any("app-secret-key-1234" in m for m in messages)
+    assert all(len(m) < 1000 for m in messages)
+    assert caplog.records[0].dify_endpoint == "/v1/datasets/{dataset_id}/document/create-by-text"
+
+
+@pytest.mark.asyncio
+async def test_debug_logging_skipped_when_disabled(respx_mock, monkeypatch):
+    from pydify_plus import async_client
+
+    def fail(*args, **kwargs):
+        raise AssertionError("payload summarized while debug logging is off")
+
+    monkeypatch.setattr(async_client, "summarize", fail)
+    respx_mock.get("/v1/app/meta").mock(return_value=Response(200, json={}))
+    logger = logging.getLogger("pydify_plus.test.quiet")
+    logger.setLevel(logging.INFO)
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test", logger=logger) as client:
+        await client._arequest("GET", "/v1/app/meta")
+
+
+@pytest.mark.asyncio
+async def test_slow_request_log(respx_mock, caplog):
+    respx_mock.get("/v1/app/meta").mock(return_value=Response(200, json={}))
+    logger = logging.getLogger("pydify_plus.test.slow")
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test", logger=logger, slow_request_threshold=0.0) as client:
+        with caplog.at_level(logging.WARNING, logger=logger.name):
+            await client._arequest("GET", "/v1/app/meta")
+
+    [record] = caplog.records
+    assert "Slow GET request to /v1/app/meta" in record.getMessage()
@@ -0,0 +1,80 @@
+import pytest
+from httpx import Response
+from pydify_plus import AsyncClient as DifyAsyncClient
+from pydify_plus.metrics import Histogram, MetricsRegistry, StreamTimings, resolve_endpoint, UNKNOWN_ENDPOINT
+
+
+def test_resolve_endpoint_uses_templates():
+    assert resolve_endpoint("/v1/datasets/d_1/documents") == "/v1/datasets/{dataset_id}/documents"
+    assert resolve_endpoint("/v1/chat-messages/t_1/stop") == "/v1/chat-messages/{task_id}/stop"
+    assert resolve_endpoint("v1/feedbacks?page=2") == "/v1/feedbacks"
+    assert resolve_endpoint("/v2/unknown") == UNKNOWN_ENDPOINT
+
+
+def test_histogram_quantiles():
+    hist = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        hist.observe(value)
+    assert hist.count == 4
+    assert hist.counts == [1, 2, 1, 0]
+    assert 1.0 <= hist.quantile(0.5) <= 2.0
+    assert Histogram().quantile(0.5) is None
+
+
+def test_registry_aggregates_streams_per_endpoint():
+    registry = MetricsRegistry()
+    for _ in range(2):
+        timings = StreamTimings(endpoint="/v1/chat-messages")
+        timings.on_headers()
+        timings.on_event(type("Event", (), {"data": '{"event": "message", "answer": "Hi"}'})())
+        timings.finish(num_bytes=10, completed=True)
+        registry.record_stream(timings)
+
+    stats = registry.snapshot()["streams"]["/v1/chat-messages"]
+    assert stats["streams"] == 2
+    assert stats["completed"] == 2
+    assert stats["bytes"] == 20
+    assert stats["first_token"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_request_records_timings(respx_mock):
+    body = (
+        'data: {"event": "workflow_started", "task_id": "t_1"}\n\n'
+        'data: {"event": "message", "task_id": "t_1", "answer": "Hi"}\n\n'
+        'data: {"event": "message_end", "task_id": "t_1"}\n\n'
+    )
+    respx_mock.post("/v1/chat-messages").mock(
+        return_value=Response(200, headers={"content-type": "text/event-stream"}, content=body)
+    )
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
+        stream = client._stream_request("POST", "/v1/chat-messages", json={"query": "Hi"})
+        events = [event async for event in stream]
+
+        timings = stream.timings
+        assert len(events) == 3
+        assert timings.events == 3
+        assert timings.completed
+        assert timings.bytes == len(body)
+        assert timings.headers is not None
+        assert timings.first_event <= timings.first_token <= timings.duration
+        assert timings.gaps.count == 2
+
+        stats = client.metrics.snapshot()["streams"]["/v1/chat-messages"]
+        assert stats["streams"] == 1
+        assert stats["events"] == 3
+
+
+@pytest.mark.asyncio
+async def test_prometheus_export(respx_mock):
+    respx_mock.get("/v1/datasets/d_1").mock(return_value=Response(200, json={"id": "d_1"}))
+    respx_mock.get("/v1/datasets/d_2").mock(return_value=Response(200, json={"id": "d_2"}))
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
+        await client._arequest("GET", "/v1/datasets/d_1")
+        await client._arequest("GET", "/v1/datasets/d_2")
+        text = client.metrics.to_prometheus()
+
+    assert "# TYPE dify_client_requests_total counter" in text
+    assert 'dify_client_requests_total{endpoint="/v1/datasets/{dataset_id}",method="GET",status="200"} 2' in text
+    assert 'dify_client_request_duration_seconds_bucket{endpoint="/v1/datasets/{dataset_id}",method="GET",le="+Inf"} 2' in text
+    assert "d_1" not in text
@@ -0,0 +1,108 @@
+import json
+
+import httpx
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.errors import DifyNotFoundError, DifyRateLimitError, DifyServerError, DifyTimeoutError
+from pydify_plus import AsyncClient
+from pydify_plus.testing import DEFAULT_API_KEYS, Fault, Latency, MockDifyServer
+
+
+@pytest.mark.asyncio
+async def test_streaming_chat_through_in_process_transport(mock_dify, mock_dify_client):
+    events = [e async for e in mock_dify_client.chat.stream_chat_message(messages="Hello")]
+
+    payloads = [json.loads(e.data) for e in events]
+    assert payloads[-1]["event"] == "message_end"
+    assert payloads[-1]["metadata"]["usage"]["completion_tokens"] == len(payloads) - 1
+    assert "".join(p["answer"] for p in payloads[:-1]) == mock_dify.answer
+    assert mock_dify.requests[0].endpoint == API_ENDPOINTS["CHAT_MESSAGES_STREAM"]
+    assert mock_dify.requests[0].json()["query"] == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_stream_is_delivered_incrementally():
+    server = MockDifyServer(token_delay=Latency.constant(0.02), answer="a b c d e")
+    client = server.client(retry_backoff_factor=0.0)
+
+    stream = client._stream_request("POST", API_ENDPOINTS["CHAT_MESSAGES_STREAM"], json={"query": "hi", "response_mode": "streaming"})
+    events = [e async for e in stream]
+
+    assert len(events) == 6
+    assert stream.timings.first_event < stream.timings.duration / 2
+    assert stream.timings.gaps.count == 5
+
+
+@pytest.mark.asyncio
+async def test_paginated_list(mock_dify_client):
+    first = await mock_dify_client.feedback.list(page=1, limit=20)
+    last = await mock_dify_client.feedback.list(page=3, limit=20)
+
+    assert len(first["data"]) == 20 and first["has_more"] is True
+    assert len(last["data"]) == 10 and last["has_more"] is False
+
+
+@pytest.mark.asyncio
+async def test_unauthorized_and_unknown_routes(mock_dify):
+    async with httpx.AsyncClient(transport=mock_dify.transport(), base_url="http://mock") as http:
+        assert (await http.get("/v1/feedbacks")).status_code == 401
+        response = await http.get("/v1/nope", headers={"Authorization": "Bearer x"})
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_injected_status_faults(mock_dify, mock_dify_client):
+    mock_dify.add_fault(Fault.rate_limited(retry_after=3, endpoint=API_ENDPOINTS["FEEDBACK_LIST"], times=1))
+    mock_dify.add_fault(Fault.server_error(503, method="POST", times=1))
+
+    with pytest.raises(DifyRateLimitError):
+        await mock_dify_client.feedback.list()
+    assert (await mock_dify_client.feedback.list())["data"]
+
+    with pytest.raises(DifyServerError) as exc_info:
+        await mock_dify_client.feedback.like("message-1")
+    assert exc_info.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_connection_reset_and_mid_stream_reset(mock_dify, mock_dify_client):
+    mock_dify.add_fault(Fault.connection_reset(endpoint=API_ENDPOINTS["FEEDBACK_LIST"], times=1))
+    with pytest.raises(httpx.RemoteProtocolError):
+        await mock_dify_client.feedback.list()
+
+    mock_dify.add_fault(Fault.stream_reset(after_events=2, times=1))
+    events = [e async for e in mock_dify_client.chat.stream_chat_message(messages="Hello")]
+
+    # The first attempt is cut after two events and the client retries the stream.
+    assert len(mock_dify.requests_to(API_ENDPOINTS["CHAT_MESSAGES_STREAM"])) == 2
+    assert json.loads(events[-1].data)["event"] == "message_end"
+
+
+@pytest.mark.asyncio
+async def test_read_timeout_is_enforced():
+    server = MockDifyServer(endpoint_latency={API_ENDPOINTS["FEEDBACK_LIST"]: Latency.constant(1.0)})
+    client = server.client(timeout=0.05, retries=0)
+
+    with pytest.raises(DifyTimeoutError):
+        await client.feedback.list()
+
+
+def test_seeded_latency_is_reproducible():
+    a = MockDifyServer(latency=Latency.lognormal(0.1, 0.5), seed=7)
+    b = MockDifyServer(latency=Latency.lognormal(0.1, 0.5), seed=7)
+
+    assert [a.latency.sample(a.rng) for _ in range(5)] == [b.latency.sample(b.rng) for _ in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_localhost_server_uses_real_connections(mock_dify):
+    async with mock_dify.serve() as base_url:
+        async with AsyncClient(base_url, DEFAULT_API_KEYS) as client:
+            detail = await client.feedback.list(limit=5)
+            events = [e async for e in client.chat.stream_chat_message(messages="Hello")]
+            with pytest.raises(DifyNotFoundError):
+                await client._arequest("GET", "/v1/unknown")
+
+    assert len(detail["data"]) == 5
+    assert json.loads(events[-1].data)["event"] == "message_end"
+    assert mock_dify.max_in_flight >= 1
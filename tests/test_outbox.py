@@ -0,0 +1,112 @@
+import time
+
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.outbox import Outbox
+from pydify_plus.routes import ROUTES
+from pydify_plus.testing import Fault, MockDifyServer
+
+LIKE = API_ENDPOINTS["FEEDBACK_LIKE"]
+
+
+def _like(message_id):
+    return ROUTES["FEEDBACK_LIKE"].format(message_id=message_id)
+
+
+@pytest.mark.asyncio
+async def test_calls_are_retried_until_delivered():
+    server = MockDifyServer(seed=0, faults=[Fault.server_error(503, endpoint=LIKE, times=2)])
+    async with server.client() as client:
+        async with Outbox(client, backoff=0.01, rate=100.0) as outbox:
+            started = time.monotonic()
+            for i in range(4):
+                await outbox.enqueue("POST", _like(f"m{i}"), json={"score": 1})
+            assert time.monotonic() - started < 0.05
+            await outbox.flush(timeout=2.0)
+            assert outbox.pending() == 0 and outbox.dead_letters() == []
+
+    requests = server.requests_to(LIKE)
+    assert len(requests) == 6
+    # A retried call keeps its idempotency key.
+    assert len({r.headers["idempotency-key"] for r in requests}) == 4
+    assert client.metrics.counter_value("dify_client_outbox_calls_total", outcome="sent") == 4
+    assert client.metrics.counter_value("dify_client_outbox_calls_total", outcome="retried") == 2
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_survive_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    server = MockDifyServer(seed=0)
+    async with server.client() as client:
+        outbox = Outbox(client, path)  # never started: Dify "down"
+        for i in range(3):
+            await outbox.enqueue("POST", _like(f"m{i}"), json={"score": 1})
+        await outbox.aclose()
+
+        async with Outbox(client, path) as outbox:
+            assert outbox.pending() == 3
+            await outbox.flush(timeout=2.0)
+
+    assert [r.path for r in server.requests_to(LIKE)] == [str(_like(f"m{i}")) for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_rejected_calls_are_dead_lettered():
+    server = MockDifyServer(seed=0, faults=[Fault.server_error(400, endpoint=LIKE, times=1)])
+    async with server.client() as client:
+        async with Outbox(client, backoff=0.01) as outbox:
+            await outbox.enqueue("POST", _like("m1"), json={"score": 1})
+            await outbox.flush(timeout=2.0)
+            [dead] = outbox.dead_letters()
+            assert dead["path"] == str(_like("m1")) and dead["attempts"] == 1
+
+            assert outbox.retry_dead() == 1
+            await outbox.flush(timeout=2.0)
+            assert outbox.dead_letters() == []
+    assert len(server.requests_to(LIKE)) == 2
+
+
+@pytest.mark.asyncio
+async def test_unexpected_errors_do_not_stop_the_worker():
+    server = MockDifyServer(seed=0)
+    async with server.client() as client:
+        send = client._arequest
+        calls = []
+
+        async def flaky(*args, **kwargs):
+            calls.append(args[1])
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return await send(*args, **kwargs)
+
+        client._arequest = flaky
+        async with Outbox(client) as outbox:
+            await outbox.enqueue("POST", _like("m1"), json={"score": 1})
+            await outbox.enqueue("POST", _like("m2"), json={"score": 1})
+            await outbox.flush(timeout=2.0)
+            [dead] = outbox.dead_letters()
+            assert dead["path"] == str(_like("m1")) and "RuntimeError" in dead["last_error"]
+
+            outbox._worker.cancel()
+            await outbox.enqueue("POST", _like("m3"), json={"score": 1})
+            with pytest.raises(RuntimeError, match="Outbox worker"):
+                await outbox.flush(timeout=2.0)
+
+    assert [r.path for r in server.requests_to(LIKE)] == [str(_like("m2"))]
+
+
+@pytest.mark.asyncio
+async def test_calls_to_one_path_keep_their_order():
+    rename = API_ENDPOINTS["CONVERSATION_RENAME"]
+    server = MockDifyServer(seed=0, faults=[Fault.server_error(503, endpoint=rename, times=1)])
+    path = ROUTES["CONVERSATION_RENAME"].format(conversation_id="c1")
+    async with server.client() as client:
+        async with Outbox(client, backoff=0.02) as outbox:
+            await outbox.enqueue("POST", path, json={"name": "first"})
+            await outbox.enqueue("POST", path, json={"name": "second"})
+            await outbox.enqueue("POST", _like("m1"), json={"score": 1})
+            await outbox.flush(timeout=2.0)
+
+    # The retried rename still goes before the later one; the like is not held up.
+    assert [r.json()["name"] for r in server.requests_to(rename)] == ["first", "first", "second"]
+    assert server.requests[1].endpoint == LIKE
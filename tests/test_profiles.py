@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from pydify_plus import AsyncClient
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.errors import DifyConnectionError, DifyTimeoutError
+from pydify_plus.profiles import DEFAULT_PROFILES, NO_PROFILE, ProfileTable, RequestProfile
+from pydify_plus.routes import ROUTES
+from pydify_plus.testing import DEFAULT_API_KEYS, Fault, MockDifyServer
+
+
+def test_overrides_merge_over_defaults():
+    table = ProfileTable({"APP_META": RequestProfile(retries=1), API_ENDPOINTS["DATASETS_LIST"]: RequestProfile(retries=5)})
+
+    meta = table.lookup(ROUTES["APP_META"].path, API_ENDPOINTS["APP_META"])
+    assert meta == RequestProfile(timeout=DEFAULT_PROFILES["APP_META"].timeout, retries=1)
+    # A template applies to every name sharing it, so plain paths find it too.
+    assert table.by_name["DATASETS_CREATE"].retries == 5
+    assert table.lookup("/v1/datasets", API_ENDPOINTS["DATASETS_LIST"]).retries == 5
+    # Blocking and streaming chat share a template but not a profile.
+    assert table.lookup("/v1/chat-messages", API_ENDPOINTS["CHAT_MESSAGES_CREATE"]) is NO_PROFILE
+    assert table.lookup(ROUTES["CHAT_MESSAGES_STREAM"].path, "/v1/chat-messages").retry_after_send is True
+
+    with pytest.raises(ValueError, match="Unknown endpoint"):
+        ProfileTable({"/v1/nope": RequestProfile(retries=1)})
+
+
+@pytest.mark.asyncio
+async def test_profiles_set_timeouts_and_retries():
+    server = MockDifyServer(seed=0, faults=[Fault.timeout(endpoint=API_ENDPOINTS["APP_META"], times=1)])
+    profiles = {"APP_META": RequestProfile(timeout=0.05, retries=0)}
+    async with server.client(timeout=30.0, retries=3, retry_backoff_factor=0.0, profiles=profiles) as client:
+        with pytest.raises(DifyTimeoutError):
+            await client.app_config.meta()
+        assert client._policy("POST", ROUTES["FILES_UPLOAD"].path, API_ENDPOINTS["FILES_UPLOAD"], None, None)[0].read == 600.0
+        assert client._policy("GET", ROUTES["APP_META"].path, API_ENDPOINTS["APP_META"], 9.0, 2) == (9.0, 2, True)
+    assert len(server.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_posts_are_not_retried_after_sending():
+    like = API_ENDPOINTS["FEEDBACK_LIKE"]
+    server = MockDifyServer(seed=0, faults=[Fault.timeout(endpoint=like, times=2)])
+    async with server.client(timeout=0.05, retries=3, retry_backoff_factor=0.0) as client:
+        with pytest.raises(DifyTimeoutError):
+            await client.feedback.like("message-1")
+        assert len(server.requests_to(like)) == 1
+
+    # Opting in retries the timeout.
+    server = MockDifyServer(seed=0, faults=[Fault.timeout(endpoint=like, times=2)])
+    profiles = {"FEEDBACK_LIKE": RequestProfile(retry_after_send=True)}
+    async with server.client(timeout=0.05, retries=3, retry_backoff_factor=0.0, profiles=profiles) as client:
+        await client.feedback.like("message-1")
+    assert len(server.requests_to(like)) == 3
+
+
+@pytest.mark.asyncio
+async def test_posts_are_retried_when_nothing_was_sent():
+    attempts = []
+
+    def refuse(request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"result": "success"})
+
+    async with AsyncClient("http://dify.test", dict(DEFAULT_API_KEYS), retries=3, retry_backoff_factor=0.0, transport=httpx.MockTransport(refuse)) as client:
+        assert await client.feedback.like("message-1") == {"result": "success"}
+    assert len(attempts) == 3
+
+    attempts.clear()
+    async with AsyncClient("http://dify.test", dict(DEFAULT_API_KEYS), retries=1, retry_backoff_factor=0.0, transport=httpx.MockTransport(refuse)) as client:
+        with pytest.raises(DifyConnectionError):
+            await client.feedback.like("message-1")
+    assert len(attempts) == 2
@@ -0,0 +1,28 @@
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.metrics import resolve_endpoint
+from pydify_plus.routes import ROUTES, Route
+
+
+def test_routes_match_str_format():
+    for name, template in API_ENDPOINTS.items():
+        route = ROUTES[name]
+        values = {param: f"{param}-1" for param in route.params}
+        path = route.format(**values)
+        assert path == template.format(**values)
+        assert path.template == template
+        assert resolve_endpoint(path) == template
+
+
+def test_route_placeholders_are_validated():
+    route = ROUTES["DOCUMENTS_DETAIL"]
+    assert route.params == ("dataset_id", "document_id")
+    assert route.format(dataset_id="d1", document_id=7) == "/v1/datasets/d1/documents/7"
+
+    for values in ({"dataset_id": "d1"}, {"dataset_id": "d1", "document_id": "x", "extra": 1},
+                   {"dataset_id": "", "document_id": "x"}, {"dataset_id": "d1", "document_id": "../x"}):
+        with pytest.raises(ValueError):
+            route.format(**values)
+    with pytest.raises(ValueError):
+        Route("BAD", "/v1/items/{0}")
+    assert ROUTES["FEEDBACK_LIST"].path is ROUTES["FEEDBACK_LIST"].format()
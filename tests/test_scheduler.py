@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.scheduler import PriorityScheduler, current_priority, priority
+from pydify_plus.testing import Latency, MockDifyServer
+
+
+async def _drain(scheduler, waiters):
+    """Release admitted tickets one at a time, returning the admission order."""
+    order = []
+    pending = dict(waiters)
+    while pending:
+        await asyncio.sleep(0)
+        done = [name for name, task in pending.items() if task.done()]
+        assert len(done) == 1
+        order.append(done[0])
+        pending.pop(done[0]).result().release()
+    return order
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_queuing_between_classes():
+    scheduler = PriorityScheduler(1)
+    first = await scheduler.acquire("background")
+    waiters = [(f"bg{i}", asyncio.ensure_future(scheduler.acquire("background"))) for i in range(4)]
+    await asyncio.sleep(0)
+    waiters += [(f"ui{i}", asyncio.ensure_future(scheduler.acquire("interactive"))) for i in range(2)]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == {"interactive": 2, "default": 0, "background": 4}
+
+    first.release()
+    assert await _drain(scheduler, waiters) == ["ui0", "ui1", "bg0", "bg1", "bg2", "bg3"]
+    assert scheduler.stats() == {"in_flight": 0, "max_concurrency": 1, "queued": {"interactive": 0, "default": 0, "background": 0}}
+
+
+@pytest.mark.asyncio
+async def test_aging_and_cancellation():
+    now = [0.0]
+    scheduler = PriorityScheduler(1, max_wait=5.0)
+    scheduler._clock = lambda: now[0]
+    first = await scheduler.acquire()
+    old = asyncio.ensure_future(scheduler.acquire("background"))
+    await asyncio.sleep(0)
+    now[0] = 6.0
+    cancelled = asyncio.ensure_future(scheduler.acquire("interactive"))
+    fresh = asyncio.ensure_future(scheduler.acquire("interactive"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    first.release()
+    assert await _drain(scheduler, [("old", old), ("fresh", fresh)]) == ["old", "fresh"]
+    assert scheduler.in_flight == 0 and not any(scheduler.queued.values())
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_jump_background_work():
+    server = MockDifyServer(seed=0, latency=Latency.constant(0.005))
+    async with server.client(scheduler=1) as client:
+        # Document calls default to the background class.
+        imports = [asyncio.ensure_future(client.documents.list("dataset-1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        with priority("interactive"):
+            assert current_priority() == "interactive"
+            await client.dataset.list_datasets()
+        await asyncio.gather(*imports)
+
+    endpoints = [r.endpoint for r in server.requests]
+    assert endpoints.index(API_ENDPOINTS["DATASETS_LIST"]) == 1
+    assert current_priority() is None
+    waits = [h["labels"] for h in client.metrics.snapshot()["histograms"]["dify_client_scheduler_wait_seconds"]]
+    assert {"priority": "interactive"} in waits and {"priority": "background"} in waits
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.routes import ROUTES
+from pydify_plus.sync_client import Client
+from pydify_plus.testing import MockDifyServer
+from pydify_plus.testing.server import DEFAULT_API_KEYS
+
+
+def _client(server):
+    return Client(base_url="http://mock-dify", api_key=dict(DEFAULT_API_KEYS), transport=server.transport())
+
+
+def test_sync_client_forwards_request_options():
+    server = MockDifyServer(seed=0)
+    client = _client(server)
+    body = client._arequest("GET", ROUTES["DATASETS_LIST"].path, params={"page": 1, "limit": 5}, api_key_name="DIFY_DATASET_KEY")
+
+    assert len(body["data"]) == 5
+    request = server.requests_to(API_ENDPOINTS["DATASETS_LIST"])[0]
+    assert request.headers["authorization"] == f"Bearer {DEFAULT_API_KEYS['DIFY_DATASET_KEY']}"
+
+
+def test_api_modules_run_on_the_sync_client():
+    server = MockDifyServer(seed=0)
+    client = _client(server)
+    page = asyncio.run(client.dataset.list_datasets(limit=3))
+
+    assert len(page["data"]) == 3
+    assert server.requests_to(API_ENDPOINTS["DATASETS_LIST"])[0].headers["authorization"] == f"Bearer {DEFAULT_API_KEYS['DIFY_DATASET_KEY']}"
+
+
+@pytest.mark.asyncio
+async def test_sync_requests_refuse_to_run_inside_an_event_loop():
+    client = _client(MockDifyServer(seed=0))
+    with pytest.raises(RuntimeError, match="AsyncClient"):
+        client._arequest("GET", ROUTES["DATASETS_LIST"].path, api_key_name="DIFY_DATASET_KEY")
+    assert client.dataset._client is client._async_client
+    assert (await client.dataset.list_datasets(limit=2))["data"]
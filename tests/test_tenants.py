@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from pydify_plus.config import API_ENDPOINTS
+from pydify_plus.tenants import ClientManager
+from pydify_plus.testing import DEFAULT_API_KEYS, Latency, MockDifyServer
+
+
+def _keys(tenant_id):
+    return dict(DEFAULT_API_KEYS, DIFY_DATASET_KEY=f"dataset-{tenant_id}")
+
+
+@pytest.mark.asyncio
+async def test_tenants_share_one_pool_and_use_their_own_keys(mock_dify):
+    async with ClientManager("http://mock-dify", _keys, transport=mock_dify.transport()) as manager:
+        a, b = manager.client("a"), manager.client("b")
+        assert manager.client("a") is a
+        assert a._cli is b._cli is manager.http_client
+        await asyncio.gather(a.dataset.list_datasets(), b.dataset.list_datasets())
+        await a.aclose()  # must not close the shared pool
+        await a.dataset.list_datasets()
+
+        manager.client("b", _keys("b2"))
+        await b.dataset.list_datasets()
+
+    auth = [r.headers["authorization"] for r in mock_dify.requests_to(API_ENDPOINTS["DATASETS_LIST"])]
+    assert sorted(auth[:2]) == ["Bearer dataset-a", "Bearer dataset-b"]
+    assert auth[2:] == ["Bearer dataset-a", "Bearer dataset-b2"]
+    assert a._cli.is_closed and manager._http is None
+
+
+def test_lru_and_idle_eviction():
+    now = [0.0]
+    manager = ClientManager("http://mock-dify", _keys, max_tenants=3, idle_timeout=60.0)
+    manager._clock = lambda: now[0]
+
+    for name in "abc":
+        manager.client(name)
+    manager.client("a")
+    manager.client("d")
+    assert list(manager._tenants) == ["c", "a", "d"]
+
+    now[0] = 30.0
+    manager.client("a")
+    now[0] = 80.0
+    assert manager.evict_idle() == 2
+    assert list(manager._tenants) == ["a"]
+    assert manager.stats() == {"tenants": 1, "max_tenants": 3, "in_flight": 0, "evicted_lru": 1, "evicted_idle": 2}
+
+    with pytest.raises(ValueError):
+        ClientManager("http://mock-dify").client("unknown")
+
+
+@pytest.mark.asyncio
+async def test_per_tenant_concurrency_quota():
+    server = MockDifyServer(seed=0, latency=Latency.constant(0.02))
+    async with ClientManager("http://mock-dify", _keys, max_concurrency_per_tenant=2, transport=server.transport()) as manager:
+        noisy = manager.client("noisy")
+        await asyncio.gather(*(noisy.dataset.list_datasets() for _ in range(8)))
+        assert server.max_in_flight == 2
+
+        server.max_in_flight = 0
+        await asyncio.gather(*(manager.client(f"t{i}").dataset.list_datasets() for i in range(6)))
+        assert server.max_in_flight == 6
+
+
+@pytest.mark.asyncio
+async def test_dropped_and_closed_tenants_flush_their_buffers(mock_dify):
+    async with ClientManager("http://mock-dify", _keys, max_tenants=1, transport=mock_dify.transport()) as manager:
+        manager.client("a").feedback.buffer(flush_interval=60.0).add("m1")
+        manager.client("b").feedback.buffer(flush_interval=60.0).add("m2")  # evicts "a"
+        assert "a" not in manager
+    # "a" was flushed when evicted, "b" when the manager closed.
+    paths = sorted(r.path for r in mock_dify.requests_to(API_ENDPOINTS["FEEDBACK_LIKE"]))
+    assert [p.split("/")[3] for p in paths] == ["m1", "m2"]
+    assert manager._closing == set()
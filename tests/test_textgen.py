@@ -8,4 +8,22 @@ async def test_send_text_completion(respx_mock):
     respx_mock.post("/v1/completion-messages").mock(return_value=Response(200, json={"id": "msg_1"}))
     async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
         resp = await client.textgen.send(inputs={"prompt": "hello"})
-        assert resp["id"] == "msg_1"
\ No newline at end of file
+        assert resp["id"] == "msg_1"
+
+@pytest.mark.asyncio
+async def test_send_stream_stops_task_on_cancel(respx_mock):
+    import asyncio
+    from pydify_plus.apis import base
+
+    body = 'data: {"event": "message", "task_id": "t_1", "answer": "Hi"}\n\n' * 3
+    respx_mock.post("/v1/completion-messages/stream").mock(
+        return_value=Response(200, headers={"content-type": "text/event-stream"}, content=body)
+    )
+    stop_route = respx_mock.post("/v1/completion-messages/t_1/stop").mock(return_value=Response(200, json={"result": "success"}))
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
+        stream = client.textgen.send_stream(inputs={"prompt": "hello"}, user="u_1")
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.gather(*base._background_tasks)
+
+    assert stop_route.called
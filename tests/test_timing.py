@@ -0,0 +1,92 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from httpx import Response
+from pydify_plus import AsyncClient as DifyAsyncClient
+from pydify_plus.errors import DifyNotFoundError
+from pydify_plus.timing import RESPONSE_EXTENSION, PhaseTimings, capture_timings
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 404 if "missing" in self.path else 200
+        body = b'{"data": []}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_phase_timings_from_trace_events():
+    phases = PhaseTimings(endpoint="/v1/app/meta", started_at=0.0)
+    phases.events = {
+        "connection.connect_tcp.started": 0.001,
+        "connection.connect_tcp.complete": 0.011,
+        "http11.send_request_headers.started": 0.012,
+        "http11.send_request_body.complete": 0.015,
+        "http11.receive_response_headers.complete": 0.115,
+        "http11.receive_response_body.complete": 0.125,
+    }
+    result = phases.as_dict()
+    assert result["pool_wait"] == pytest.approx(0.001)
+    assert result["connect"] == pytest.approx(0.010)
+    assert result["tls"] is None
+    assert result["upload"] == pytest.approx(0.003)
+    assert result["server"] == pytest.approx(0.100)
+    assert result["download"] == pytest.approx(0.010)
+
+
+@pytest.mark.asyncio
+async def test_trace_phases_records_breakdown(local_server):
+    async with DifyAsyncClient(base_url=local_server, api_key="test", trace_phases=True) as client:
+        with capture_timings() as timings:
+            await client._arequest("GET", "/v1/datasets/d_1/documents")
+            await client._arequest("GET", "/v1/datasets/d_1/documents")
+
+    first, second = timings
+    assert first.endpoint == "/v1/datasets/{dataset_id}/documents"
+    assert first.connect is not None
+    assert second.connect is None  # pooled connection reused
+    for phases in (first, second):
+        assert phases.server is not None
+        assert phases.total >= phases.server
+
+    hists = client.metrics.snapshot()["histograms"]["dify_client_request_phase_seconds"]
+    assert {h["labels"]["phase"] for h in hists} >= {"pool_wait", "connect", "upload", "server", "download"}
+
+
+@pytest.mark.asyncio
+async def test_timings_attached_to_errors(local_server):
+    async with DifyAsyncClient(base_url=local_server, api_key="test") as client:
+        with capture_timings():
+            with pytest.raises(DifyNotFoundError) as exc_info:
+                await client._arequest("GET", "/v1/datasets/missing")
+
+    assert exc_info.value.timings is not None
+    assert exc_info.value.timings.server is not None
+
+
+@pytest.mark.asyncio
+async def test_trace_phases_disabled_by_default(respx_mock):
+    route = respx_mock.get("/v1/app/meta").mock(return_value=Response(200, json={}))
+    async with DifyAsyncClient(base_url="http://localhost", api_key="test") as client:
+        await client._arequest("GET", "/v1/app/meta")
+
+    assert RESPONSE_EXTENSION not in route.calls.last.response.extensions
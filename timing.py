@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""Phase-level request timing built on httpcore trace events.
+
+When enabled (``AsyncClient(trace_phases=True)`` or inside
+`capture_timings`), every request attempt records a `PhaseTimings`
+breakdown of where its time went:
+
+- ``pool_wait``: waiting for a pooled connection (plus client overhead),
+- ``connect``: DNS resolution and TCP connect (httpcore reports them together),
+- ``tls``: TLS handshake,
+- ``upload``: sending request headers and body,
+- ``server``: waiting for response headers after the body was sent,
+- ``download``: reading the response body,
+- ``total``: the whole attempt.
+
+Phases that did not happen (e.g. ``connect`` on a reused connection) are None.
+The breakdown is attached to the httpx response as
+``response.extensions["dify_timings"]``, to raised `DifyError` instances as
+``error.timings``, to streams as ``stream.timings.phases`` and is fed to the
+client's metrics registry.
+
+Example:
+    >>> with capture_timings() as timings:
+    ...     await client.documents.list(dataset_id)
+    >>> timings[-1].as_dict()
+    {'endpoint': '/v1/datasets/{dataset_id}/documents', 'pool_wait': 0.0002, ...}
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+PHASES = ("pool_wait", "connect", "tls", "upload", "server", "download")
+
+# Key under which the breakdown is stored in `httpx.Response.extensions`.
+RESPONSE_EXTENSION = "dify_timings"
+
+_captured: ContextVar[Optional[List["PhaseTimings"]]] = ContextVar("dify_captured_timings", default=None)
+
+
+@dataclass
+class PhaseTimings:
+    """Timing breakdown of a single request attempt, in seconds.
+
+    Attributes:
+        endpoint: Endpoint template of the request.
+        attempt: Attempt number, starting at 1.
+        events: Offsets of the raw httpcore trace events from the attempt start.
+    """
+
+    endpoint: str
+    attempt: int = 1
+    started_at: float = field(default_factory=time.perf_counter)
+    total: Optional[float] = None
+    events: Dict[str, float] = field(default_factory=dict)
+
+    def record(self, name: str) -> None:
+        # Keep the first occurrence; HTTP/2 may repeat some events.
+        self.events.setdefault(name, time.perf_counter() - self.started_at)
+
+    def finish(self) -> None:
+        if self.total is None:
+            self.total = time.perf_counter() - self.started_at
+
+    def _event(self, suffix: str) -> Optional[float]:
+        for prefix in ("http11.", "http2.", "connection."):
+            value = self.events.get(prefix + suffix)
+            if value is not None:
+                return value
+        return None
+
+    def _span(self, start: Optional[float], end: Optional[float]) -> Optional[float]:
+        if start is None or end is None:
+            return None
+        return max(end - start, 0.0)
+
+    @property
+    def pool_wait(self) -> Optional[float]:
+        acquired = self._event("connect_tcp.started")
+        if acquired is None:
+            acquired = self._event("connect_unix_socket.started")
+        if acquired is None:
+            acquired = self._event("send_request_headers.started")
+        return acquired
+
+    @property
+    def connect(self) -> Optional[float]:
+        return self._span(self._event("connect_tcp.started"), self._event("connect_tcp.complete"))
+
+    @property
+    def tls(self) -> Optional[float]:
+        return self._span(self._event("start_tls.started"), self._event("start_tls.complete"))
+
+    @property
+    def upload(self) -> Optional[float]:
+        return self._span(self._event("send_request_headers.started"), self._event("send_request_body.complete"))
+
+    @property
+    def server(self) -> Optional[float]:
+        return self._span(self._event("send_request_body.complete"), self._event("receive_response_headers.complete"))
+
+    @property
+    def download(self) -> Optional[float]:
+        return self._span(self._event("receive_response_headers.complete"), self._event("receive_response_body.complete"))
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"endpoint": self.endpoint, "attempt": self.attempt}
+        for phase in PHASES:
+            result[phase] = getattr(self, phase)
+        result["total"] = self.total
+        return result
+
+
+def capturing() -> bool:
+    """Whether the current context is inside `capture_timings`."""
+    return _captured.get() is not None
+
+
+def collect(timings: PhaseTimings) -> None:
+    """Append ``timings`` to the innermost active `capture_timings` list, if any."""
+    captured = _captured.get()
+    if captured is not None:
+        captured.append(timings)
+
+
+@contextmanager
+def capture_timings() -> Iterator[List[PhaseTimings]]:
+    """Collect the `PhaseTimings` of every request attempt made in this context.
+
+    Phase tracing is enabled for these requests even if the client was
+    created with ``trace_phases=False``. The context is propagated through
+    `contextvars`, so it covers requests made by the current task only.
+
+    Yields:
+        A list that is filled with one `PhaseTimings` per attempt.
+    """
+    captured: List[PhaseTimings] = []
+    token = _captured.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured.reset(token)